@@ -5,6 +5,8 @@ Backfill missing close_price values in trades.sqlite by using stored PnL.
 import sqlite3
 from pathlib import Path
 
+from src.persistence import PersistenceManager
+
 DB_PATH = Path(__file__).parent / "data" / "trades.sqlite"
 
 
@@ -47,7 +49,7 @@ def backfill() -> None:
 		conn.close()
 		return
 
-	updated = 0
+	updates = []
 	for row in rows:
 		try:
 			direction = row["direction"]
@@ -59,17 +61,15 @@ def backfill() -> None:
 			close_price = compute_close_price(direction, entry, lots, pnl)
 			if close_price is None:
 				continue
-			conn.execute(
-				"UPDATE trades SET close_price = ? WHERE ticket = ?",
-				(close_price, row["ticket"]),
-			)
-			updated += 1
+			updates.append((row["ticket"], {"close_price": close_price}))
 		except Exception:
 			continue
 
-	conn.commit()
 	conn.close()
-	print(f"Backfilled close_price for {updated} trade(s).")
+	# Write through PersistenceManager so engine_daily_stats stays in step with trades
+	if updates:
+		PersistenceManager(str(DB_PATH), write_behind=False).update_trades(updates)
+	print(f"Backfilled close_price for {len(updates)} trade(s).")
 
 
 if __name__ == "__main__":
@@ -13,6 +13,8 @@ except ImportError:
     print("❌ MetaTrader5 module not installed. Please install it: pip install MetaTrader5")
     exit(1)
 
+from src.persistence import PersistenceManager
+
 DB_PATH = Path(__file__).parent / "data" / "trades.sqlite"
 
 
@@ -87,6 +89,7 @@ def backfill_from_mt5():
     print(f"📊 Found {len(rows)} closed trades missing data")
     
     # First, try to fetch deals by position
+    pending_updates = []
     updated_count = 0
     not_found_count = 0
     
@@ -130,15 +133,16 @@ def backfill_from_mt5():
                     updates['close_time'] = datetime.fromtimestamp(close_time).isoformat()
                 
                 if updates:
-                    set_clause = ', '.join([f"{k} = ?" for k in updates.keys()])
-                    values = list(updates.values()) + [ticket]
-                    conn.execute(f"UPDATE trades SET {set_clause} WHERE ticket = ?", values)
+                    pending_updates.append((ticket, updates))
                     updated_count += 1
     
-    conn.commit()
     conn.close()
     mt5.shutdown()
     
+    # Write through PersistenceManager so engine_daily_stats stays in step with trades
+    if pending_updates:
+        PersistenceManager(str(DB_PATH), write_behind=False).update_trades(pending_updates)
+    
     print(f"\n✅ Backfill complete!")
     print(f"   Updated: {updated_count} trades")
     print(f"   Not found in MT5: {not_found_count} trades")
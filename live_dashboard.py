@@ -4,28 +4,33 @@ Clean implementation with real market data and professional branding
 Created by Gift Ndlala
 """
 
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 from dataclasses import asdict
 import threading
 import time
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 import sys
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.live_data_stream import LiveDataStream, LiveSignal
+from src.live_data_stream import LiveSignal
+from src.stream_supervisor import StreamSupervisor
 from src.config import get_config
-from src.persistence import PersistenceManager
-from src.mt5_connector import MT5Connector
+from src.metrics import get_metrics
+from src.broker_cache import get_broker_cache
+from src.position_service import get_position_service
+from src.persistence import PersistenceManager, rollup_analytics
+from src.retention import SignalRetention
 from src.executor import AutoTrader
 
 app = Flask(__name__)
 
 # Global variables
 streams = {}
+supervisor = None
 current_signal_data = None
 signal_history = []
 persistence = PersistenceManager()
@@ -38,7 +43,7 @@ auto_tp_lock = threading.Lock()
 
 def init_live_stream():
     """Initialize live data streams for configured symbols"""
-    global streams
+    global streams, supervisor
     
     def signal_callback(signal: LiveSignal):
         global current_signal_data, signal_history
@@ -105,33 +110,34 @@ def init_live_stream():
             print(f"🎯 {signal.signal_type} SIGNAL: ${signal.current_price:.2f} | {alert_emoji} {signal.alert_level} ALERT")
             print(f"   Target: {signal.target_pips} pips | Success Rate: {signal.success_rate:.1f}% | Confidence: {signal.confidence:.1f}%")
     
-    # Create and start live stream with REAL market data
+    # One supervisor drives every symbol over a single broker session
     cfg = get_config()
     symbol = cfg.get('broker', {}).get('symbol', 'XAUUSD')
-    # Start XAUUSDm (from config)
-    gold_stream = LiveDataStream(symbol=symbol, update_interval=30)
-    gold_stream.add_signal_callback(signal_callback)
-    gold_stream.start_streaming()
-    streams[symbol] = gold_stream
-
-    # Start US30m secondary stream
-    try:
-        us_symbol = os.getenv('US30_SYMBOL', 'US30m')
-        us_stream = LiveDataStream(symbol=us_symbol, update_interval=30)
-        us_stream.add_signal_callback(signal_callback)
-        us_stream.start_streaming()
-        streams[us_symbol] = us_stream
-        print(f"✅ Live stream initialized for {us_symbol}")
+    us_symbol = os.getenv('US30_SYMBOL', 'US30m')
+    symbols = cfg.get('supervisor', {}).get('symbols') or [symbol, us_symbol]
+    supervisor = StreamSupervisor(symbols, update_interval=30)
+    for sym, stream in supervisor.streams.items():
+        stream.add_signal_callback(signal_callback)
+        streams[sym] = stream
+        print(f"✅ Live stream initialized for {sym}")
         # Sanity log to ensure data source path awareness
         try:
-            mapped = getattr(us_stream, 'yf_symbol', us_symbol)
-            print(f"🔎 {us_symbol} mapped to data source: {mapped}")
+            mapped = getattr(stream, 'yf_symbol', sym)
+            print(f"🔎 {sym} mapped to data source: {mapped}")
         except Exception:
             pass
-    except Exception as e:
-        print(f"⚠️ Could not start US30 stream: {e}")
+    supervisor.start()
     print("✅ Live streams initialized and started")
 
+    # Roll up / archive aged signal rows in the background
+    retention_cfg = cfg.get('retention', {})
+    if retention_cfg.get('enabled', False):
+        try:
+            SignalRetention.from_config().start(interval_minutes=retention_cfg.get('interval_minutes', 60))
+            print("✅ Signal retention scheduled")
+        except Exception as e:
+            print(f"⚠️ Signal retention not started: {e}")
+
 # Routes
 @app.route('/')
 def dashboard():
@@ -199,9 +205,21 @@ def get_status():
         st['dashboard_status'] = 'running'
         st['real_data'] = 'active'
         st['symbol'] = sym
+        st['supervisor'] = supervisor.get_status() if supervisor else None
+        st['position_service'] = get_position_service().get_status()
         return jsonify(st)
     return jsonify({'dashboard_status': 'initializing', 'real_data': 'loading', 'symbol': sym})
 
+@app.route('/api/metrics')
+def get_stage_metrics():
+    """Per-stage latency percentiles; ?format=prometheus for the text exposition format"""
+    registry = get_metrics()
+    if (request.args.get('format') or '').lower() == 'prometheus':
+        return Response(registry.to_prometheus(), mimetype='text/plain; version=0.0.4')
+    data = registry.snapshot()
+    data['broker_cache'] = get_broker_cache().get_stats()
+    return jsonify({'status': 'success', 'data': data, 'last_update': datetime.now().isoformat()})
+
 @app.route('/api/trades')
 def get_trades():
     symbol = request.args.get('symbol')
@@ -280,18 +298,50 @@ def engine_toggle():
 
 @app.route('/api/engine_analytics')
 def engine_analytics():
-    hours = int(request.args.get('hours', 20))
-    # optional symbol filter later
+    """Per-engine trade stats.
+
+    Window: ``hours`` back from now (default 20; hour-precise: whole days from the
+    engine_daily_stats aggregates, the partial first day from the trades rows), or ``days`` back from today / explicit ``start``/``end`` (YYYY-MM-DD;
+    whole UTC days from the engine_daily_stats aggregates). ``group_by`` is a comma
+    list of day/engine/tier/alert_level/symbol (default engine). The response
+    echoes the effective ``start`` and the ``granularity`` used.
+    """
+    days = request.args.get('days')
+    start = request.args.get('start')
+    end = request.args.get('end')
+    hours = None if (days or start) else int(request.args.get('hours', 20))
+    now = datetime.utcnow()
+    symbol = request.args.get('symbol')
+    group_by = [g.strip() for g in request.args.get('group_by', 'engine').split(',') if g.strip()]
+    # One read at group_by + engine; both the rows and the engine counts roll up from it
+    fetch_by = group_by if 'engine' in group_by else group_by + ['engine']
     try:
-        rows = persistence.recent_trades(hours=hours, limit=2000)
-    except Exception:
-        rows = []
+        if hours is not None:
+            since = now - timedelta(hours=hours)
+            start, end, granularity = since.isoformat(timespec='seconds'), None, 'hour'
+            fetched = persistence.engine_analytics_since(since, symbol=symbol, group_by=fetch_by)
+        else:
+            start = start or (now - timedelta(days=int(days))).strftime('%Y-%m-%d')
+            granularity = 'day'
+            fetched = persistence.engine_analytics(start, until_day=end, symbol=symbol, group_by=fetch_by)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+    rows = fetched if fetch_by == group_by else rollup_analytics(fetched, group_by)
+    by_engine = fetched if fetch_by == ['engine'] else rollup_analytics(fetched, ['engine'])
     counts = {'FARMER': 0, 'INTRADAY_LOW': 0, 'INTRADAY_MED': 0, 'SWING_HIGH': 0, 'INTRADAY': 0}
-    for r in rows:
-        engine = r.get('engine') or ''
-        if engine in counts:
-            counts[engine] += 1
-    return jsonify({'status': 'success', 'hours': hours, 'counts': counts})
+    for r in by_engine:
+        if r.get('engine') in counts:
+            counts[r['engine']] = int(r.get('trades') or 0)
+    return jsonify({
+        'status': 'success',
+        'hours': hours,
+        'start': start,
+        'end': end,
+        'granularity': granularity,
+        'group_by': group_by,
+        'counts': counts,
+        'rows': rows
+    })
 
 @app.route('/api/event_toggle', methods=['POST'])
 def event_toggle():
@@ -433,29 +483,16 @@ def ict_atm_status():
 def close_all_trades():
     """Kill switch: Close all open trades/positions"""
     try:
-        mt5_conn = MT5Connector()
-        if not mt5_conn.initialize():
+        # Closing acts on the account, so insist on a recent snapshot
+        snap = get_position_service().snapshot(max_age=1.0)
+        if not snap.ok:
             return jsonify({'status': 'error', 'message': 'MT5 not initialized'}), 500
         
-        positions = mt5_conn.get_positions()
+        positions = snap.positions
         if not positions:
             return jsonify({'status': 'success', 'message': 'No open positions', 'closed': 0})
         
-        closed_count = 0
-        failed_count = 0
-        errors = []
-        
-        for pos in positions:
-            try:
-                autotrader = AutoTrader(pos.symbol)
-                if autotrader.close_position(pos.ticket):
-                    closed_count += 1
-                else:
-                    failed_count += 1
-                    errors.append(f"Failed to close ticket {pos.ticket}")
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"Error closing ticket {pos.ticket}: {str(e)}")
+        closed_count, failed_count, errors = _close_positions(positions)
         
         return jsonify({
             'status': 'success',
@@ -471,11 +508,12 @@ def close_all_trades():
 def close_profitable_trades():
     """Kill switch: Close all open trades/positions with profits only (+)"""
     try:
-        mt5_conn = MT5Connector()
-        if not mt5_conn.initialize():
+        # Closing acts on the account, so insist on a recent snapshot
+        snap = get_position_service().snapshot(max_age=1.0)
+        if not snap.ok:
             return jsonify({'status': 'error', 'message': 'MT5 not initialized'}), 500
         
-        positions = mt5_conn.get_positions()
+        positions = snap.positions
         if not positions:
             return jsonify({'status': 'success', 'message': 'No open positions', 'closed': 0})
         
@@ -485,21 +523,7 @@ def close_profitable_trades():
         if not profitable_positions:
             return jsonify({'status': 'success', 'message': 'No profitable positions', 'closed': 0})
         
-        closed_count = 0
-        failed_count = 0
-        errors = []
-        
-        for pos in profitable_positions:
-            try:
-                autotrader = AutoTrader(pos.symbol)
-                if autotrader.close_position(pos.ticket):
-                    closed_count += 1
-                else:
-                    failed_count += 1
-                    errors.append(f"Failed to close ticket {pos.ticket}")
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"Error closing ticket {pos.ticket}: {str(e)}")
+        closed_count, failed_count, errors = _close_positions(profitable_positions)
         
         return jsonify({
             'status': 'success',
@@ -515,11 +539,12 @@ def close_profitable_trades():
 def close_losing_trades():
     """Kill switch: Close all open trades/positions with losses only (-)"""
     try:
-        mt5_conn = MT5Connector()
-        if not mt5_conn.initialize():
+        # Closing acts on the account, so insist on a recent snapshot
+        snap = get_position_service().snapshot(max_age=1.0)
+        if not snap.ok:
             return jsonify({'status': 'error', 'message': 'MT5 not initialized'}), 500
         
-        positions = mt5_conn.get_positions()
+        positions = snap.positions
         if not positions:
             return jsonify({'status': 'success', 'message': 'No open positions', 'closed': 0})
         
@@ -529,21 +554,7 @@ def close_losing_trades():
         if not losing_positions:
             return jsonify({'status': 'success', 'message': 'No losing positions', 'closed': 0})
         
-        closed_count = 0
-        failed_count = 0
-        errors = []
-        
-        for pos in losing_positions:
-            try:
-                autotrader = AutoTrader(pos.symbol)
-                if autotrader.close_position(pos.ticket):
-                    closed_count += 1
-                else:
-                    failed_count += 1
-                    errors.append(f"Failed to close ticket {pos.ticket}")
-            except Exception as e:
-                failed_count += 1
-                errors.append(f"Error closing ticket {pos.ticket}: {str(e)}")
+        closed_count, failed_count, errors = _close_positions(losing_positions)
         
         return jsonify({
             'status': 'success',
@@ -559,35 +570,16 @@ def close_losing_trades():
 def get_total_profit():
     """Get total unrealized profit from all open positions"""
     try:
-        mt5_conn = MT5Connector()
-        if not mt5_conn.initialize():
+        snap = get_position_service().snapshot()
+        if not snap.ok:
             return jsonify({'status': 'error', 'message': 'MT5 not initialized'}), 500
         
-        positions = mt5_conn.get_positions()
-        if not positions:
-            return jsonify({
-                'status': 'success',
-                'total_profit': 0.0,
-                'position_count': 0,
-                'currency': 'USD'
-            })
-        
-        # Get account currency
-        try:
-            import MetaTrader5 as mt5
-            acc_info = mt5.account_info()
-            currency = getattr(acc_info, 'currency', 'USD') if acc_info else 'USD'
-        except Exception:
-            currency = 'USD'
-        
-        # Sum all unrealized profits
-        total_profit = sum(float(getattr(pos, 'profit', 0)) for pos in positions)
-        
         return jsonify({
             'status': 'success',
-            'total_profit': round(total_profit, 2),
-            'position_count': len(positions),
-            'currency': currency
+            'total_profit': round(snap.total_profit, 2),
+            'position_count': len(snap.positions),
+            'currency': snap.currency or 'USD',
+            'as_of': snap.as_of.isoformat() if snap.as_of else None
         })
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -626,58 +618,46 @@ def set_auto_take_profit():
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
-def monitor_auto_take_profit():
-    """Background thread that monitors total profit and closes all positions when threshold is reached"""
-    while True:
+def _close_positions(positions):
+    """Close the given positions; returns (closed_count, failed_count, errors)"""
+    closed_count = 0
+    failed_count = 0
+    errors = []
+    for pos in positions:
         try:
-            with auto_tp_lock:
-                enabled = auto_take_profit['enabled']
-                threshold = auto_take_profit['threshold']
-            
-            if enabled:
-                try:
-                    mt5_conn = MT5Connector()
-                    if mt5_conn.initialize():
-                        positions = mt5_conn.get_positions()
-                        if positions:
-                            total_profit = sum(float(getattr(pos, 'profit', 0)) for pos in positions)
-                            
-                            if total_profit >= threshold:
-                                try:
-                                    import MetaTrader5 as mt5
-                                    acc_info = mt5.account_info()
-                                    currency = getattr(acc_info, 'currency', '') if acc_info else ''
-                                except Exception:
-                                    currency = ''
-                                
-                                print(f"🎯 Auto-take-profit triggered! Total profit: {total_profit:.2f}{currency} >= {threshold:.2f}{currency}")
-                                # Close all positions
-                                closed_count = 0
-                                failed_count = 0
-                                for pos in positions:
-                                    try:
-                                        autotrader = AutoTrader(pos.symbol)
-                                        if autotrader.close_position(pos.ticket):
-                                            closed_count += 1
-                                        else:
-                                            failed_count += 1
-                                    except Exception as e:
-                                        failed_count += 1
-                                        print(f"⚠️ Error closing position {pos.ticket}: {e}")
-                                
-                                print(f"✅ Auto-take-profit closed {closed_count} positions (failed: {failed_count})")
-                                
-                                # Disable auto-take-profit after triggering
-                                with auto_tp_lock:
-                                    auto_take_profit['enabled'] = False
-                except Exception as e:
-                    print(f"⚠️ Error in auto-take-profit monitor: {e}")
-            
-            # Check every 5 seconds
-            time.sleep(5)
+            autotrader = AutoTrader(pos.symbol)
+            if autotrader.close_position(pos.ticket):
+                closed_count += 1
+            else:
+                failed_count += 1
+                errors.append(f"Failed to close ticket {pos.ticket}")
         except Exception as e:
-            print(f"⚠️ Error in auto-take-profit monitor thread: {e}")
-            time.sleep(5)
+            failed_count += 1
+            errors.append(f"Error closing ticket {pos.ticket}: {str(e)}")
+    get_position_service().invalidate()
+    return closed_count, failed_count, errors
+
+def check_auto_take_profit(snapshot):
+    """Position-service subscriber: close all positions once total profit reaches the threshold"""
+    try:
+        if not snapshot.ok or not snapshot.positions:
+            return
+        total_profit = snapshot.total_profit
+        # Claim the trigger before closing anything so it can only fire once
+        with auto_tp_lock:
+            threshold = auto_take_profit['threshold']
+            if not auto_take_profit['enabled'] or total_profit < threshold:
+                return
+            auto_take_profit['enabled'] = False
+        currency = snapshot.currency or ''
+        print(f"🎯 Auto-take-profit triggered! Total profit: {total_profit:.2f}{currency} >= {threshold:.2f}{currency}")
+        # Close all positions (auto-take-profit stays disabled after triggering)
+        closed_count, failed_count, errors = _close_positions(snapshot.positions)
+        for err in errors:
+            print(f"⚠️ {err}")
+        print(f"✅ Auto-take-profit closed {closed_count} positions (failed: {failed_count})")
+    except Exception as e:
+        print(f"⚠️ Error in auto-take-profit monitor: {e}")
 
 def ensure_professional_template():
     """Ensure the professional template is available"""
@@ -702,14 +682,21 @@ if __name__ == '__main__':
         print("❌ Cannot start - template missing")
         exit(1)
     
+    # Offline runs: serve MetaTrader5 from the simulated terminal
+    if get_config().get('paper_broker', {}).get('enabled', False):
+        from src import paper_broker
+        paper_broker.install()
+        print("🧪 Paper broker installed (simulated MT5 terminal)")
+
     # Initialize live stream with REAL market data
     print("📡 Initializing live data stream with REAL market data...")
     init_live_stream()
     
-    # Start auto-take-profit monitoring thread
+    # Shared position poller; auto-take-profit checks every snapshot it takes
     print("💰 Starting auto-take-profit monitor...")
-    monitor_thread = threading.Thread(target=monitor_auto_take_profit, daemon=True)
-    monitor_thread.start()
+    position_service = get_position_service()
+    position_service.subscribe(check_auto_take_profit)
+    position_service.start()
     print("✅ Auto-take-profit monitor started")
     
     # Start Flask app
@@ -721,6 +708,6 @@ if __name__ == '__main__':
     try:
         app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
     except KeyboardInterrupt:
-        if live_stream:
-            live_stream.stop_streaming()
+        if supervisor:
+            supervisor.stop()
         print("\n👋 Get Rich FR Bot dashboard stopped")
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""asyncio runtime that drives many ``LiveDataStream`` instances from one loop.
+
+In thread mode every stream owns a daemon thread running a blocking
+poll/process/sleep loop, so each symbol costs a thread and a slow broker call or
+database write stalls that symbol's whole cycle. ``AsyncStreamRuntime`` instead
+runs one event loop (on a single background thread) with one task per stream:
+
+* quote polling, the processing cycle (indicators, strategy evaluation, order
+  decisions) and reconcile run on a compute executor, one in-flight cycle per
+  stream, so symbols are processed in parallel;
+* the MetaTrader5 calls those cycles make are routed through
+  :func:`~src.broker_gateway.broker_call` to a small broker executor (one worker
+  by default, since the terminal connection is process-wide), so only the broker
+  round trips themselves serialize;
+* signal persistence and signal callbacks are handed off as background tasks on
+  a separate executor so they never delay the next poll;
+* stopping a stream cancels its task; :meth:`AsyncStreamRuntime.stop` cancels
+  every stream, waits for in-flight cycles and drains pending background work.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Mapping, Optional, Set
+
+from .broker_gateway import set_broker_executor
+
+
+class AsyncStreamRuntime:
+    """One event loop driving the poll cycle of several live streams."""
+
+    def __init__(
+        self,
+        broker_workers: int = 1,
+        compute_workers: int = 4,
+        background_workers: int = 4,
+        shutdown_timeout: float = 10.0,
+    ) -> None:
+        self.broker_workers = max(1, int(broker_workers))
+        self.compute_workers = max(1, int(compute_workers))
+        self.background_workers = max(1, int(background_workers))
+        self.shutdown_timeout = float(shutdown_timeout)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._broker: Optional[ThreadPoolExecutor] = None
+        self._compute: Optional[ThreadPoolExecutor] = None
+        self._background_pool: Optional[ThreadPoolExecutor] = None
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._background: Set[asyncio.Future] = set()
+        self._lock = threading.Lock()
+        self.cycles = 0
+        self.background_errors = 0
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._loop.is_running()
+
+    def start(self) -> None:
+        """Start the event loop thread (no-op when already running)."""
+        with self._lock:
+            if self.running:
+                return
+            self._broker = ThreadPoolExecutor(max_workers=self.broker_workers, thread_name_prefix="stream-broker")
+            self._compute = ThreadPoolExecutor(max_workers=self.compute_workers, thread_name_prefix="stream-compute")
+            set_broker_executor(self._broker, "stream-broker")
+            self._background_pool = ThreadPoolExecutor(
+                max_workers=self.background_workers, thread_name_prefix="stream-io"
+            )
+            self._loop = asyncio.new_event_loop()
+            started = threading.Event()
+
+            def run_loop() -> None:
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(started.set)
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="async-stream-runtime", daemon=True)
+            self._thread.start()
+            started.wait()
+
+    def stop(self) -> None:
+        """Cancel every stream, wait for in-flight work and stop the loop."""
+        with self._lock:
+            loop = self._loop
+            if loop is None:
+                return
+            if loop.is_running():
+                try:
+                    asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(self.shutdown_timeout + 5)
+                except Exception as e:
+                    print(f"⚠️ Async stream shutdown error: {e}")
+                loop.call_soon_threadsafe(loop.stop)
+            if self._thread is not None:
+                self._thread.join(timeout=self.shutdown_timeout)
+            for pool in (self._compute, self._background_pool):
+                if pool is not None:
+                    pool.shutdown(wait=True)
+            # Compute and background work may still reach the broker, so it goes last
+            set_broker_executor(None)
+            if self._broker is not None:
+                self._broker.shutdown(wait=True)
+            loop.close()
+            self._loop = None
+            self._thread = None
+            self._broker = None
+            self._compute = None
+            self._background_pool = None
+            print("🛑 Async stream runtime stopped")
+
+    async def _shutdown(self) -> None:
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self._background:
+            await asyncio.wait(set(self._background), timeout=self.shutdown_timeout)
+
+    # ------------------------------------------------------------------
+    # Streams
+    # ------------------------------------------------------------------
+    def add_stream(self, stream: Any) -> None:
+        """Schedule ``stream``'s poll cycle on the loop."""
+        self.start()
+        asyncio.run_coroutine_threadsafe(self._add(stream), self._loop).result()
+
+    async def _add(self, stream: Any) -> None:
+        key = id(stream)
+        existing = self._tasks.get(key)
+        if existing is not None and not existing.done():
+            return
+        self._tasks[key] = asyncio.get_running_loop().create_task(
+            self._run_stream(stream), name=f"stream:{getattr(stream, 'symbol', key)}"
+        )
+
+    def remove_stream(self, stream: Any) -> None:
+        """Cancel ``stream``'s task; an in-flight cycle finishes on its executor."""
+        if not self.running:
+            return
+        asyncio.run_coroutine_threadsafe(self._remove(stream), self._loop).result(self.shutdown_timeout)
+
+    async def _remove(self, stream: Any) -> None:
+        task = self._tasks.pop(id(stream), None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run_stream(self, stream: Any) -> None:
+        loop = asyncio.get_running_loop()
+        print(f"🚀 Starting live data stream for {stream.symbol} (async)")
+        print(f"⏱️ Update interval: {stream.update_interval} seconds")
+        try:
+            while stream.is_running:
+                try:
+                    current_quote = await loop.run_in_executor(self._compute, stream._fetch_current_quote)
+                    if current_quote:
+                        await loop.run_in_executor(self._compute, stream._process_quote, current_quote)
+                    else:
+                        print("⚠️ Failed to fetch current quote")
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"❌ Error in streaming loop: {e}")
+                await loop.run_in_executor(self._compute, stream._reconcile_positions)
+                self.cycles += 1
+                await asyncio.sleep(stream.update_interval)
+        except asyncio.CancelledError:
+            print(f"🛑 Async stream cancelled for {stream.symbol}")
+            raise
+
+    # ------------------------------------------------------------------
+    # Background work
+    # ------------------------------------------------------------------
+    def submit_background(self, fn: Callable[..., Any], *args: Any) -> None:
+        """Run ``fn(*args)`` as a background task; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            fn(*args)
+            return
+        loop.call_soon_threadsafe(self._spawn_background, fn, args)
+
+    def _spawn_background(self, fn: Callable[..., Any], args: tuple) -> None:
+        future = self._loop.run_in_executor(self._background_pool, fn, *args)
+        self._background.add(future)
+        future.add_done_callback(self._background_done)
+
+    def _background_done(self, future: asyncio.Future) -> None:
+        self._background.discard(future)
+        if not future.cancelled() and future.exception() is not None:
+            self.background_errors += 1
+            print(f"⚠️ Background task error: {future.exception()}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "streams": len(self._tasks),
+            "broker_workers": self.broker_workers,
+            "compute_workers": self.compute_workers,
+            "cycles": self.cycles,
+            "pending_background": len(self._background),
+            "background_errors": self.background_errors,
+        }
+
+
+_runtime: Optional[AsyncStreamRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_async_runtime(settings: Optional[Mapping[str, Any]] = None) -> AsyncStreamRuntime:
+    """Process-wide runtime shared by every stream started in async mode."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            settings = settings or {}
+            _runtime = AsyncStreamRuntime(
+                broker_workers=settings.get("broker_workers", 1),
+                compute_workers=settings.get("compute_workers", 4),
+                background_workers=settings.get("background_workers", 4),
+                shutdown_timeout=settings.get("shutdown_timeout_seconds", 10.0),
+            )
+            atexit.register(_runtime.stop)
+        return _runtime
@@ -15,7 +15,8 @@ class BacktestEngine:
     Comprehensive backtesting engine for trading strategies
     """
     
-    def __init__(self, initial_capital: float = 10000, commission: float = 0.001, slippage: float = 0.0005):
+    def __init__(self, initial_capital: float = 10000, commission: float = 0.001, slippage: float = 0.0005,
+                 vectorized: bool = True):
         """
         Initialize the backtesting engine
         
@@ -23,27 +24,58 @@ class BacktestEngine:
             initial_capital (float): Starting capital for backtesting
             commission (float): Commission rate per trade (default: 0.1%)
             slippage (float): Slippage rate per trade (default: 0.05%)
+            vectorized (bool): Use the NumPy execution path (same trades and
+                equity curve as the bar-by-bar loop, much faster on M1 data)
         """
         self.initial_capital = initial_capital
         self.commission = commission
         self.slippage = slippage
+        self.vectorized = vectorized
         self.trades = []
         self.portfolio_value = []
         self.positions = []
         
-    def execute_backtest(self, data: pd.DataFrame, signals: pd.Series) -> Dict:
+    def execute_backtest(self, data: pd.DataFrame, signals: pd.Series, vectorized: Optional[bool] = None,
+                         verbose: bool = True) -> Dict:
         """
         Execute backtesting on historical data with signals
         
         Args:
             data (pd.DataFrame): Price data with OHLCV
             signals (pd.Series): Trading signals (-1, 0, 1)
+            vectorized (bool): Override the engine's execution mode
+            verbose (bool): Print progress (off for optimizer inner loops)
             
         Returns:
             Dict: Comprehensive backtesting results
         """
-        print("Starting backtesting...")
+        if verbose:
+            print("Starting backtesting...")
         
+        use_vectorized = self.vectorized if vectorized is None else vectorized
+        if use_vectorized:
+            trades, portfolio_value = self._simulate_vectorized(data, signals)
+        else:
+            trades, portfolio_value = self._simulate_loop(data, signals)
+        
+        # Store results
+        self.trades = trades
+        self.portfolio_value = portfolio_value
+        
+        # Calculate performance metrics
+        results = self.calculate_performance_metrics()
+        
+        if verbose:
+            print(f"Backtesting completed! Final portfolio value: ${results['Final_Value']:,.2f}")
+        return results
+    
+    def _simulate_loop(self, data: pd.DataFrame, signals: pd.Series) -> Tuple[List[Dict], pd.DataFrame]:
+        """
+        Reference bar-by-bar simulation
+        
+        Returns:
+            Tuple[List[Dict], pd.DataFrame]: Trades and the per-bar portfolio frame
+        """
         # Initialize variables
         capital = self.initial_capital
         position = 0  # 0: no position, 1: long, -1: short
@@ -164,15 +196,204 @@ class BacktestEngine:
                     'Capital': capital + profit
                 })
         
-        # Store results
-        self.trades = trades
-        self.portfolio_value = pd.DataFrame(portfolio_values).set_index('Date')
+        return trades, pd.DataFrame(portfolio_values).set_index('Date')
+    
+    def _fill_signal(self, state: List, bar: int, price: float, signal: int, trades: List[Dict]):
+        """
+        Apply one signal bar to ``state`` = [capital, position, shares, entry_price]
         
-        # Calculate performance metrics
-        results = self.calculate_performance_metrics()
+        Mirrors the trade block of ``_simulate_loop`` operation for operation so
+        both paths produce bit-identical floats. Trades record the bar position
+        as 'Date'; ``_simulate_vectorized`` swaps in the timestamps at the end.
+        """
+        capital, position, shares, entry_price = state
+        if signal == 1:
+            if position == -1:  # Close short position
+                profit = shares * (entry_price - price) * (1 - self.commission - self.slippage)
+                capital += profit
+                trades.append({
+                    'Date': bar,
+                    'Type': 'Cover',
+                    'Price': price,
+                    'Shares': shares,
+                    'Value': shares * price,
+                    'Profit': profit,
+                    'Capital': capital
+                })
+            shares = int(capital * 0.95 / price)
+            if shares > 0:
+                entry_price = price * (1 + self.slippage)
+                cost = shares * entry_price * (1 + self.commission)
+                capital -= cost
+                position = 1
+                trades.append({
+                    'Date': bar,
+                    'Type': 'Buy',
+                    'Price': entry_price,
+                    'Shares': shares,
+                    'Value': shares * entry_price,
+                    'Profit': 0,
+                    'Capital': capital
+                })
+        else:
+            if position == 1:  # Close long position
+                profit = shares * (price - entry_price) * (1 - self.commission - self.slippage)
+                capital += profit
+                trades.append({
+                    'Date': bar,
+                    'Type': 'Sell',
+                    'Price': price,
+                    'Shares': shares,
+                    'Value': shares * price,
+                    'Profit': profit,
+                    'Capital': capital
+                })
+            shares = int(capital * 0.95 / price)
+            if shares > 0:
+                entry_price = price * (1 - self.slippage)
+                position = -1
+                trades.append({
+                    'Date': bar,
+                    'Type': 'Short',
+                    'Price': entry_price,
+                    'Shares': shares,
+                    'Value': shares * entry_price,
+                    'Profit': 0,
+                    'Capital': capital
+                })
+        state[:] = [capital, position, shares, entry_price]
+    
+    def _simulate_vectorized(self, data: pd.DataFrame, signals: pd.Series) -> Tuple[List[Dict], pd.DataFrame]:
+        """
+        NumPy simulation equivalent to ``_simulate_loop``
         
-        print(f"Backtesting completed! Final portfolio value: ${results['Final_Value']:,.2f}")
-        return results
+        Position only changes on bars whose signal differs from the held side,
+        so the bars are compressed into runs of equal non-zero signals and only
+        the first bar of each run (plus retries after an unaffordable entry, and
+        every bar while capital is exhausted) is stepped through ``_fill_signal``. The equity curve is then broadcast
+        from the per-event state arrays in one pass.
+        
+        Returns:
+            Tuple[List[Dict], pd.DataFrame]: Trades and the per-bar portfolio frame
+        """
+        n = len(data)
+        dates = data.index
+        close = data['Close'].to_numpy(dtype=float)
+        raw = signals.to_numpy()[:n]
+        if len(raw) < n:
+            raw = np.concatenate([raw, np.zeros(n - len(raw), dtype=int)])
+        sig = np.where(raw == 1, 1, np.where(raw == -1, -1, 0))
+        
+        state = [self.initial_capital, 0, 0, 0]
+        trades: List[Dict] = []
+        event_bars: List[int] = []
+        event_states: List[Tuple] = []
+        close_factor = 1 - self.commission - self.slippage
+        
+        nz = np.flatnonzero(sig)
+        values = sig[nz]
+        breaks = np.flatnonzero(np.diff(values)) + 1
+        starts = np.concatenate([[0], breaks]) if len(nz) else np.array([], dtype=int)
+        ends = np.concatenate([breaks, [len(nz)]]) if len(nz) else np.array([], dtype=int)
+        
+        for start, end in zip(starts, ends):
+            value = int(values[start])
+            if state[1] == value:
+                continue
+            bars = nz[start:end]
+            first = int(bars[0])
+            self._fill_signal(state, first, close[first], value, trades)
+            event_bars.append(first)
+            event_states.append(tuple(state))
+            rest = bars[1:]
+            while state[1] != value and len(rest):
+                capital, position, shares, entry_price = state
+                if shares != 0 or capital <= 0:
+                    # With no capital every retry resizes shares to int(capital * 0.95 / price),
+                    # which goes non-zero (negative) and is reused by the next close: step bar by bar
+                    i = int(rest[0])
+                    self._fill_signal(state, i, close[i], value, trades)
+                    event_bars.append(i)
+                    event_states.append(tuple(state))
+                    rest = rest[1:]
+                    continue
+                # Entry was unaffordable; retry on every bar of the run until the price allows it
+                affordable = (capital * 0.95 / close[rest]).astype(np.int64) > 0
+                k = int(np.argmax(affordable)) if affordable.any() else len(rest)
+                if position == -value:
+                    # Each retry first "closes" the zero-share position
+                    skipped = rest[:k]
+                    if value == 1:
+                        profits = shares * (entry_price - close[skipped]) * close_factor
+                    else:
+                        profits = shares * (close[skipped] - entry_price) * close_factor
+                    kind = 'Cover' if value == 1 else 'Sell'
+                    for i, profit in zip(skipped, profits):
+                        capital += profit
+                        trades.append({
+                            'Date': int(i),
+                            'Type': kind,
+                            'Price': close[i],
+                            'Shares': shares,
+                            'Value': shares * close[i],
+                            'Profit': profit,
+                            'Capital': capital
+                        })
+                    state[0] = capital
+                if k == len(rest):
+                    break
+                i = int(rest[k])
+                self._fill_signal(state, i, close[i], value, trades)
+                event_bars.append(i)
+                event_states.append(tuple(state))
+                rest = rest[k + 1:]
+        
+        # Trades carry bar positions until here; box the timestamps in one pass
+        if trades:
+            trade_dates = list(dates[np.fromiter((t['Date'] for t in trades), dtype=np.int64, count=len(trades))])
+            for trade, date in zip(trades, trade_dates):
+                trade['Date'] = date
+        
+        # Equity curve: value at bar i uses the state left by the last event before i
+        ev_capital = np.array([self.initial_capital] + [s[0] for s in event_states], dtype=float)
+        ev_position = np.array([0] + [s[1] for s in event_states], dtype=np.int64)
+        # float, not int64: bankrupt runs can size share counts past int64, and the
+        # loop's int * float product converts the int to float first anyway
+        ev_shares = np.array([0] + [s[2] for s in event_states], dtype=float)
+        ev_entry = np.array([0] + [s[3] for s in event_states], dtype=float)
+        seg = np.searchsorted(np.asarray(event_bars, dtype=np.int64), np.arange(n), side='left')
+        bar_position = ev_position[seg]
+        bar_capital = ev_capital[seg]
+        pnl = ev_shares[seg] * (close - ev_entry[seg])
+        portfolio = np.where(bar_position == 0, bar_capital,
+                             np.where(bar_position == 1, bar_capital + pnl, bar_capital - pnl))
+        
+        capital, position, shares, entry_price = state
+        if position != 0:
+            final_price = data['Close'].iloc[-1]
+            if position == 1:  # Close long
+                profit = shares * (final_price - entry_price) * close_factor
+                kind = 'Sell'
+            else:  # Close short
+                profit = shares * (entry_price - final_price) * close_factor
+                kind = 'Cover'
+            trades.append({
+                'Date': data.index[-1],
+                'Type': kind,
+                'Price': final_price,
+                'Shares': shares,
+                'Value': shares * final_price,
+                'Profit': profit,
+                'Capital': capital + profit
+            })
+        
+        portfolio_value = pd.DataFrame({
+            'Portfolio_Value': portfolio,
+            'Price': close,
+            'Position': bar_position,
+            'Signal': raw
+        }, index=pd.Index(dates, name='Date'))
+        return trades, portfolio_value
     
     def calculate_performance_metrics(self) -> Dict:
         """
@@ -0,0 +1,214 @@
+"""Fixed-capacity bar storage for the live history buffers.
+
+``BarRingBuffer`` replaces the ``pd.concat(...).tail(limit)`` pattern used to
+grow the live history frames. Columns live in preallocated NumPy arrays of twice
+the capacity and every write lands in both halves, so the newest ``n`` bars are
+always one contiguous slice: appends are O(1) and time-ordered views need no
+copy. A DataFrame is only materialised on request and cached until the next
+write.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS: List[str] = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class BarRingBuffer:
+    """Time-ordered ring buffer of bars keyed by timestamp."""
+
+    def __init__(self, capacity: int, columns: Sequence[str] = OHLCV_COLUMNS) -> None:
+        if int(capacity) <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = int(capacity)
+        self._tz = None
+        self._index_name = None
+        self._configure({col: np.dtype("float64") for col in columns})
+
+    # ------------------------------------------------------------------
+    # Schema / state
+    # ------------------------------------------------------------------
+    def _configure(self, dtypes: Mapping[str, Any]) -> None:
+        size = 2 * self.capacity
+        self._columns = list(dtypes.keys())
+        self._data: Dict[str, np.ndarray] = {}
+        for col, dtype in dtypes.items():
+            arr = np.empty(size, dtype=dtype)
+            if arr.dtype.kind == "f":
+                arr.fill(np.nan)
+            self._data[col] = arr
+        self._index = np.zeros(size, dtype="int64")
+        self._pos = 0
+        self._size = 0
+        self.version = 0
+        self._frame_cache: Optional[pd.DataFrame] = None
+        self._frame_version = -1
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def empty(self) -> bool:
+        return self._size == 0
+
+    def clear(self) -> None:
+        self._pos = 0
+        self._size = 0
+        self.version += 1
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+    def _to_ns(self, timestamp) -> int:
+        ts = pd.Timestamp(timestamp)
+        if ts.tzinfo is not None and self._tz is None and self._size == 0:
+            self._tz = ts.tzinfo
+        return int(ts.value)
+
+    def _coerce(self, col: str, value: Any):
+        kind = self._data[col].dtype.kind
+        if kind == "f":
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return np.nan
+        if kind == "b":
+            return bool(value) if value == value else False
+        return value
+
+    def _write(self, slot: int, ns: int, values: Mapping[str, Any]) -> None:
+        mirror = slot + self.capacity
+        self._index[slot] = ns
+        self._index[mirror] = ns
+        for col in self._columns:
+            arr = self._data[col]
+            value = self._coerce(col, values.get(col, np.nan))
+            arr[slot] = value
+            arr[mirror] = value
+
+    def append(self, timestamp, values: Mapping[str, Any]) -> None:
+        """Append one bar, overwriting the oldest when the buffer is full."""
+        self._write(self._pos, self._to_ns(timestamp), values)
+        self._pos = (self._pos + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+        self.version += 1
+
+    def replace_last(self, timestamp, values: Mapping[str, Any]) -> None:
+        """Overwrite the newest bar in place (e.g. a revised or forming bar)."""
+        if self._size == 0:
+            self.append(timestamp, values)
+            return
+        slot = (self._pos - 1) % self.capacity
+        self._write(slot, self._to_ns(timestamp), values)
+        self.version += 1
+
+    def load(self, frame: Optional[pd.DataFrame]) -> None:
+        """Replace the contents (and column schema) with the tail of ``frame``."""
+        if frame is None or len(frame.columns) == 0:
+            self._configure({col: self._data[col].dtype for col in self._columns})
+            return
+        dtypes: Dict[str, Any] = {}
+        for col in frame.columns:
+            dtype = frame[col].dtype
+            if dtype == bool:
+                dtypes[col] = np.dtype(bool)
+            elif pd.api.types.is_numeric_dtype(dtype):
+                dtypes[col] = np.dtype("float64")
+            else:
+                dtypes[col] = np.dtype(object)
+        self._configure(dtypes)
+        self._index_name = frame.index.name
+        tail = frame.tail(self.capacity)
+        n = len(tail)
+        if n == 0:
+            return
+        index = pd.DatetimeIndex(tail.index)
+        self._tz = index.tz
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        self._index[:n] = index.as_unit("ns").asi8
+        self._index[self.capacity:self.capacity + n] = self._index[:n]
+        for col in self._columns:
+            dtype = self._data[col].dtype
+            if dtype.kind == "f":
+                values = tail[col].to_numpy(dtype=dtype, na_value=np.nan)
+            else:
+                values = tail[col].to_numpy(dtype=dtype)
+            self._data[col][:n] = values
+            self._data[col][self.capacity:self.capacity + n] = values
+        self._size = n
+        self._pos = n % self.capacity
+
+    def extend(self, frame: pd.DataFrame) -> None:
+        """Append every row of ``frame`` in order."""
+        for ts, row in zip(frame.index, frame.to_dict("records")):
+            self.append(ts, row)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def _bounds(self, n: Optional[int]) -> slice:
+        count = self._size if n is None else max(0, min(int(n), self._size))
+        end = self._pos + self.capacity
+        return slice(end - count, end)
+
+    def view(self, column: str, n: Optional[int] = None) -> np.ndarray:
+        """Read-only, time-ordered view of the newest ``n`` values (no copy)."""
+        out = self._data[column][self._bounds(n)]
+        out.flags.writeable = False
+        return out
+
+    def timestamps(self, n: Optional[int] = None) -> np.ndarray:
+        """Read-only view of the bar timestamps as int64 nanoseconds."""
+        out = self._index[self._bounds(n)]
+        out.flags.writeable = False
+        return out
+
+    def index(self, n: Optional[int] = None) -> pd.DatetimeIndex:
+        idx = pd.DatetimeIndex(self.timestamps(n).astype("datetime64[ns]"), name=self._index_name)
+        if self._tz is not None:
+            idx = idx.tz_localize("UTC").tz_convert(self._tz)
+        return idx
+
+    @property
+    def last_timestamp(self) -> Optional[pd.Timestamp]:
+        if self._size == 0:
+            return None
+        return self.index(1)[0]
+
+    def last(self, column: str, default: Any = None) -> Any:
+        if self._size == 0 or column not in self._data:
+            return default
+        return self._data[column][(self._pos - 1) % self.capacity + self.capacity].item()
+
+    def latest(self) -> Dict[str, Any]:
+        """The newest bar as a plain dict."""
+        return {col: self.last(col) for col in self._columns}
+
+    def to_frame(self, n: Optional[int] = None, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Materialise the newest ``n`` bars as a DataFrame.
+
+        The full frame is cached until the next write; treat it as read-only.
+        """
+        cols = self._columns if columns is None else [c for c in columns if c in self._data]
+        full = n is None and columns is None
+        if full and self._frame_version == self.version and self._frame_cache is not None:
+            return self._frame_cache
+        bounds = self._bounds(n)
+        frame = pd.DataFrame(
+            {col: self._data[col][bounds].copy() for col in cols},
+            index=self.index(n),
+            columns=cols,
+        )
+        if full:
+            self._frame_cache = frame
+            self._frame_version = self.version
+        return frame
@@ -0,0 +1,142 @@
+"""TTL cache for broker metadata.
+
+Lot sizing, the loss minimizer, unrealized-PnL estimates and quote spreads all
+asked the terminal for ``symbol_info``/``account_info`` directly, often several
+times per position per cycle. Each of those is an IPC round trip. This cache
+keeps the answers for a configurable time per field:
+
+* ``symbol_info`` - contract spec (point, lot limits, stops level); changes
+  rarely, so it is kept longest;
+* ``tick_value`` - ``trade_tick_value``/``trade_tick_size``; tick value moves
+  with FX rates for cross-currency symbols, so it expires sooner and refreshes
+  ``symbol_info`` with it;
+* ``account_info`` - equity/margin; kept for about a second and dropped on
+  account events (order filled, position modified or closed) via
+  :meth:`BrokerMetadataCache.on_account_event`.
+
+Failed lookups (``None``) are never cached.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .config import get_config
+from .metrics import get_metrics
+
+DEFAULT_TTLS = {
+    "symbol_info": 300.0,
+    "tick_value": 30.0,
+    "account_info": 1.0,
+}
+
+
+class BrokerMetadataCache:
+    """Per-field TTL cache with hit/miss counters."""
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, enabled: bool = True) -> None:
+        self.ttls = dict(DEFAULT_TTLS)
+        self.ttls.update({k: float(v) for k, v in (ttls or {}).items()})
+        self.enabled = enabled
+        self._entries: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = {field: 0 for field in self.ttls}
+        self.misses: Dict[str, int] = {field: 0 for field in self.ttls}
+
+    def get(self, field: str, key: str, loader: Callable[[], Any]) -> Any:
+        """Cached ``loader()`` result for (field, key), reloading once the field's TTL passed."""
+        if not self.enabled:
+            return loader()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((field, key))
+            if entry is not None and entry[0] > now:
+                self.hits[field] = self.hits.get(field, 0) + 1
+                return entry[1]
+            self.misses[field] = self.misses.get(field, 0) + 1
+        value = loader()
+        if value is not None:
+            with self._lock:
+                self._entries[(field, key)] = (time.monotonic() + self.ttls.get(field, 1.0), value)
+        return value
+
+    # ------------------------------------------------------------------
+    # Typed accessors
+    # ------------------------------------------------------------------
+    def symbol_info(self, symbol: str, loader: Callable[[], Any]) -> Any:
+        return self.get("symbol_info", symbol, loader)
+
+    def tick_value(self, symbol: str, loader: Callable[[], Any]) -> Tuple[float, float]:
+        """(trade_tick_value, trade_tick_size) for ``symbol``; ``loader`` returns symbol_info."""
+        def load():
+            # Reuse a symbol_info fetched within the tick_value TTL, otherwise refresh both
+            with self._lock:
+                entry = self._entries.get(("symbol_info", symbol))
+            fresh_after = time.monotonic() + self.ttls["symbol_info"] - self.ttls["tick_value"]
+            if entry is not None and entry[0] >= fresh_after:
+                info = entry[1]
+            else:
+                info = loader()
+                if info is None:
+                    return None
+                with self._lock:
+                    self._entries[("symbol_info", symbol)] = (time.monotonic() + self.ttls["symbol_info"], info)
+            point = float(getattr(info, "point", 0.01) or 0.01)
+            return (
+                float(getattr(info, "trade_tick_value", 1.0) or 1.0),
+                float(getattr(info, "trade_tick_size", point) or point),
+            )
+        return self.get("tick_value", symbol, load) or (1.0, 0.01)
+
+    def account_info(self, loader: Callable[[], Any]) -> Any:
+        return self.get("account_info", "", loader)
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+    def invalidate(self, field: Optional[str] = None, key: Optional[str] = None) -> None:
+        with self._lock:
+            for k in [k for k in self._entries if (field is None or k[0] == field) and (key is None or k[1] == key)]:
+                del self._entries[k]
+
+    def on_account_event(self, symbol: Optional[str] = None) -> None:
+        """An order filled or a position changed: balance, equity and margin are stale."""
+        self.invalidate("account_info")
+
+    def get_stats(self) -> Dict[str, Any]:
+        fields = sorted(set(self.hits) | set(self.misses))
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "fields": {
+                f: {
+                    "hits": self.hits.get(f, 0),
+                    "misses": self.misses.get(f, 0),
+                    "ttl_seconds": self.ttls.get(f),
+                }
+                for f in fields
+            },
+        }
+
+
+_cache: Optional[BrokerMetadataCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_broker_cache() -> BrokerMetadataCache:
+    """Process-wide cache configured from the ``broker_cache`` config section."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                cfg = get_config().get("broker_cache", {})
+                _cache = BrokerMetadataCache(
+                    ttls=cfg.get("ttl_seconds", {}),
+                    enabled=bool(cfg.get("enabled", True)),
+                )
+                metrics = get_metrics()
+                metrics.register_gauge("broker_cache_hits", lambda: sum(_cache.hits.values()))
+                metrics.register_gauge("broker_cache_misses", lambda: sum(_cache.misses.values()))
+    return _cache
@@ -0,0 +1,57 @@
+"""Single entry point for MetaTrader5 round trips.
+
+The terminal connection is process-wide, so every ``mt5.*`` call made by
+``MT5Connector`` and ``AutoTrader`` goes through :func:`broker_call`. By default
+the call simply runs on the calling thread. When the async stream runtime is
+active it installs its broker executor here, and calls made from any other
+thread (e.g. a compute worker evaluating strategies) are handed to that executor
+and awaited, so only the broker round trips themselves serialize on it.
+
+A rate limiter can be installed the same way (``StreamSupervisor`` installs its
+token bucket while it runs); every call then takes a token before it is sent,
+so order sends, modifications and symbol lookups share the supervisor's budget
+with quote polling and reconcile.
+"""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+
+_executor: Optional[Executor] = None
+_thread_prefix = ""
+_rate_limiter: Optional[Any] = None
+
+
+def set_broker_executor(executor: Optional[Executor], thread_prefix: str = "") -> None:
+    """Route broker calls to ``executor`` (``None`` restores direct calls)."""
+    global _executor, _thread_prefix
+    _executor = executor
+    _thread_prefix = thread_prefix if executor is not None else ""
+
+
+def set_rate_limiter(limiter: Optional[Any]) -> None:
+    """Take a token from ``limiter`` (anything with ``acquire()``) before each call."""
+    global _rate_limiter
+    _rate_limiter = limiter
+
+
+def get_rate_limiter() -> Optional[Any]:
+    return _rate_limiter
+
+
+def broker_call(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run ``fn(*args, **kwargs)`` on the broker executor, if one is installed."""
+    limiter = _rate_limiter
+    if limiter is not None:
+        limiter.acquire()
+    executor = _executor
+    if executor is None or threading.current_thread().name.startswith(_thread_prefix):
+        return fn(*args, **kwargs)
+    try:
+        future = executor.submit(fn, *args, **kwargs)
+    except RuntimeError:
+        # Executor shut down mid-call (runtime stopping): fall back to a direct call
+        return fn(*args, **kwargs)
+    return future.result()
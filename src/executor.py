@@ -1,4 +1,5 @@
-from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List
 import math
 
 try:
@@ -7,6 +8,10 @@ except Exception:
 	mt5 = None
 
 from .config import get_config
+from .metrics import timed
+from .broker_cache import get_broker_cache
+from .broker_gateway import broker_call
+from .margin_model import align_lot, get_margin_model
 
 
 class AutoTrader:
@@ -15,21 +20,49 @@ class AutoTrader:
 		self.symbol = symbol
 		self.enabled = self.cfg.get('execution', {}).get('enabled', False)
 
-	def _symbol_info(self):
-		info = mt5.symbol_info(self.symbol)
+	def _load_symbol_info(self):
+		info = broker_call(mt5.symbol_info, self.symbol)
 		if info is None:
-			raised = mt5.symbol_select(self.symbol, True)
-			info = mt5.symbol_info(self.symbol) if raised else None
+			raised = broker_call(mt5.symbol_select, self.symbol, True)
+			info = broker_call(mt5.symbol_info, self.symbol) if raised else None
 		return info
 
+	def _symbol_info(self):
+		return get_broker_cache().symbol_info(self.symbol, self._load_symbol_info)
+
 	def _account_info(self):
-		return mt5.account_info()
+		return get_broker_cache().account_info(lambda: broker_call(mt5.account_info))
 
 	def _max_affordable_lot(self, order_type: int, entry: float, info) -> float:
 		"""Compute the largest lot size affordable by current free margin, honoring lot grid.
 
+		Uses the calibrated margin model (one order_calc_margin check per order once
+		calibrated); falls back to the binary search if the broker cannot price margin.
 		Returns 0.0 if even the broker-minimum lot is unaffordable.
 		"""
+		try:
+			acc = self._account_info()
+			if not acc:
+				return 0.0
+			min_lot = float(info.volume_min)
+			lots = get_margin_model().max_affordable_lot(
+				lambda *a: broker_call(mt5.order_calc_margin, *a),
+				self.symbol,
+				order_type,
+				entry,
+				free_margin=float(getattr(acc, 'margin_free', 0.0) or 0.0),
+				min_lot=min_lot,
+				max_lot=max(min(float(info.volume_max), min_lot * 100), min_lot),  # same cap as the search
+				lot_step=float(info.volume_step or 0.01),
+			)
+			if lots is not None:
+				return round(lots, 2)
+		except Exception:
+			pass
+		return self._max_affordable_lot_search(order_type, entry, info)
+
+	def _max_affordable_lot_search(self, order_type: int, entry: float, info) -> float:
+		"""Binary search over order_calc_margin (fallback; up to 21 broker calls)."""
 		try:
 			acc = self._account_info()
 			if not acc:
@@ -42,7 +75,7 @@ class AutoTrader:
 				return 0.0
 			# If minimum lot fits, binary-search up to the maximum affordable
 			def fits(lots: float) -> bool:
-				m = mt5.order_calc_margin(order_type, self.symbol, lots, entry)
+				m = broker_call(mt5.order_calc_margin, order_type, self.symbol, lots, entry)
 				if m is None:
 					return False
 				return float(m) <= free_margin * 0.95
@@ -83,8 +116,7 @@ class AutoTrader:
 		point = float(info.point)
 		contract_size = float(getattr(info, 'trade_contract_size', 100))
 		# approximate tick value per lot
-		tick_value = float(getattr(info, 'trade_tick_value', 1.0))
-		tick_size = float(getattr(info, 'trade_tick_size', point))
+		tick_value, tick_size = get_broker_cache().tick_value(self.symbol, self._load_symbol_info)
 		price_risk = abs(entry - stop)
 		if price_risk <= 0:
 			return 0.0
@@ -100,12 +132,68 @@ class AutoTrader:
 		lots = max(min_lot, min(max_lot, math.floor(lots / lot_step) * lot_step))
 		return round(lots, 2)
 
+	@timed('order.place')
 	def place_market_order(self, direction: int, entry: float, sl: float, tp: float) -> Optional[Dict]:
 		if not self.enabled or mt5 is None:
 			return None
 		info = self._symbol_info()
 		if not info:
 			return None
+		request = self._prepare_order(direction, entry, sl, tp, info)
+		if request is None:
+			return None
+		result = self._send_order(request)
+		get_broker_cache().on_account_event(self.symbol)
+		return result
+
+	@timed('order.place_batch')
+	def place_market_orders(self, orders: List[Dict]) -> List[Optional[Dict]]:
+		"""Prepare every order from one symbol/account snapshot, then submit them back to back.
+
+		``orders`` items carry direction, entry, sl and tp. Free margin is split
+		evenly across the orders of each side, so the batch cannot over-commit it
+		the way serial re-sizing against a stale snapshot could. Results line up
+		with ``orders`` (None for skipped or rejected orders).
+		"""
+		results: List[Optional[Dict]] = [None] * len(orders)
+		if not orders or not self.enabled or mt5 is None:
+			return results
+		info = self._symbol_info()
+		if not info:
+			return results
+		min_lot = float(info.volume_min)
+		lot_step = float(info.volume_step or 0.01)
+		requests: Dict[int, Dict] = {}
+		for direction in {int(o['direction']) for o in orders}:
+			idx = [i for i, o in enumerate(orders) if int(o['direction']) == direction]
+			order_type = mt5.ORDER_TYPE_BUY if direction == 1 else mt5.ORDER_TYPE_SELL
+			affordable = self._max_affordable_lot(order_type, float(orders[idx[0]]['entry']), info)
+			share = align_lot(affordable / len(idx), min_lot, lot_step) if affordable > 0 else 0.0
+			if share < min_lot:
+				# Not enough margin for every order at the minimum lot: keep as many as fit
+				idx = idx[:int(affordable / min_lot + 1e-9)]
+				share = min_lot
+			for i in idx:
+				o = orders[i]
+				request = self._prepare_order(direction, float(o['entry']), float(o['sl']), float(o['tp']), info, affordable=share)
+				if request is not None:
+					requests[i] = request
+		if not requests:
+			return results
+		concurrency = int(self.cfg.get('execution', {}).get('batch_orders', {}).get('concurrency', 1))
+		if concurrency > 1 and len(requests) > 1:
+			with ThreadPoolExecutor(max_workers=min(concurrency, len(requests)), thread_name_prefix="order") as pool:
+				futures = {i: pool.submit(self._send_order, r) for i, r in requests.items()}
+				for i, f in futures.items():
+					results[i] = f.result()
+		else:
+			for i, r in requests.items():
+				results[i] = self._send_order(r)
+		get_broker_cache().on_account_event(self.symbol)
+		return results
+
+	def _prepare_order(self, direction: int, entry: float, sl: float, tp: float, info, affordable: Optional[float] = None) -> Optional[Dict]:
+		"""Size and normalize one market order; returns the order_send request or None to skip."""
 		lots = self._calc_lot(entry, sl)
 		if lots <= 0:
 			print(f"⏸️ Skip {self.symbol}: risk sizing produced non-positive lots")
@@ -142,7 +230,8 @@ class AutoTrader:
 		except Exception:
 			pass
 		# Margin-aware lot fit: cap by maximum affordable
-		affordable = self._max_affordable_lot(order_type, entry, info)
+		if affordable is None:
+			affordable = self._max_affordable_lot(order_type, entry, info)
 		min_lot = float(info.volume_min)
 		lot_step = float(info.volume_step or 0.01)
 		if affordable <= 0.0:
@@ -173,11 +262,14 @@ class AutoTrader:
 			"comment": "GetRichFR AutoTrader",
 			"type_filling": mt5.ORDER_FILLING_IOC,
 		}
-		result = mt5.order_send(request)
+		return request
+
+	def _send_order(self, request: Dict) -> Optional[Dict]:
+		result = broker_call(mt5.order_send, request)
 		if result and result.retcode == mt5.TRADE_RETCODE_DONE:
 			return {
 				"ticket": result.order,
-				"volume": lots,
+				"volume": request["volume"],
 				"price": result.price,
 			}
 		return None
@@ -186,7 +278,7 @@ class AutoTrader:
 		if mt5 is None:
 			return False
 		try:
-			position = next((p for p in mt5.positions_get() or [] if p.ticket == ticket), None)
+			position = next((p for p in broker_call(mt5.positions_get) or [] if p.ticket == ticket), None)
 			if not position:
 				return False
 			request = {
@@ -198,7 +290,8 @@ class AutoTrader:
 				"magic": 20250923,
 				"comment": "Modify SLTP",
 			}
-			result = mt5.order_send(request)
+			result = broker_call(mt5.order_send, request)
+			get_broker_cache().on_account_event(position.symbol)
 			return bool(result and result.retcode == mt5.TRADE_RETCODE_DONE)
 		except Exception:
 			return False
@@ -207,17 +300,17 @@ class AutoTrader:
 		if mt5 is None:
 			return False
 		try:
-			pos = next((p for p in mt5.positions_get() or [] if p.ticket == ticket), None)
+			pos = next((p for p in broker_call(mt5.positions_get) or [] if p.ticket == ticket), None)
 			if not pos:
 				return False
 			price = None
 			order_type = None
 			if pos.type == mt5.POSITION_TYPE_BUY:
 				order_type = mt5.ORDER_TYPE_SELL
-				price = mt5.symbol_info_tick(pos.symbol).bid
+				price = broker_call(mt5.symbol_info_tick, pos.symbol).bid
 			else:
 				order_type = mt5.ORDER_TYPE_BUY
-				price = mt5.symbol_info_tick(pos.symbol).ask
+				price = broker_call(mt5.symbol_info_tick, pos.symbol).ask
 			request = {
 				"action": mt5.TRADE_ACTION_DEAL,
 				"symbol": pos.symbol,
@@ -229,7 +322,8 @@ class AutoTrader:
 				"magic": 20250923,
 				"comment": "Close position",
 			}
-			result = mt5.order_send(request)
+			result = broker_call(mt5.order_send, request)
+			get_broker_cache().on_account_event(pos.symbol)
 			return bool(result and result.retcode == mt5.TRADE_RETCODE_DONE)
 		except Exception:
 			return False
\ No newline at end of file
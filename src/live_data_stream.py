@@ -9,7 +9,7 @@ import numpy as np
 import time
 import threading
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Callable, List
+from typing import Dict, Optional, Callable, List, Tuple
 import json
 import os
 from dataclasses import dataclass, asdict
@@ -19,6 +19,16 @@ WORKSPACE_ROOT = os.path.dirname(os.path.dirname(__file__))
 from indicators import TechnicalIndicators
 from signal_generator import SignalGenerator
 from .config import get_config
+from .streaming_indicators import StreamingIndicators
+from .bar_buffer import BarRingBuffer, OHLCV_COLUMNS
+from .timeframes import MultiTimeframeBars
+from .tick_aggregator import TickBarAggregator, M1Bar
+from .scheduler import StrategyScheduler, StrategySchedule
+from .async_stream import get_async_runtime
+from .broker_gateway import broker_call
+from .metrics import timed, timer
+from .news_calendar import is_off_session
+from .strategy_runner import MarketSnapshot, StrategyJob, StrategyResult, StrategyRunner, run_sequential
 try:
     from .mt5_connector import MT5Connector
 except ImportError:
@@ -134,13 +144,14 @@ class LiveDataStream:
             ivalue = min(ivalue, int(maximum))
         return ivalue
 
-    def __init__(self, symbol: str = "XAUUSD", update_interval: int = 30):
+    def __init__(self, symbol: str = "XAUUSD", update_interval: int = 30, persistence=None):
         """
         Initialize live data streaming
         
         Args:
             symbol (str): Symbol for Gold (XAUUSD)
             update_interval (int): Update interval in seconds
+            persistence: Shared PersistenceManager (one is created when omitted)
         """
         self.symbol = symbol  # XAUUSD for Gold
         self.update_interval = update_interval
@@ -189,8 +200,10 @@ class LiveDataStream:
         self.current_signal = None
         self.last_update = None
         self.is_running = False
+        self._async_runtime = None  # set while driven by the shared asyncio runtime
+        self.supervised = False  # polled by a StreamSupervisor instead of its own loop
         self.trading_enabled = False  # Default: OFF - user must enable manually
-        self.persistence = PersistenceManager() if PersistenceManager else None
+        self.persistence = persistence or (PersistenceManager() if PersistenceManager else None)
         self.autotrader = AutoTrader(symbol=self.symbol) if AutoTrader else None
         # Managers
         exec_cfg = self.config.get('execution', {})
@@ -198,7 +211,9 @@ class LiveDataStream:
         max_map = exec_cfg.get('campaign_max_trades', { 'LOW': 6, 'MEDIUM': 6, 'HIGH': 9 })
         min_spacing = int(exec_cfg.get('min_seconds_between_entries', 60))
         self.campaign = CampaignManager(window_minutes=window_min, max_per_level=max_map, min_spacing_seconds=min_spacing) if CampaignManager else None
-        self.order_manager = OrderManager(self.symbol) if OrderManager else None
+        self.order_manager = OrderManager(
+            self.symbol, mt5=self.mt5, persistence=self.persistence, autotrader=self.autotrader
+        ) if OrderManager else None
         # Session control override
         self.ignore_session_filter = False
         # Per-symbol event mode (manual toggle for now)
@@ -220,7 +235,7 @@ class LiveDataStream:
             if self.mt5:
                 self.mt5.symbol = self.symbol
                 import MetaTrader5 as mt5
-                mt5.symbol_select(self.symbol, True)
+                broker_call(mt5.symbol_select, self.symbol, True)
                 # Re-initialize after symbol override so connector keeps it
                 self.mt5.initialize()
         except Exception:
@@ -237,14 +252,26 @@ class LiveDataStream:
         nyupip_default = history_limits_cfg.get('nyupip_m1', 7200)
         self._history_limit_default = self._coerce_positive_int(indicator_default, 400, minimum=200)
         self._nyupip_history_limit = self._coerce_positive_int(nyupip_default, 7200, minimum=4800)
+        # Incremental indicator engine: O(1) per tick instead of recomputing the whole buffer
+        self.incremental_indicators = bool(self.config.get('data_feed', {}).get('incremental_indicators', True))
+        self.streaming_indicators = StreamingIndicators(window=self._history_limit_default)
+        self._streaming_indicators_ready = False
+        # Aggregate polled quotes into real M1 bars (one buffer row per minute)
+        self.tick_bars_enabled = bool(self.config.get('data_feed', {}).get('tick_bars', True))
+        self.tick_bars = TickBarAggregator()
+
+        # Fixed-capacity ring buffers backing historical_data / nyupip_history
+        self._indicator_bars = BarRingBuffer(self._history_limit_default)
+        self._nyupip_bars = BarRingBuffer(self._nyupip_history_limit)
+        # Shared M15/H1 bars derived from the NYUPIP M1 buffer for all strategies
+        self.timeframe_bars = MultiTimeframeBars(self._nyupip_bars)
 
         # Historical data for indicators (need minimum 200 periods)
-        self.historical_data = self._fetch_initial_data()
-        base_cols = [col for col in ["Open", "High", "Low", "Close", "Volume"] if col in self.historical_data.columns]
+        initial_data = self._fetch_initial_data()
+        base_cols = [col for col in OHLCV_COLUMNS if col in initial_data.columns]
         if base_cols:
-            self.nyupip_history = self.historical_data[base_cols].copy()
-        else:
-            self.nyupip_history = pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
+            self.nyupip_history = initial_data[base_cols]
+        self.historical_data = initial_data
 
         # NYUPIP strategy integration
         tz_name = self.config.get('sessions', {}).get('timezone', 'UTC')
@@ -269,6 +296,31 @@ class LiveDataStream:
             else None
         )
 
+        # Strategies run on their timeframe closes / price triggers rather than every tick
+        schedule_cfg = self.config.get('strategy_schedule', {})
+        self.strategy_scheduler = StrategyScheduler(
+            enabled=self.tick_bars_enabled and bool(schedule_cfg.get('enabled', True))
+        )
+        for name, strategy in (
+            ('nyupip', self.nyupip_strategy),
+            ('ict_swing', self.ict_swing_strategy),
+            ('ict_atm', self.ict_atm_strategy),
+        ):
+            if strategy is not None:
+                declared = StrategySchedule.from_mapping(getattr(strategy, 'SCHEDULE', None))
+                self.strategy_scheduler.register(name, StrategySchedule.from_mapping(schedule_cfg.get(name), declared))
+        self.tick_bars.add_listener(self.strategy_scheduler.on_bar_close)
+
+        # Due strategies can be evaluated concurrently against one bar snapshot
+        runner_cfg = self.config.get('strategy_runner', {})
+        self.strategy_runner: Optional[StrategyRunner] = None
+        if runner_cfg.get('enabled', False):
+            self.strategy_runner = StrategyRunner(
+                max_workers=self._coerce_positive_int(runner_cfg.get('max_workers'), 3, minimum=1, maximum=8),
+                default_deadline_ms=float(runner_cfg.get('deadline_ms', 2000)),
+                deadlines_ms=runner_cfg.get('deadlines_ms', {}),
+            )
+
         self.ict_swing_enabled = False
         self.ict_atm_enabled = False
         self.ict_swing_state: Dict[str, object] = {
@@ -284,6 +336,33 @@ class LiveDataStream:
             'auto_last_ticket': None,
         }
         
+    @property
+    def historical_data(self) -> pd.DataFrame:
+        """Indicator history (newest ``indicator_m1`` bars) as a read-only frame."""
+        return self._indicator_bars.to_frame()
+
+    @historical_data.setter
+    def historical_data(self, frame: pd.DataFrame):
+        self._indicator_bars.load(frame)
+
+    @property
+    def nyupip_history(self) -> pd.DataFrame:
+        """Raw OHLCV history (newest ``nyupip_m1`` bars) as a read-only frame."""
+        return self._nyupip_bars.to_frame()
+
+    @nyupip_history.setter
+    def nyupip_history(self, frame: pd.DataFrame):
+        self._nyupip_bars.load(frame)
+        self.timeframe_bars.rebuild()
+
+    def _latest_indicator(self, column: str, default: float = 0.0) -> float:
+        """Newest value of an indicator column without materialising the frame."""
+        value = self._indicator_bars.last(column, default)
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return default
+
     def _is_gold_symbol(self) -> bool:
         try:
             s = (self.symbol or "").upper()
@@ -588,6 +667,7 @@ class LiveDataStream:
         data = self.indicators.calculate_all_indicators(data)
         return data
     
+    @timed('quote_fetch')
     def _fetch_current_quote(self) -> Optional[Dict]:
         """Fetch current market quote from primary (MT5) with fallbacks"""
         # Primary: MT5
@@ -701,85 +781,309 @@ class LiveDataStream:
             'source': 'Realistic Mock'
         }
     
-    def _update_historical_data(self, current_quote: Dict):
-        """Update historical data with new quote"""
+    @timed('indicators')
+    def _update_historical_data(self, current_quote: Dict) -> Optional[M1Bar]:
+        """Update historical data with new quote.
+
+        With tick bars enabled the quote is folded into the forming M1 bar, which
+        replaces the newest buffer row until the minute rolls over; returns the
+        M1 bar closed by this quote, if any.
+        """
         # Session/blackout gating (minimal): if blocked, skip adding tradeable signal but keep data
         if self._is_blackout_or_off_session():
             pass
-        new_row = pd.DataFrame({
-            'Open': [current_quote['price']],
-            'High': [current_quote['price']],
-            'Low': [current_quote['price']],
-            'Close': [current_quote['price']],
-            'Volume': [current_quote['volume']]
-        }, index=[current_quote['timestamp']])
+        closed_bar = None
+        if self.tick_bars_enabled:
+            closed_bar, forming = self._fold_tick(current_quote)
+            if forming is None:
+                return None
+            new_row = pd.DataFrame([forming.as_row()], index=[forming.timestamp])
+        else:
+            new_row = pd.DataFrame({
+                'Open': [current_quote['price']],
+                'High': [current_quote['price']],
+                'Low': [current_quote['price']],
+                'Close': [current_quote['price']],
+                'Volume': [current_quote['volume']]
+            }, index=[current_quote['timestamp']])
         
-        # Add to historical data
-        self.historical_data = pd.concat([self.historical_data, new_row])
-
-        # Keep only recent window for fast indicator recalculation
-        if len(self.historical_data) > self._history_limit_default:
-            self.historical_data = self.historical_data.tail(self._history_limit_default)
+        if not (self.incremental_indicators and self._append_indicator_row(new_row)):
+            # Add to historical data, keeping only the recent window for fast recalculation
+            history = pd.concat([self.historical_data, new_row]).tail(self._history_limit_default)
 
-        # Recalculate indicators
-        self.historical_data = self.indicators.calculate_all_indicators(self.historical_data)
+            # Recalculate indicators
+            self.historical_data = self.indicators.calculate_all_indicators(history)
+            self._streaming_indicators_ready = False
 
         # Maintain a deeper buffer for NYUPIP strategy analysis
         nyupip_row = new_row.reindex(columns=["Open", "High", "Low", "Close", "Volume"])
-        self._update_nyupip_history(nyupip_row)
+        self._update_nyupip_history(nyupip_row, replace_last=self.tick_bars_enabled)
+        return closed_bar
 
-    def _update_nyupip_history(self, row: pd.DataFrame):
-        """Keep a long-running buffer of raw OHLC data for NYUPIP analysis."""
-        if row is None or row.empty:
-            return
+    def _fold_tick(self, current_quote: Dict):
+        """Fold a quote into the M1 aggregator; returns (closed_bar, forming_bar).
 
-        base_cols = ["Open", "High", "Low", "Close", "Volume"]
+        ``forming_bar`` is None when the quote is older than the forming minute.
+        """
+        ts = pd.Timestamp(current_quote['timestamp'])
+        if self.tick_bars.forming is None:
+            # Continue the broker's current M1 bar from startup history rather than restarting it
+            last_ts = self._nyupip_bars.last_timestamp
+            if last_ts is not None and last_ts == ts.floor(self.tick_bars.timeframe):
+                last = self._nyupip_bars.latest()
+                self.tick_bars.resume(last_ts, last['Open'], last['High'], last['Low'], last['Close'], last.get('Volume', 0.0))
+        late_before = self.tick_bars.late_ticks
+        closed_bar = self.tick_bars.add_tick(ts, current_quote['price'], current_quote.get('volume', 0.0))
+        if self.tick_bars.late_ticks != late_before:
+            return closed_bar, None
+        return closed_bar, self.tick_bars.forming
+
+    def add_bar_close_callback(self, callback: Callable[[M1Bar], None]):
+        """Add callback function to be called with each M1 bar as it closes"""
+        self.tick_bars.add_listener(callback)
+
+    def _append_indicator_row(self, new_row: pd.DataFrame) -> bool:
+        """Append one bar using the streaming indicator engine.
+
+        Returns False when the bar cannot be applied incrementally (out-of-order
+        timestamp or engine error) so the caller falls back to a full recompute.
+        """
+        try:
+            ts = new_row.index[0]
+            bars = self._indicator_bars
+            replace_last = False
+            last_ts = bars.last_timestamp
+            if last_ts is not None:
+                if ts < last_ts:
+                    return False
+                replace_last = ts == last_ts
+            if not self._streaming_indicators_ready:
+                # Warm the engine on the rows the batch path would keep alongside this bar
+                history = self.historical_data
+                base_cols = [c for c in OHLCV_COLUMNS if c in history.columns]
+                keep = self._history_limit_default - 1
+                seed_rows = history[base_cols].iloc[:-1] if replace_last else history[base_cols]
+                seed_rows = seed_rows[~seed_rows.index.duplicated(keep='last')].sort_index().tail(keep)
+                self.historical_data = self.streaming_indicators.seed(seed_rows)
+                self._streaming_indicators_ready = True
+                replace_last = False
+            bar = new_row.iloc[0]
+            values = self.streaming_indicators.update(
+                ts, bar['Open'], bar['High'], bar['Low'], bar['Close'], bar['Volume'],
+                replace_last=replace_last,
+            )
+            row = {**bar.to_dict(), **values}
+            if replace_last:
+                bars.replace_last(ts, row)
+            else:
+                bars.append(ts, row)
+            return True
+        except Exception as e:
+            print(f"⚠️ Incremental indicators error, falling back to full recompute: {e}")
+            self._streaming_indicators_ready = False
+            return False
+
+    def _update_nyupip_history(self, row: pd.DataFrame, replace_last: bool = False):
+        """Keep a long-running buffer of raw OHLC data for NYUPIP analysis.
 
-        if not hasattr(self, 'nyupip_history') or self.nyupip_history is None:
-            self.nyupip_history = pd.DataFrame(columns=base_cols)
+        With ``replace_last`` a row stamped like the newest bar (the forming M1
+        bar) overwrites it instead of being appended.
+        """
+        if row is None or row.empty:
+            return
 
-        row = row.reindex(columns=base_cols)
-        self.nyupip_history = pd.concat([self.nyupip_history, row])
+        row = row.reindex(columns=OHLCV_COLUMNS)
+        for ts, values in zip(row.index, row.to_dict("records")):
+            if replace_last and self._nyupip_bars.last_timestamp == ts:
+                self._nyupip_bars.replace_last(ts, values)
+                self.timeframe_bars.update(replace_last=True)
+            else:
+                self._nyupip_bars.append(ts, values)
+                self.timeframe_bars.update()
 
-        if len(self.nyupip_history) > self._nyupip_history_limit:
-            self.nyupip_history = self.nyupip_history.tail(self._nyupip_history_limit)
+    def _strategy_timeframes(self) -> Optional[MultiTimeframeBars]:
+        """Shared bar cache for strategy evaluation, or None while the M1 buffer is empty."""
+        if self._nyupip_bars.empty:
+            return None
+        return self.timeframe_bars
 
     def _get_nyupip_history(self) -> pd.DataFrame:
         """Return the long-form history buffer used by the NYUPIP strategy."""
-        if not hasattr(self, 'nyupip_history') or self.nyupip_history is None:
-            return pd.DataFrame(columns=["Open", "High", "Low", "Close", "Volume"])
-        return self.nyupip_history
+        return self._nyupip_bars.to_frame()
+
+    # ------------------------------------------------------------------
+    # Strategy evaluation
+    # ------------------------------------------------------------------
+    _STRATEGY_LABELS = {'nyupip': 'NYUPIP', 'ict_swing': 'ICT Swing', 'ict_atm': 'ICT ATM'}
+
+    def _market_snapshot(self, current_quote: Dict, due: List[str]) -> MarketSnapshot:
+        """Inputs for one evaluation round; frozen copies when strategies run off-thread."""
+        timeframes = self._strategy_timeframes()
+        history = None
+        ict_history = None
+        if timeframes is None:
+            if 'nyupip' in due:
+                history = self._get_nyupip_history()
+            if 'ict_swing' in due or 'ict_atm' in due:
+                # ICT strategies read the shared M15/H1 cache; the indicator buffer is
+                # only a fallback when no long-form M1 history is available yet.
+                ict_history = self.historical_data["Open"].to_frame().join(
+                    self.historical_data[[c for c in ["High", "Low", "Close", "Volume"] if c in self.historical_data.columns]],
+                    how="outer"
+                ).dropna()
+        elif self.strategy_runner is not None:
+            timeframes = timeframes.snapshot()
+        return MarketSnapshot(quote=dict(current_quote), timeframes=timeframes, history=history, ict_history=ict_history)
+
+    def _eval_nyupip(self, snapshot: MarketSnapshot):
+        signals = self.nyupip_strategy.evaluate(snapshot.history, dict(snapshot.quote), timeframes=snapshot.timeframes)
+        return signals, self.nyupip_strategy.get_last_diagnostics()
+
+    def _eval_ict_swing(self, snapshot: MarketSnapshot):
+        return self.ict_swing_strategy.evaluate(snapshot.ict_history, dict(snapshot.quote), timeframes=snapshot.timeframes)
+
+    def _eval_ict_atm(self, snapshot: MarketSnapshot):
+        return self.ict_atm_strategy.evaluate(snapshot.ict_history, dict(snapshot.quote), timeframes=snapshot.timeframes)
+
+    def _evaluate_strategies(self, current_quote: Dict, spread_block: bool, atr_block: bool):
+        """Run the due strategies, then process their signals in a fixed order on this thread."""
+        quote_ts = current_quote.get('timestamp')
+        quote_price = current_quote.get('price')
+        gold = self._is_gold_symbol()
+        candidates = (
+            ('nyupip', self.nyupip_enabled, self._eval_nyupip),
+            ('ict_swing', self.ict_swing_enabled and self.ict_swing_strategy and gold, self._eval_ict_swing),
+            ('ict_atm', self.ict_atm_enabled and self.ict_atm_strategy and gold, self._eval_ict_atm),
+        )
+        jobs = [
+            StrategyJob(name, fn) for name, active, fn in candidates
+            if active and self.strategy_scheduler.due(name, quote_ts, quote_price)
+        ]
+        if not jobs:
+            return
+        snapshot = self._market_snapshot(current_quote, [job.name for job in jobs])
+        if snapshot.timeframes is not None:
+            rows = {job.name: snapshot.timeframes.m1_rows for job in jobs}
+        else:
+            rows = {
+                job.name: len(snapshot.history if job.name == 'nyupip' else snapshot.ict_history)
+                for job in jobs
+            }
+
+        eval_time = datetime.now().strftime("%H:%M:%S")
+        for job in jobs:
+            label = self._STRATEGY_LABELS[job.name]
+            if rows[job.name] == 0:
+                print(f"🔍 [{eval_time}] {label}: Evaluating | ⚠️ No history data available")
+            else:
+                print(f"🔍 [{eval_time}] {label}: Evaluating | History: {rows[job.name]} bars")
+
+        if self.strategy_runner is not None:
+            results = self.strategy_runner.run(jobs, snapshot)
+        else:
+            results = run_sequential(jobs, snapshot)
+
+        handlers = {
+            'nyupip': self._handle_nyupip_result,
+            'ict_swing': self._handle_ict_swing_result,
+            'ict_atm': self._handle_ict_atm_result,
+        }
+        for result in results:
+            label = self._STRATEGY_LABELS[result.name]
+            now_txt = datetime.now().strftime('%H:%M:%S')
+            if result.status == 'late':
+                print(f"⏱️ [{now_txt}] {label}: Result dropped (missed {result.elapsed_ms:.0f} ms deadline)")
+                continue
+            if result.status == 'busy':
+                print(f"⏳ [{now_txt}] {label}: Previous evaluation still running, skipped")
+                continue
+            if result.status == 'error':
+                print(f"⚠️ [{now_txt}] {label} processing error: {result.error}")
+                continue
+            try:
+                self.strategy_scheduler.mark_run(result.name, quote_ts, quote_price, result.diagnostics)
+                handlers[result.name](result, eval_time, spread_block, atr_block)
+            except Exception as e:
+                print(f"⚠️ [{datetime.now().strftime('%H:%M:%S')}] {label} processing error: {e}")
+
+    def _handle_nyupip_result(self, result: StrategyResult, eval_time: str, spread_block: bool, atr_block: bool):
+        self.nyupip_state['last_diagnostics'] = result.diagnostics
+        diag = result.diagnostics
+        status = diag.get('status', 'unknown')
+        reason = diag.get('reason', 'no_reason')
+
+        if result.signals:
+            print(f"✅ [{eval_time}] NYUPIP: {len(result.signals)} signal(s) generated | Status: {status}")
+            for nyupip_signal in result.signals:
+                self._process_nyupip_signal(nyupip_signal, spread_block, atr_block)
+        else:
+            # Format reason for readability
+            reason_display = reason.replace('_', ' ').title() if reason else 'No signal conditions met'
+            print(f"⏸️ [{eval_time}] NYUPIP: No signals | Status: {status} | Reason: {reason_display}")
+
+            # Show detailed diagnostics if available
+            if diag.get('summary'):
+                summary = diag['summary']
+                zone_status = "✓" if summary.get('zone_valid') else "✗"
+                atr_status = "✓" if summary.get('atr_valid') else "✗"
+                trendline_status = "✓" if summary.get('trendline_valid') else "✗"
+                print(f"   └─ Zone: {zone_status} | ATR: {atr_status} | Trendline: {trendline_status}")
+
+    def _handle_ict_swing_result(self, result: StrategyResult, eval_time: str, spread_block: bool, atr_block: bool):
+        swing_diag = result.diagnostics
+        self.ict_swing_state['last_diagnostics'] = swing_diag
+        status = swing_diag.get('status', 'unknown')
+        reason = swing_diag.get('reason', 'no_reason')
+
+        if result.signals:
+            print(f"✅ [{eval_time}] ICT Swing: {len(result.signals)} signal(s) generated | Status: {status}")
+            for swing_signal in result.signals:
+                self._process_ict_swing_signal(swing_signal, spread_block, atr_block)
+        else:
+            # Format reason for readability
+            reason_display = reason.replace('_', ' ').title() if reason else 'No signal conditions met'
+            print(f"⏸️ [{eval_time}] ICT Swing: No signals | Status: {status} | Reason: {reason_display}")
+
+            # Show session alignment info if available
+            summary = swing_diag.get('summary', {})
+            if summary:
+                sessions = summary.get('sessions', {})
+                if sessions:
+                    asian = sessions.get('asian', {})
+                    london = sessions.get('london', {})
+                    ny = sessions.get('new_york', {})
+                    print(f"   └─ Asian: {asian.get('open', 'N/A')} | London: {london.get('open', 'N/A')} | NY: {ny.get('open', 'N/A')}")
+
+    def _handle_ict_atm_result(self, result: StrategyResult, eval_time: str, spread_block: bool, atr_block: bool):
+        atm_diag = result.diagnostics
+        self.ict_atm_state['last_diagnostics'] = atm_diag
+        status = atm_diag.get('status', 'unknown')
+        reason = atm_diag.get('reason', 'no_reason')
+
+        if result.signals:
+            print(f"✅ [{eval_time}] ICT ATM: {len(result.signals)} signal(s) generated | Status: {status}")
+            for atm_signal in result.signals:
+                self._process_ict_atm_signal(atm_signal, spread_block, atr_block)
+        else:
+            # Format reason for readability
+            reason_display = reason.replace('_', ' ').title() if reason else 'No signal conditions met'
+            print(f"⏸️ [{eval_time}] ICT ATM: No signals | Status: {status} | Reason: {reason_display}")
+
+            # Show detailed diagnostics if available
+            summary = atm_diag.get('summary', {})
+            if summary:
+                atr_current = summary.get('atr_current')
+                atr_avg = summary.get('atr_avg')
+                if atr_current is not None and atr_avg is not None:
+                    atr_ratio = atr_current / atr_avg if atr_avg > 0 else 0
+                    print(f"   └─ ATR Current: {atr_current:.2f} | ATR Avg: {atr_avg:.2f} | Ratio: {atr_ratio:.2f}x")
 
     def _is_blackout_or_off_session(self) -> bool:
         # Allow override to trade anytime
         if getattr(self, 'ignore_session_filter', False):
             return False
         try:
-            cfg = self.config
-            tz_name = cfg.get('sessions', {}).get('timezone', 'Africa/Johannesburg')
-            import pytz
-            tz = pytz.timezone(tz_name)
-            now = datetime.now(tz)
-            days = cfg.get('sessions', {}).get('days', ['Mon','Tue','Wed','Thu','Fri'])
-            day = now.strftime('%a')
-            start = cfg.get('sessions', {}).get('trade_start', '10:00')
-            end = cfg.get('sessions', {}).get('trade_end', '19:00')
-            start_h, start_m = map(int, start.split(':'))
-            end_h, end_m = map(int, end.split(':'))
-            start_dt = now.replace(hour=start_h, minute=start_m, second=0, microsecond=0)
-            end_dt = now.replace(hour=end_h, minute=end_m, second=0, microsecond=0)
-            # Same-day window (e.g., 08:00 -> 19:00)
-            if end_dt >= start_dt:
-                if day not in days:
-                    return True
-                return not (start_dt <= now <= end_dt)
-            # Overnight window crossing midnight (e.g., 20:00 -> 03:00)
-            prev_day = (now - timedelta(days=1)).strftime('%a')
-            on_session = (
-                (now >= start_dt and day in days) or  # after start today and today allowed
-                (now <= end_dt and prev_day in days)   # before end today and previous day allowed
-            )
-            return not on_session
+            return is_off_session(None, self.config.get('sessions', {}))
         except Exception:
             return False
         return False
@@ -1013,7 +1317,8 @@ class LiveDataStream:
         latest_data = self.historical_data.iloc[-1]
         
         # Generate signal using signal generator
-        signal_data = self.signal_generator.generate_all_signals(self.historical_data.tail(50))
+        with timer('generate_all_signals'):
+            signal_data = self.signal_generator.generate_all_signals(self.historical_data.tail(50))
         current_signal = signal_data['signal'].iloc[-1] if 'signal' in signal_data.columns else 0
         # Ensemble quality metrics (optional, but very useful for gating HIGH/MED to reduce chop)
         last_row = signal_data.iloc[-1] if signal_data is not None and not signal_data.empty else None
@@ -1142,9 +1447,23 @@ class LiveDataStream:
             except Exception as e:
                 print(f"⚠️ Error in callback: {e}")
     
-    def start_streaming(self):
-        """Start the live data streaming"""
+    def start_streaming(self, mode: Optional[str] = None):
+        """Start the live data streaming
+
+        ``mode`` is 'thread' (one polling thread per stream) or 'async' (the shared
+        asyncio runtime); it defaults to ``data_feed.stream_mode``.
+        """
         self.is_running = True
+        if self.supervised:
+            # The supervisor's loop picks the stream up again on its next pass
+            print(f"▶️ {self.symbol} stream resumed under supervisor")
+            return
+        feed_cfg = self.config.get('data_feed', {})
+        mode = str(mode or feed_cfg.get('stream_mode', 'thread')).lower()
+        if mode == 'async':
+            self._async_runtime = get_async_runtime(feed_cfg.get('async_runtime', {}))
+            self._async_runtime.add_stream(self)
+            return
         
         def stream_loop():
             print(f"🚀 Starting live data stream for {self.symbol}")
@@ -1156,507 +1475,402 @@ class LiveDataStream:
                     current_quote = self._fetch_current_quote()
                     
                     if current_quote:
-                        # Pre-trade guard: spread and ATR floors
-                        try:
-                            filters = self.config.get('filters', {})
-                            max_spread = float(filters.get('max_spread_points', 30))
-                            min_atr_pips = float(filters.get('min_atr_pips', 3))
-                            latest_atr = float(self.historical_data.iloc[-1].get('ATR_14', 0)) if not self.historical_data.empty else 0
-                            if current_quote.get('spread_points') and current_quote['spread_points'] > max_spread:
-                                print(f"⛔ Spread guard: {current_quote['spread_points']:.1f} > {max_spread}")
-                                # Still update data/UI but skip sends this tick
-                                spread_block = True
-                            else:
-                                spread_block = False
-                            atr_block = latest_atr < min_atr_pips
-                            if atr_block:
-                                print(f"⛔ ATR guard: ATR_14 {latest_atr:.2f} < {min_atr_pips}")
-                        except Exception:
-                            spread_block = False
-                            atr_block = False
-                        # Update historical data
-                        self._update_historical_data(current_quote)
-
-                        # Increment bar counter (used for direction-flip cooldown)
-                        try:
-                            self.bars_since_last_commit += 1
-                        except Exception:
-                            self.bars_since_last_commit = 9999
-
-                        # If spread guard is active, skip signal generation entirely
-                        if spread_block:
-                            print(f"⛔ Spread block active; skipping signal generation for this tick ({current_quote.get('spread_points')})")
-                            # Do not generate signals or persist them to avoid polluting signal stats
-                            # Sleep here to respect the configured update interval and avoid
-                            # tight loops when the spread guard is repeatedly triggered.
-                            try:
-                                time.sleep(self.update_interval)
-                            except Exception:
-                                pass
-                            continue
-
-                        # Generate signal
-                        live_signal = self._generate_live_signal(current_quote)
-                        
-                        # Store current signal
-                        self.current_signal = live_signal
-                        self.last_update = datetime.now()
-
-                        # Apply minimum-bars cooldown for direction flips
-                        try:
-                            current_dir = int(live_signal.signal)
-                        except Exception:
-                            current_dir = 0
-
-                        if current_dir == 0:
-                            # no directional signal — let the bars counter continue
-                            pass
-                        else:
-                            if self.last_committed_direction is None:
-                                # first committed direction
-                                self.last_committed_direction = current_dir
-                                self.bars_since_last_commit = 0
-                            elif current_dir == self.last_committed_direction:
-                                # continuing same direction — reset counter
-                                self.bars_since_last_commit = 0
-                            else:
-                                # direction flip detected
-                                if self.bars_since_last_commit < self.min_bars_between_direction_flips:
-                                    print(f"⛔ Cooldown: flip {self.last_committed_direction}→{current_dir} ignored ({self.bars_since_last_commit}<{self.min_bars_between_direction_flips})")
-                                    # Mute the flip to avoid churn: convert to HOLD
-                                    live_signal.signal = 0
-                                    live_signal.signal_type = "COOLDOWN"
-                                    live_signal.confidence = min(live_signal.confidence, 50.0)
-                                else:
-                                    # allow flip
-                                    self.last_committed_direction = current_dir
-                                    self.bars_since_last_commit = 0
-
-                        # Persist signal
-                        if self.persistence:
-                            try:
-                                self.persistence.save_signal(asdict(live_signal))
-                            except Exception as e:
-                                print(f"⚠️ Persist error: {e}")
-                        
-                        # Notify callbacks
-                        self._notify_callbacks(live_signal)
-                        
-                        # Print update
-                        print(f"🔄 {live_signal.timestamp} | {live_signal.symbol} | ${live_signal.current_price:.2f} | {live_signal.signal_type} ({live_signal.confidence:.1f}%)")
-
-                        # Event override path
-                        if self.event_mode_enabled and self.event_engine:
-                            try:
-                                latest = self.historical_data.iloc[-1]
-                                high = float(latest.get('High', current_quote['price']))
-                                low = float(latest.get('Low', current_quote['price']))
-                                atr_val = float(latest.get('ATR_14', 0))
-                                self.event_engine.try_detect_spike(high, low, atr_val)
-                                idea = self.event_engine.generate_signal(current_quote['price'])
-                                if idea and not spread_block and self.trading_enabled:
-                                    side = idea['direction']
-                                    entry = idea['entry']
-                                    sl = idea['sl']
-                                    tp = idea['tp']
-                                    trade = self.autotrader.place_market_order(side, entry, sl, tp)
-                                    if trade and self.persistence:
-                                        self.persistence.save_trade({
-                                            'timestamp': live_signal.timestamp,
-                                            'symbol': live_signal.symbol,
-                                            'direction': side,
-                                            'entry': entry,
-                                            'sl': sl,
-                                            'tp': tp,
-                                            'lots': trade.get('volume', 0.0),
-                                            'ticket': trade.get('ticket', 0),
-                                            'status': 'SENT',
-                                            'alert_level': 'EVENT',
-                                            'tier': 'EVENT',
-                                            'engine': 'EVENT'
-                                        })
-                                        print(f"⚡ [EVENT] order sent: ticket={trade.get('ticket')} entry={entry:.2f} sl={sl:.2f} tp={tp:.2f}")
-                            except Exception as e:
-                                print(f"⚠️ Event engine error: {e}")
-
-                        # Auto-trading (opt-in) with campaign and per-alert logic
-                        if (
-                            self.autotrader
-                            and self.autotrader.enabled
-                            and self.trading_enabled
-                            and live_signal.signal != 0
-                            and not self._is_blackout_or_off_session()
-                            and not spread_block
-                            and not atr_block
-                            and not self.event_mode_enabled
-                        ):
-                            # Respect per-symbol daily loss cap halt
-                            if self.order_manager and getattr(self.order_manager, 'halt_new_orders', False):
-                                print(f"⏸️ Halt new orders (daily cap) for {self.symbol}")
-                                continue
-                            level = (live_signal.alert_level or 'LOW').upper()
-                            side = 1 if live_signal.signal == 1 else -1
-                            engine_mode = getattr(self, 'engine_mode', 'ALL')
-                            general_allowed = True
-                            farmer_allowed = self.farmer_enabled
-
-                            if engine_mode == 'NONE':
-                                general_allowed = False
-                                farmer_allowed = False
-                            elif engine_mode == 'FARMER_ONLY':
-                                general_allowed = False
-                            elif engine_mode == 'LOW_ONLY':
-                                general_allowed = (level == 'LOW')
-                                farmer_allowed = False
-                            elif engine_mode == 'MEDIUM_ONLY':
-                                general_allowed = (level == 'MEDIUM')
-                                farmer_allowed = False
-                            elif engine_mode == 'HIGH_ONLY':
-                                general_allowed = (level == 'HIGH')
-                                farmer_allowed = False
-                            elif engine_mode == 'EVENT_ONLY':
-                                general_allowed = False
-                                farmer_allowed = False
-
-                            if general_allowed:
-                                # Per-engine gating
-                                if level == 'LOW' and not self.enable_low:
-                                    print("⏸️ Engine gated: LOW disabled")
-                                elif level == 'MEDIUM' and not self.enable_medium:
-                                    print("⏸️ Engine gated: MEDIUM disabled")
-                                elif level == 'HIGH' and not self.enable_high:
-                                    print("⏸️ Engine gated: HIGH disabled")
-                                else:
-                                    # Additional quality gates (configurable) for HIGH/MEDIUM to reduce chop losses.
-                                    # These are designed to trade less, but cleaner.
-                                    try:
-                                        qcfg = (self.config.get('filters', {}) or {}).get('quality_gates', {}) or {}
-                                        enable_qg = bool(qcfg.get('enabled', True))
-                                    except Exception:
-                                        enable_qg = True
-                                        qcfg = {}
-
-                                    if enable_qg and level in {'HIGH', 'MEDIUM'}:
-                                        try:
-                                            # Defaults: require at least 3-4 agreeing signals out of 7 total (43-57% consensus)
-                                            # This balances quality vs. opportunity - too strict blocks good trades, too loose allows chop
-                                            min_strength = float(qcfg.get(f"min_signal_strength_{level.lower()}", 3 if level == 'HIGH' else 2))
-                                            min_vote_margin = float(qcfg.get(f"min_vote_margin_{level.lower()}", 2 if level == 'HIGH' else 1))
-                                            require_sma200 = bool(qcfg.get('require_sma200_trend', True))
-
-                                            # Ensemble vote margin: how strong the majority is
-                                            vote_margin = abs(float(getattr(live_signal, 'signal_vote_sum', 0.0)))
-                                            # Use agreeing votes (pos_votes for BUY, neg_votes for SELL) instead of total signal_strength
-                                            pos_votes = int(getattr(live_signal, 'signal_pos_votes', 0))
-                                            neg_votes = int(getattr(live_signal, 'signal_neg_votes', 0))
-                                            agreeing_votes = pos_votes if side == 1 else neg_votes
-
-                                            if agreeing_votes < min_strength:
-                                                print(f"⛔ Quality gate: {level} blocked (agreeing_votes {agreeing_votes} < {min_strength}, pos={pos_votes} neg={neg_votes})")
-                                                continue
-                                            if vote_margin < min_vote_margin:
-                                                print(f"⛔ Quality gate: {level} blocked (vote_margin {vote_margin:.1f} < {min_vote_margin})")
-                                                continue
-
-                                            # Higher-timeframe trend alignment using SMA_200 if available
-                                            if require_sma200:
-                                                try:
-                                                    sma200 = float(latest_data.get('SMA_200', float('nan')))
-                                                    price = float(latest_data.get('Close', live_signal.current_price))
-                                                    if not np.isnan(sma200):
-                                                        if side == 1 and price < sma200:
-                                                            print(f"⛔ Trend gate: {level} BUY blocked (price {price:.2f} < SMA_200 {sma200:.2f})")
-                                                            continue
-                                                        if side == -1 and price > sma200:
-                                                            print(f"⛔ Trend gate: {level} SELL blocked (price {price:.2f} > SMA_200 {sma200:.2f})")
-                                                            continue
-                                                except Exception:
-                                                    # If SMA_200 not available, don't block; avoid breaking live runs
-                                                    pass
-                                        except Exception as e:
-                                            print(f"⚠️ Quality gate error (ignored): {e}")
-
-                                    # campaign check
-                                    if self.campaign and not self.campaign.allow(self.symbol, side, level):
-                                        print(f"⛔ Campaign limit reached for {level} {('BUY' if side==1 else 'SELL')}")
-                                    else:
-                                        # Determine TP by level/tiering
-                                        tp = live_signal.take_profit_1
-                                        cfg_exec = self.config.get('execution', {})
-                                        if level == 'LOW':
-                                            tp_pips = int(cfg_exec.get('low_tp_pips', 5))
-                                            tp_low_abs = live_signal.entry_price + (tp_pips if side==1 else -tp_pips)
-                                            tp = tp_low_abs
-                                        elif level == 'MEDIUM':
-                                            tp_pips = int(cfg_exec.get('medium_tp_primary_pips', 9))
-                                            tp_med_abs = live_signal.entry_price + (tp_pips if side==1 else -tp_pips)
-                                            tp = tp_med_abs
-                                        # HIGH: allow tiered spawning counts
-                                        tiers = []
-                                        if level == 'HIGH':
-                                            tier_cfg = cfg_exec.get('high_tier_tp_pips', { 'tier1_count':2,'tier1_pips':6,'tier2_count':3,'tier2_pips':9 })
-                                            tiers = (
-                                                [('TIER1', tier_cfg.get('tier1_pips',6))]*int(tier_cfg.get('tier1_count',2)) +
-                                                [('TIER2', tier_cfg.get('tier2_pips',9))]*int(tier_cfg.get('tier2_count',3))
-                                            )
-                                        # Spawn orders
-                                        def send_one(tier_name: Optional[str], tp_pips_override: Optional[int], tp_absolute: Optional[float] = None, engine: str = "INTRADAY"):
-                                            nonlocal live_signal
-                                            sl = live_signal.stop_loss
-                                            entry = live_signal.entry_price
-                                            local_tp = live_signal.take_profit_1
-                                            if tp_absolute is not None:
-                                                local_tp = tp_absolute
-                                            elif tp_pips_override is not None:
-                                                local_tp = entry + (tp_pips_override if side==1 else -tp_pips_override)
-                                            trade = self.autotrader.place_market_order(side, entry, sl, local_tp)
-                                            if trade and self.persistence:
-                                                try:
-                                                    self.persistence.save_trade({
-                                                        'timestamp': live_signal.timestamp,
-                                                        'symbol': live_signal.symbol,
-                                                        'direction': side,
-                                                        'entry': entry,
-                                                        'sl': sl,
-                                                        'tp': local_tp,
-                                                        'lots': trade.get('volume', 0.0),
-                                                        'ticket': trade.get('ticket', 0),
-                                                        'status': 'SENT',
-                                                        'alert_level': level,
-                                                        'tier': tier_name or '',
-                                                        'engine': engine
-                                                    })
-                                                    print(f"✅ [{engine}] Order sent: ticket={trade.get('ticket')} lots={trade.get('volume')} tier={tier_name or 'BASE'}")
-                                                    if self.order_manager:
-                                                        self.order_manager.register_new_order(trade.get('ticket'), side, entry, sl, local_tp, level, tier=tier_name)
-                                                    if self.campaign:
-                                                        self.campaign.record(self.symbol, side, level)
-                                                except Exception as e:
-                                                    print(f"⚠️ Trade persist error: {e}")
-                                        if level == 'HIGH' and tiers:
-                                            # Send tiered partials first
-                                            for tier_name, pips in tiers:
-                                                if not self.campaign or self.campaign.allow(self.symbol, side, level):
-                                                    send_one(tier_name, pips, engine="INTRADAY_HIGH")
-                                            # Remaining up to campaign limit use base TP
-                                            if not self.campaign or self.campaign.allow(self.symbol, side, level):
-                                                send_one(None, None, engine="INTRADAY_HIGH")
-                                        else:
-                                            # LOW/MEDIUM use absolute TP we computed
-                                            engine_name = "INTRADAY_LOW" if level=="LOW" else ("INTRADAY_MED" if level=="MEDIUM" else "INTRADAY")
-                                            send_one(None, None, tp_absolute=tp, engine=engine_name)
-                            else:
-                                if engine_mode == 'NONE':
-                                    print("⏸️ Engine mode NONE blocking automated entries")
-                                elif engine_mode == 'FARMER_ONLY':
-                                    print("⏸️ Engine mode FARMER_ONLY skipping tiered engines")
-                                elif engine_mode.endswith('_ONLY'):
-                                    print(f"⏸️ Engine mode {engine_mode} skipping {level} signal")
-
-                            # 2-pip farmer (runs alongside, subject to farmer cycle)
-                            try:
-                                # Farmer runs independently every cycle when a non-HOLD signal exists,
-                                # but piggybacks the HIGH campaign gate.
-                                if farmer_allowed and self.trading_enabled and live_signal.signal != 0:
-                                    now = datetime.now()
-                                    if not self._farmer_last_cycle or (now - self._farmer_last_cycle).total_seconds() >= self.farmer_cycle_seconds:
-                                        self._farmer_last_cycle = now
-                                        farmer_cfg = self.config.get('execution', {}).get('farmer', {})
-                                        # Dynamic TP by ATR if enabled
-                                        dyn = bool(farmer_cfg.get('dynamic_tp', True))
-                                        atr_val = float(self.historical_data.iloc[-1].get('ATR_14', 0)) if not self.historical_data.empty else 0
-                                        base_tp = int(farmer_cfg.get('tp_pips', 2))
-                                        if dyn:
-                                            if atr_val >= 20:
-                                                tp_pips = min(5, base_tp + 2)
-                                            elif atr_val >= 12:
-                                                tp_pips = min(4, base_tp + 1)
-                                            else:
-                                                tp_pips = base_tp
-                                        else:
-                                            tp_pips = base_tp
-                                        sl_pips = int(farmer_cfg.get('sl_pips', 6))
-                                        count = int(farmer_cfg.get('trades_per_cycle', 3))
-                                        # place burst of small TP orders
-                                        for i in range(count):
-                                            # piggyback HIGH gate regardless of current alert level
-                                            if self.campaign and not self.campaign.allow(self.symbol, side, 'HIGH'):
-                                                break
-                                            entry = live_signal.entry_price
-                                            sl = entry - sl_pips if side == 1 else entry + sl_pips
-                                            tp_small = entry + tp_pips if side == 1 else entry - tp_pips
-                                            trade = self.autotrader.place_market_order(side, entry, sl, tp_small)
-                                            if trade and self.persistence:
-                                                try:
-                                                    self.persistence.save_trade({
-                                                        'timestamp': live_signal.timestamp,
-                                                        'symbol': live_signal.symbol,
-                                                        'direction': side,
-                                                        'entry': entry,
-                                                        'sl': sl,
-                                                        'tp': tp_small,
-                                                        'lots': trade.get('volume', 0.0),
-                                                        'ticket': trade.get('ticket', 0),
-                                                        'status': 'SENT',
-                                                        'alert_level': 'HIGH',
-                                                        'tier': 'FARMER',
-                                                        'engine': 'FARMER'
-                                                    })
-                                                    if self.order_manager:
-                                                        self.order_manager.register_new_order(trade.get('ticket'), side, entry, sl, tp_small, 'HIGH', tier='FARMER')
-                                                    if self.campaign:
-                                                        self.campaign.record(self.symbol, side, 'HIGH')
-                                                    print(f"🌾 Farmer order sent: ticket={trade.get('ticket')} tp={tp_pips}p atr={atr_val:.2f}")
-                                                except Exception as e:
-                                                    print(f"⚠️ Farmer persist error: {e}")
-                            except Exception:
-                                pass
-
-                        if self.nyupip_enabled:
-                            try:
-                                eval_time = datetime.now().strftime("%H:%M:%S")
-                                nyupip_history = self._get_nyupip_history()
-                                
-                                if nyupip_history is None or nyupip_history.empty:
-                                    print(f"🔍 [{eval_time}] NYUPIP: Evaluating | ⚠️ No history data available")
-                                else:
-                                    print(f"🔍 [{eval_time}] NYUPIP: Evaluating | History: {len(nyupip_history)} bars")
-                                
-                                nyupip_signals = self.nyupip_strategy.evaluate(nyupip_history.copy(), current_quote)
-                                self.nyupip_state['last_diagnostics'] = self.nyupip_strategy.get_last_diagnostics()
-                                
-                                diag = self.nyupip_state.get('last_diagnostics', {})
-                                status = diag.get('status', 'unknown')
-                                reason = diag.get('reason', 'no_reason')
-                                
-                                if nyupip_signals:
-                                    print(f"✅ [{eval_time}] NYUPIP: {len(nyupip_signals)} signal(s) generated | Status: {status}")
-                                    for nyupip_signal in nyupip_signals:
-                                        self._process_nyupip_signal(nyupip_signal, spread_block, atr_block)
-                                else:
-                                    # Format reason for readability
-                                    reason_display = reason.replace('_', ' ').title() if reason else 'No signal conditions met'
-                                    print(f"⏸️ [{eval_time}] NYUPIP: No signals | Status: {status} | Reason: {reason_display}")
-                                    
-                                    # Show detailed diagnostics if available
-                                    if diag.get('summary'):
-                                        summary = diag['summary']
-                                        zone_status = "✓" if summary.get('zone_valid') else "✗"
-                                        atr_status = "✓" if summary.get('atr_valid') else "✗"
-                                        trendline_status = "✓" if summary.get('trendline_valid') else "✗"
-                                        print(f"   └─ Zone: {zone_status} | ATR: {atr_status} | Trendline: {trendline_status}")
-                                        
-                            except Exception as e:
-                                print(f"⚠️ [{datetime.now().strftime('%H:%M:%S')}] NYUPIP processing error: {e}")
-
-                        strategy_history = None
-                        try:
-                            history_source = self._get_nyupip_history()
-                            if history_source is not None and not history_source.empty:
-                                strategy_history = history_source.copy()
-                        except Exception:
-                            strategy_history = None
-                        if strategy_history is None or strategy_history.empty:
-                            strategy_history = self.historical_data["Open"].to_frame().join(
-                                self.historical_data[[c for c in ["High", "Low", "Close", "Volume"] if c in self.historical_data.columns]],
-                                how="outer"
-                            ).dropna()
-
-                        if self.ict_swing_enabled and self.ict_swing_strategy and self._is_gold_symbol():
-                            try:
-                                eval_time = datetime.now().strftime("%H:%M:%S")
-                                
-                                if strategy_history is None or strategy_history.empty:
-                                    print(f"🔍 [{eval_time}] ICT Swing: Evaluating | ⚠️ No history data available")
-                                else:
-                                    print(f"🔍 [{eval_time}] ICT Swing: Evaluating | History: {len(strategy_history)} bars")
-                                
-                                swing_signals, swing_diag = self.ict_swing_strategy.evaluate(strategy_history, current_quote)
-                                self.ict_swing_state['last_diagnostics'] = swing_diag
-                                
-                                status = swing_diag.get('status', 'unknown')
-                                reason = swing_diag.get('reason', 'no_reason')
-                                
-                                if swing_signals:
-                                    print(f"✅ [{eval_time}] ICT Swing: {len(swing_signals)} signal(s) generated | Status: {status}")
-                                    for swing_signal in swing_signals:
-                                        self._process_ict_swing_signal(swing_signal, spread_block, atr_block)
-                                else:
-                                    # Format reason for readability
-                                    reason_display = reason.replace('_', ' ').title() if reason else 'No signal conditions met'
-                                    print(f"⏸️ [{eval_time}] ICT Swing: No signals | Status: {status} | Reason: {reason_display}")
-                                    
-                                    # Show session alignment info if available
-                                    summary = swing_diag.get('summary', {})
-                                    if summary:
-                                        sessions = summary.get('sessions', {})
-                                        if sessions:
-                                            asian = sessions.get('asian', {})
-                                            london = sessions.get('london', {})
-                                            ny = sessions.get('new_york', {})
-                                            print(f"   └─ Asian: {asian.get('open', 'N/A')} | London: {london.get('open', 'N/A')} | NY: {ny.get('open', 'N/A')}")
-                                        
-                            except Exception as e:
-                                print(f"⚠️ [{datetime.now().strftime('%H:%M:%S')}] ICT Swing processing error: {e}")
-
-                        if self.ict_atm_enabled and self.ict_atm_strategy and self._is_gold_symbol():
-                            try:
-                                eval_time = datetime.now().strftime("%H:%M:%S")
-                                
-                                if strategy_history is None or strategy_history.empty:
-                                    print(f"🔍 [{eval_time}] ICT ATM: Evaluating | ⚠️ No history data available")
-                                else:
-                                    print(f"🔍 [{eval_time}] ICT ATM: Evaluating | History: {len(strategy_history)} bars")
-                                
-                                atm_signals, atm_diag = self.ict_atm_strategy.evaluate(strategy_history, current_quote)
-                                self.ict_atm_state['last_diagnostics'] = atm_diag
-                                
-                                status = atm_diag.get('status', 'unknown')
-                                reason = atm_diag.get('reason', 'no_reason')
-                                
-                                if atm_signals:
-                                    print(f"✅ [{eval_time}] ICT ATM: {len(atm_signals)} signal(s) generated | Status: {status}")
-                                    for atm_signal in atm_signals:
-                                        self._process_ict_atm_signal(atm_signal, spread_block, atr_block)
-                                else:
-                                    # Format reason for readability
-                                    reason_display = reason.replace('_', ' ').title() if reason else 'No signal conditions met'
-                                    print(f"⏸️ [{eval_time}] ICT ATM: No signals | Status: {status} | Reason: {reason_display}")
-                                    
-                                    # Show detailed diagnostics if available
-                                    summary = atm_diag.get('summary', {})
-                                    if summary:
-                                        atr_current = summary.get('atr_current')
-                                        atr_avg = summary.get('atr_avg')
-                                        if atr_current is not None and atr_avg is not None:
-                                            atr_ratio = atr_current / atr_avg if atr_avg > 0 else 0
-                                            print(f"   └─ ATR Current: {atr_current:.2f} | ATR Avg: {atr_avg:.2f} | Ratio: {atr_ratio:.2f}x")
-                                        
-                            except Exception as e:
-                                print(f"⚠️ [{datetime.now().strftime('%H:%M:%S')}] ICT ATM processing error: {e}")
-                        
+                        self._process_quote(current_quote)
                     else:
                         print("⚠️ Failed to fetch current quote")
                 
                 except Exception as e:
                     print(f"❌ Error in streaming loop: {e}")
                 
-                # Reconcile positions periodically
-                try:
-                    if self.order_manager:
-                        self.order_manager.reconcile()
-                except Exception:
-                    pass
+                self._reconcile_positions()
                 # Wait for next update
                 time.sleep(self.update_interval)
         
         # Start streaming in background thread
         self.stream_thread = threading.Thread(target=stream_loop, daemon=True)
         self.stream_thread.start()
+
+    @timed('tick_total')
+    def _process_quote(self, current_quote: Dict):
+        """Run one stream cycle (guards, signal, trading, strategies) for a fetched quote."""
+        # Pre-trade guard: spread and ATR floors
+        try:
+            filters = self.config.get('filters', {})
+            max_spread = float(filters.get('max_spread_points', 30))
+            min_atr_pips = float(filters.get('min_atr_pips', 3))
+            latest_atr = self._latest_indicator('ATR_14')
+            if current_quote.get('spread_points') and current_quote['spread_points'] > max_spread:
+                print(f"⛔ Spread guard: {current_quote['spread_points']:.1f} > {max_spread}")
+                # Still update data/UI but skip sends this tick
+                spread_block = True
+            else:
+                spread_block = False
+            atr_block = latest_atr < min_atr_pips
+            if atr_block:
+                print(f"⛔ ATR guard: ATR_14 {latest_atr:.2f} < {min_atr_pips}")
+        except Exception:
+            spread_block = False
+            atr_block = False
+        # Update historical data
+        closed_bar = self._update_historical_data(current_quote)
+
+        # Increment bar counter (used for direction-flip cooldown); with tick
+        # bars this counts closed M1 bars rather than polls
+        if closed_bar is not None or not self.tick_bars_enabled:
+            try:
+                self.bars_since_last_commit += 1
+            except Exception:
+                self.bars_since_last_commit = 9999
+
+        # If spread guard is active, skip signal generation entirely
+        if spread_block:
+            print(f"⛔ Spread block active; skipping signal generation for this tick ({current_quote.get('spread_points')})")
+            # Do not generate signals or persist them to avoid polluting signal stats
+            return
+
+        # Generate signal
+        live_signal = self._generate_live_signal(current_quote)
+        
+        # Store current signal
+        self.current_signal = live_signal
+        self.last_update = datetime.now()
+
+        # Apply minimum-bars cooldown for direction flips
+        try:
+            current_dir = int(live_signal.signal)
+        except Exception:
+            current_dir = 0
+
+        if current_dir == 0:
+            # no directional signal — let the bars counter continue
+            pass
+        else:
+            if self.last_committed_direction is None:
+                # first committed direction
+                self.last_committed_direction = current_dir
+                self.bars_since_last_commit = 0
+            elif current_dir == self.last_committed_direction:
+                # continuing same direction — reset counter
+                self.bars_since_last_commit = 0
+            else:
+                # direction flip detected
+                if self.bars_since_last_commit < self.min_bars_between_direction_flips:
+                    print(f"⛔ Cooldown: flip {self.last_committed_direction}→{current_dir} ignored ({self.bars_since_last_commit}<{self.min_bars_between_direction_flips})")
+                    # Mute the flip to avoid churn: convert to HOLD
+                    live_signal.signal = 0
+                    live_signal.signal_type = "COOLDOWN"
+                    live_signal.confidence = min(live_signal.confidence, 50.0)
+                else:
+                    # allow flip
+                    self.last_committed_direction = current_dir
+                    self.bars_since_last_commit = 0
+
+        # Persist signal and notify callbacks (inline, or as tasks in async mode)
+        if self.persistence:
+            self._dispatch(self._persist_signal, asdict(live_signal))
+        self._dispatch(self._notify_callbacks, live_signal)
+        
+        # Print update
+        print(f"🔄 {live_signal.timestamp} | {live_signal.symbol} | ${live_signal.current_price:.2f} | {live_signal.signal_type} ({live_signal.confidence:.1f}%)")
+
+        # Event override path
+        if self.event_mode_enabled and self.event_engine:
+            try:
+                latest = self.historical_data.iloc[-1]
+                high = float(latest.get('High', current_quote['price']))
+                low = float(latest.get('Low', current_quote['price']))
+                atr_val = float(latest.get('ATR_14', 0))
+                self.event_engine.try_detect_spike(high, low, atr_val)
+                idea = self.event_engine.generate_signal(current_quote['price'])
+                if idea and not spread_block and self.trading_enabled:
+                    side = idea['direction']
+                    entry = idea['entry']
+                    sl = idea['sl']
+                    tp = idea['tp']
+                    trade = self.autotrader.place_market_order(side, entry, sl, tp)
+                    if trade and self.persistence:
+                        self.persistence.save_trade({
+                            'timestamp': live_signal.timestamp,
+                            'symbol': live_signal.symbol,
+                            'direction': side,
+                            'entry': entry,
+                            'sl': sl,
+                            'tp': tp,
+                            'lots': trade.get('volume', 0.0),
+                            'ticket': trade.get('ticket', 0),
+                            'status': 'SENT',
+                            'alert_level': 'EVENT',
+                            'tier': 'EVENT',
+                            'engine': 'EVENT'
+                        })
+                        print(f"⚡ [EVENT] order sent: ticket={trade.get('ticket')} entry={entry:.2f} sl={sl:.2f} tp={tp:.2f}")
+            except Exception as e:
+                print(f"⚠️ Event engine error: {e}")
+
+        # Auto-trading (opt-in) with campaign and per-alert logic
+        if (
+            self.autotrader
+            and self.autotrader.enabled
+            and self.trading_enabled
+            and live_signal.signal != 0
+            and not self._is_blackout_or_off_session()
+            and not spread_block
+            and not atr_block
+            and not self.event_mode_enabled
+        ):
+            # Respect per-symbol daily loss cap halt
+            if self.order_manager and getattr(self.order_manager, 'halt_new_orders', False):
+                print(f"⏸️ Halt new orders (daily cap) for {self.symbol}")
+                return
+            level = (live_signal.alert_level or 'LOW').upper()
+            side = 1 if live_signal.signal == 1 else -1
+            engine_mode = getattr(self, 'engine_mode', 'ALL')
+            general_allowed = True
+            farmer_allowed = self.farmer_enabled
+
+            if engine_mode == 'NONE':
+                general_allowed = False
+                farmer_allowed = False
+            elif engine_mode == 'FARMER_ONLY':
+                general_allowed = False
+            elif engine_mode == 'LOW_ONLY':
+                general_allowed = (level == 'LOW')
+                farmer_allowed = False
+            elif engine_mode == 'MEDIUM_ONLY':
+                general_allowed = (level == 'MEDIUM')
+                farmer_allowed = False
+            elif engine_mode == 'HIGH_ONLY':
+                general_allowed = (level == 'HIGH')
+                farmer_allowed = False
+            elif engine_mode == 'EVENT_ONLY':
+                general_allowed = False
+                farmer_allowed = False
+
+            if general_allowed:
+                # Per-engine gating
+                if level == 'LOW' and not self.enable_low:
+                    print("⏸️ Engine gated: LOW disabled")
+                elif level == 'MEDIUM' and not self.enable_medium:
+                    print("⏸️ Engine gated: MEDIUM disabled")
+                elif level == 'HIGH' and not self.enable_high:
+                    print("⏸️ Engine gated: HIGH disabled")
+                else:
+                    # Additional quality gates (configurable) for HIGH/MEDIUM to reduce chop losses.
+                    # These are designed to trade less, but cleaner.
+                    try:
+                        qcfg = (self.config.get('filters', {}) or {}).get('quality_gates', {}) or {}
+                        enable_qg = bool(qcfg.get('enabled', True))
+                    except Exception:
+                        enable_qg = True
+                        qcfg = {}
+
+                    if enable_qg and level in {'HIGH', 'MEDIUM'}:
+                        try:
+                            # Defaults: require at least 3-4 agreeing signals out of 7 total (43-57% consensus)
+                            # This balances quality vs. opportunity - too strict blocks good trades, too loose allows chop
+                            min_strength = float(qcfg.get(f"min_signal_strength_{level.lower()}", 3 if level == 'HIGH' else 2))
+                            min_vote_margin = float(qcfg.get(f"min_vote_margin_{level.lower()}", 2 if level == 'HIGH' else 1))
+                            require_sma200 = bool(qcfg.get('require_sma200_trend', True))
+
+                            # Ensemble vote margin: how strong the majority is
+                            vote_margin = abs(float(getattr(live_signal, 'signal_vote_sum', 0.0)))
+                            # Use agreeing votes (pos_votes for BUY, neg_votes for SELL) instead of total signal_strength
+                            pos_votes = int(getattr(live_signal, 'signal_pos_votes', 0))
+                            neg_votes = int(getattr(live_signal, 'signal_neg_votes', 0))
+                            agreeing_votes = pos_votes if side == 1 else neg_votes
+
+                            if agreeing_votes < min_strength:
+                                print(f"⛔ Quality gate: {level} blocked (agreeing_votes {agreeing_votes} < {min_strength}, pos={pos_votes} neg={neg_votes})")
+                                return
+                            if vote_margin < min_vote_margin:
+                                print(f"⛔ Quality gate: {level} blocked (vote_margin {vote_margin:.1f} < {min_vote_margin})")
+                                return
+
+                            # Higher-timeframe trend alignment using SMA_200 if available
+                            if require_sma200:
+                                try:
+                                    sma200 = float(latest_data.get('SMA_200', float('nan')))
+                                    price = float(latest_data.get('Close', live_signal.current_price))
+                                    if not np.isnan(sma200):
+                                        if side == 1 and price < sma200:
+                                            print(f"⛔ Trend gate: {level} BUY blocked (price {price:.2f} < SMA_200 {sma200:.2f})")
+                                            return
+                                        if side == -1 and price > sma200:
+                                            print(f"⛔ Trend gate: {level} SELL blocked (price {price:.2f} > SMA_200 {sma200:.2f})")
+                                            return
+                                except Exception:
+                                    # If SMA_200 not available, don't block; avoid breaking live runs
+                                    pass
+                        except Exception as e:
+                            print(f"⚠️ Quality gate error (ignored): {e}")
+
+                    # campaign check
+                    if self.campaign and not self.campaign.allow(self.symbol, side, level):
+                        print(f"⛔ Campaign limit reached for {level} {('BUY' if side==1 else 'SELL')}")
+                    else:
+                        # Determine TP by level/tiering
+                        tp = live_signal.take_profit_1
+                        cfg_exec = self.config.get('execution', {})
+                        if level == 'LOW':
+                            tp_pips = int(cfg_exec.get('low_tp_pips', 5))
+                            tp_low_abs = live_signal.entry_price + (tp_pips if side==1 else -tp_pips)
+                            tp = tp_low_abs
+                        elif level == 'MEDIUM':
+                            tp_pips = int(cfg_exec.get('medium_tp_primary_pips', 9))
+                            tp_med_abs = live_signal.entry_price + (tp_pips if side==1 else -tp_pips)
+                            tp = tp_med_abs
+                        # HIGH: allow tiered spawning counts
+                        tiers = []
+                        if level == 'HIGH':
+                            tier_cfg = cfg_exec.get('high_tier_tp_pips', { 'tier1_count':2,'tier1_pips':6,'tier2_count':3,'tier2_pips':9 })
+                            tiers = (
+                                [('TIER1', tier_cfg.get('tier1_pips',6))]*int(tier_cfg.get('tier1_count',2)) +
+                                [('TIER2', tier_cfg.get('tier2_pips',9))]*int(tier_cfg.get('tier2_count',3))
+                            )
+                        # Spawn orders: every tier is prepared from one snapshot and sent as a batch
+                        entry = live_signal.entry_price
+                        sl = live_signal.stop_loss
+
+                        def plan(tier_name: Optional[str], local_tp: float, engine: str) -> Dict:
+                            return {'direction': side, 'entry': entry, 'sl': sl, 'tp': local_tp,
+                                    'alert_level': level, 'tier': tier_name, 'engine': engine}
+
+                        if level == 'HIGH' and tiers:
+                            # Tiered partials first, then one at the base TP
+                            plans = [plan(tier_name, entry + (pips if side==1 else -pips), "INTRADAY_HIGH") for tier_name, pips in tiers]
+                            plans.append(plan(None, live_signal.take_profit_1, "INTRADAY_HIGH"))
+                        else:
+                            # LOW/MEDIUM use absolute TP we computed
+                            engine_name = "INTRADAY_LOW" if level=="LOW" else ("INTRADAY_MED" if level=="MEDIUM" else "INTRADAY")
+                            plans = [plan(None, tp, engine_name)]
+                        for p, trade in self._send_order_batch(plans, live_signal, gate_level=level):
+                            print(f"✅ [{p['engine']}] Order sent: ticket={trade.get('ticket')} lots={trade.get('volume')} tier={p['tier'] or 'BASE'}")
+            else:
+                if engine_mode == 'NONE':
+                    print("⏸️ Engine mode NONE blocking automated entries")
+                elif engine_mode == 'FARMER_ONLY':
+                    print("⏸️ Engine mode FARMER_ONLY skipping tiered engines")
+                elif engine_mode.endswith('_ONLY'):
+                    print(f"⏸️ Engine mode {engine_mode} skipping {level} signal")
+
+            # 2-pip farmer (runs alongside, subject to farmer cycle)
+            try:
+                # Farmer runs independently every cycle when a non-HOLD signal exists,
+                # but piggybacks the HIGH campaign gate.
+                if farmer_allowed and self.trading_enabled and live_signal.signal != 0:
+                    now = datetime.now()
+                    if not self._farmer_last_cycle or (now - self._farmer_last_cycle).total_seconds() >= self.farmer_cycle_seconds:
+                        self._farmer_last_cycle = now
+                        farmer_cfg = self.config.get('execution', {}).get('farmer', {})
+                        # Dynamic TP by ATR if enabled
+                        dyn = bool(farmer_cfg.get('dynamic_tp', True))
+                        atr_val = self._latest_indicator('ATR_14')
+                        base_tp = int(farmer_cfg.get('tp_pips', 2))
+                        if dyn:
+                            if atr_val >= 20:
+                                tp_pips = min(5, base_tp + 2)
+                            elif atr_val >= 12:
+                                tp_pips = min(4, base_tp + 1)
+                            else:
+                                tp_pips = base_tp
+                        else:
+                            tp_pips = base_tp
+                        sl_pips = int(farmer_cfg.get('sl_pips', 6))
+                        count = int(farmer_cfg.get('trades_per_cycle', 3))
+                        # place burst of small TP orders (piggybacks the HIGH campaign gate)
+                        entry = live_signal.entry_price
+                        sl = entry - sl_pips if side == 1 else entry + sl_pips
+                        tp_small = entry + tp_pips if side == 1 else entry - tp_pips
+                        plans = [
+                            {'direction': side, 'entry': entry, 'sl': sl, 'tp': tp_small,
+                             'alert_level': 'HIGH', 'tier': 'FARMER', 'engine': 'FARMER'}
+                            for _ in range(count)
+                        ]
+                        for _, trade in self._send_order_batch(plans, live_signal, gate_level='HIGH'):
+                            print(f"🌾 Farmer order sent: ticket={trade.get('ticket')} tp={tp_pips}p atr={atr_val:.2f}")
+            except Exception:
+                pass
+
+        self._evaluate_strategies(current_quote, spread_block, atr_block)
+        
+
+    def _send_order_batch(self, plans: List[Dict], live_signal: LiveSignal, gate_level: str) -> List[Tuple[Dict, Dict]]:
+        """Send planned orders as one batch, then persist and register the fills together.
+
+        The campaign gate is applied up front: the batch is cut to the number of
+        entries ``gate_level`` still allows for this side.
+        """
+        if not plans:
+            return []
+        side = plans[0]['direction']
+        if self.campaign:
+            allowed = self.campaign.remaining(self.symbol, side, gate_level)
+            if allowed < len(plans):
+                plans = plans[:allowed]
+            if not plans:
+                return []
+        results = self.autotrader.place_market_orders(plans)
+        fills = [(p, trade) for p, trade in zip(plans, results) if trade]
+        if not fills or not self.persistence:
+            return fills
+        try:
+            self.persistence.save_trades([{
+                'timestamp': live_signal.timestamp,
+                'symbol': live_signal.symbol,
+                'direction': p['direction'],
+                'entry': p['entry'],
+                'sl': p['sl'],
+                'tp': p['tp'],
+                'lots': trade.get('volume', 0.0),
+                'ticket': trade.get('ticket', 0),
+                'status': 'SENT',
+                'alert_level': p['alert_level'],
+                'tier': p['tier'] or '',
+                'engine': p['engine']
+            } for p, trade in fills])
+            if self.order_manager:
+                self.order_manager.register_new_orders([dict(p, ticket=trade.get('ticket')) for p, trade in fills])
+            if self.campaign:
+                for p, _ in fills:
+                    self.campaign.record(self.symbol, side, gate_level)
+        except Exception as e:
+            print(f"⚠️ Trade persist error: {e}")
+        return fills
+
+    def _persist_signal(self, payload: Dict):
+        try:
+            self.persistence.save_signal(payload)
+        except Exception as e:
+            print(f"⚠️ Persist error: {e}")
+
+    def _dispatch(self, fn: Callable, *args):
+        """Run follow-up work inline (thread mode) or as a background task (async mode)."""
+        if self._async_runtime is not None:
+            self._async_runtime.submit_background(fn, *args)
+        else:
+            fn(*args)
+
+    def _reconcile_positions(self):
+        """Reconcile positions periodically"""
+        try:
+            if self.order_manager:
+                self.order_manager.reconcile()
+        except Exception:
+            pass
     
     def stop_streaming(self):
         """Stop the live data streaming"""
         self.is_running = False
+        if self._async_runtime is not None:
+            self._async_runtime.remove_stream(self)
+            self._async_runtime = None
+        if self.strategy_runner is not None:
+            self.strategy_runner.shutdown()
+        if self.persistence:
+            try:
+                self.persistence.flush(timeout=5.0)
+            except Exception as e:
+                print(f"⚠️ Persist flush error: {e}")
         print("🛑 Live data streaming stopped")
     
     def get_current_signal(self) -> Optional[LiveSignal]:
@@ -1694,6 +1908,10 @@ class LiveDataStream:
             'ict_swing_state': self.get_ict_swing_state(),
             'ict_atm_enabled': self.ict_atm_enabled,
             'ict_atm_state': self.get_ict_atm_state(),
+            'strategy_schedule': self.strategy_scheduler.get_stats(),
+            'strategy_runner': self.strategy_runner.get_stats() if self.strategy_runner is not None else None,
+            'async_runtime': self._async_runtime.get_stats() if self._async_runtime is not None else None,
+            'persistence_queue': self.persistence.write_behind_stats() if self.persistence else None,
         }
 
     def set_farmer_enabled(self, enabled: bool):
@@ -1777,6 +1995,7 @@ class LiveDataStream:
     def set_nyupip_enabled(self, enabled: bool):
         self.nyupip_enabled = bool(enabled)
         self.nyupip_state['enabled'] = self.nyupip_enabled
+        self.strategy_scheduler.reset('nyupip')
         if self.nyupip_enabled:
             self.nyupip_state['last_diagnostics'] = self.nyupip_strategy.get_last_diagnostics()
         else:
@@ -1800,6 +2019,7 @@ class LiveDataStream:
             return
         self.ict_swing_enabled = bool(enabled)
         self.ict_swing_state['enabled'] = self.ict_swing_enabled
+        self.strategy_scheduler.reset('ict_swing')
         if self.ict_swing_enabled:
             self.ict_swing_state['last_diagnostics'] = self.ict_swing_strategy.get_last_diagnostics()
         status = 'enabled' if self.ict_swing_enabled else 'disabled'
@@ -1821,6 +2041,7 @@ class LiveDataStream:
             return
         self.ict_atm_enabled = bool(enabled)
         self.ict_atm_state['enabled'] = self.ict_atm_enabled
+        self.strategy_scheduler.reset('ict_atm')
         if self.ict_atm_enabled:
             self.ict_atm_state['last_diagnostics'] = self.ict_atm_strategy.get_last_diagnostics()
         status = 'enabled' if self.ict_atm_enabled else 'disabled'
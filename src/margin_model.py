@@ -0,0 +1,161 @@
+"""Closed-form margin model for lot sizing.
+
+``AutoTrader`` used to binary-search the largest affordable lot, calling
+``order_calc_margin`` on every step: up to 21 broker round trips per order, and
+multi-tier HIGH sends repeat that per tier. Margin is linear in volume at a
+given price (``margin = per_lot * lots + fixed``) and, for CFD/FX symbols,
+proportional to price, so two samples are enough to calibrate a symbol. After
+that the maximum affordable lot is arithmetic and only the final candidate is
+checked with the broker.
+
+Calibrations are cached per (symbol, order type) and refreshed once the price
+drifts more than ``price_tolerance`` from the calibration price or after
+``max_age_seconds`` (leverage or margin-rate changes).
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from .config import get_config
+
+MarginCalc = Callable[[int, str, float, float], Optional[float]]  # (order_type, symbol, lots, price) -> margin
+
+
+@dataclass
+class MarginCalibration:
+    per_lot: float
+    fixed: float
+    price: float
+    calibrated_at: float
+
+    def margin(self, lots: float, price: float) -> float:
+        # Scale with price, never below the calibrated rate
+        scale = max(1.0, price / self.price) if self.price > 0 else 1.0
+        return (self.per_lot * lots + self.fixed) * scale
+
+    def max_lots(self, budget: float, price: float) -> float:
+        scale = max(1.0, price / self.price) if self.price > 0 else 1.0
+        if self.per_lot <= 0:
+            return math.inf
+        return (budget / scale - self.fixed) / self.per_lot
+
+
+def align_lot(lots: float, min_lot: float, lot_step: float) -> float:
+    """Round ``lots`` down onto the broker's volume grid starting at ``min_lot``."""
+    step = lot_step or 0.01
+    steps = max(0, int(math.floor((lots - min_lot) / step + 1e-9)))
+    return round(min_lot + steps * step, 2)
+
+
+class MarginModel:
+    """Per-symbol linear margin calibrations plus the affordable-lot computation."""
+
+    def __init__(self, price_tolerance: float = 0.005, max_age_seconds: float = 900.0, safety: float = 0.95) -> None:
+        self.price_tolerance = float(price_tolerance)
+        self.max_age_seconds = float(max_age_seconds)
+        self.safety = float(safety)
+        self._calibrations: Dict[Tuple[str, int], MarginCalibration] = {}
+        self._lock = threading.Lock()
+        self.stats = {"calibrations": 0, "broker_calls": 0, "verify_failures": 0}
+
+    def _calc(self, calc: MarginCalc, order_type: int, symbol: str, lots: float, price: float) -> Optional[float]:
+        self.stats["broker_calls"] += 1
+        m = calc(order_type, symbol, lots, price)
+        return float(m) if m is not None else None
+
+    def calibration(self, symbol: str, order_type: int, price: float) -> Optional[MarginCalibration]:
+        cal = self._calibrations.get((symbol, order_type))
+        if cal is None:
+            return None
+        if time.monotonic() - cal.calibrated_at > self.max_age_seconds:
+            return None
+        if cal.price > 0 and abs(price - cal.price) / cal.price > self.price_tolerance:
+            return None
+        return cal
+
+    def calibrate(self, calc: MarginCalc, symbol: str, order_type: int, price: float, lots_a: float, lots_b: float) -> Optional[MarginCalibration]:
+        """Fit ``per_lot``/``fixed`` from margins at two volumes."""
+        m_a = self._calc(calc, order_type, symbol, lots_a, price)
+        m_b = self._calc(calc, order_type, symbol, lots_b, price) if lots_b != lots_a else None
+        if m_a is None:
+            return None
+        if m_b is None or lots_b == lots_a:
+            per_lot, fixed = m_a / lots_a, 0.0
+        else:
+            per_lot = (m_b - m_a) / (lots_b - lots_a)
+            fixed = max(0.0, m_a - per_lot * lots_a)
+        cal = MarginCalibration(per_lot=per_lot, fixed=fixed, price=price, calibrated_at=time.monotonic())
+        with self._lock:
+            self._calibrations[(symbol, order_type)] = cal
+        self.stats["calibrations"] += 1
+        return cal
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        with self._lock:
+            for key in [k for k in self._calibrations if symbol is None or k[0] == symbol]:
+                del self._calibrations[key]
+
+    def max_affordable_lot(
+        self,
+        calc: MarginCalc,
+        symbol: str,
+        order_type: int,
+        price: float,
+        free_margin: float,
+        min_lot: float,
+        max_lot: float,
+        lot_step: float,
+    ) -> Optional[float]:
+        """Largest lot on the volume grid whose margin fits ``safety * free_margin``.
+
+        Returns 0.0 when even ``min_lot`` does not fit and None when the broker
+        cannot price margin (callers may fall back to a search).
+        """
+        if free_margin <= 0:
+            return 0.0
+        budget = free_margin * self.safety
+        cal = self.calibration(symbol, order_type, price)
+        if cal is None:
+            probe = align_lot(max(min_lot * 10, min_lot + lot_step), min_lot, lot_step)
+            cal = self.calibrate(calc, symbol, order_type, price, min_lot, probe)
+            if cal is None:
+                return None
+        for _ in range(2):
+            if cal.margin(min_lot, price) > budget:
+                return 0.0
+            candidate = align_lot(min(max_lot, cal.max_lots(budget, price)), min_lot, lot_step)
+            margin = self._calc(calc, order_type, symbol, candidate, price)
+            if margin is None:
+                return None
+            if margin <= budget:
+                return candidate
+            # The linear fit was off (tiered margin, stale rate): refit through this sample
+            self.stats["verify_failures"] += 1
+            cal = self.calibrate(calc, symbol, order_type, price, min_lot, candidate)
+            if cal is None:
+                return None
+        return None
+
+
+_model: Optional[MarginModel] = None
+_model_lock = threading.Lock()
+
+
+def get_margin_model() -> MarginModel:
+    """Process-wide model configured from ``execution.margin_model``."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                cfg = get_config().get("execution", {}).get("margin_model", {})
+                _model = MarginModel(
+                    price_tolerance=cfg.get("price_tolerance", 0.005),
+                    max_age_seconds=cfg.get("max_age_seconds", 900),
+                    safety=cfg.get("free_margin_safety", 0.95),
+                )
+    return _model
@@ -0,0 +1,187 @@
+"""Per-stage latency timers for the live loop.
+
+Each stage (quote fetch, indicator update, signal generation, strategy
+evaluation, SQLite writes, order placement, ...) records its wall time into a
+fixed-size ring of recent samples, from which p50/p95/p99/max are computed on
+read. Lifetime count and sum are kept alongside so the Prometheus summary stays
+monotonic. When ``metrics.enabled`` is false :func:`timed` and :func:`timer`
+reduce to one attribute check.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .config import get_config
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class StageHistogram:
+    """Rolling window of latency samples (seconds) for one stage."""
+
+    def __init__(self, window: int = 2048) -> None:
+        self._samples = np.zeros(max(1, int(window)), dtype=float)
+        self._pos = 0
+        self._filled = 0
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples[self._pos] = seconds
+            self._pos = (self._pos + 1) % len(self._samples)
+            self._filled = min(self._filled + 1, len(self._samples))
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            window = self._samples[:self._filled].copy()
+            count, total, peak = self.count, self.total, self.max
+        if len(window):
+            p50, p95, p99 = np.quantile(window, QUANTILES)
+            window_max = float(window.max())
+        else:
+            p50 = p95 = p99 = window_max = 0.0
+        return {
+            'count': count,
+            'sum': total,
+            'mean_ms': total / count * 1000.0 if count else 0.0,
+            'p50_ms': float(p50) * 1000.0,
+            'p95_ms': float(p95) * 1000.0,
+            'p99_ms': float(p99) * 1000.0,
+            'max_ms': window_max * 1000.0,
+            'lifetime_max_ms': peak * 1000.0,
+        }
+
+
+class MetricsRegistry:
+    """Stage histograms plus a few gauges (e.g. queue depths)."""
+
+    def __init__(self, enabled: bool = True, window: int = 2048, prefix: str = 'getrichfrbot') -> None:
+        self.enabled = enabled
+        self.window = window
+        self.prefix = prefix
+        self._stages: Dict[str, StageHistogram] = {}
+        self._gauges: Dict[str, Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        hist = self._stages.get(stage)
+        if hist is None:
+            with self._lock:
+                hist = self._stages.setdefault(stage, StageHistogram(self.window))
+        hist.observe(seconds)
+
+    def register_gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Expose ``read()`` as a gauge; it is sampled at scrape time."""
+        self._gauges[name] = read
+
+    def _gauge_values(self) -> Dict[str, float]:
+        values: Dict[str, float] = {}
+        for name, read in list(self._gauges.items()):
+            try:
+                values[name] = float(read())
+            except Exception:
+                continue
+        return values
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'window': self.window,
+            'stages': {name: hist.summary() for name, hist in sorted(self._stages.items())},
+            'gauges': self._gauge_values(),
+        }
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition (version 0.0.4)."""
+        name = f"{self.prefix}_stage_latency_seconds"
+        lines: List[str] = [
+            f"# HELP {name} Wall time per live-loop stage over the recent window.",
+            f"# TYPE {name} summary",
+        ]
+        max_lines: List[str] = []
+        for stage, hist in sorted(self._stages.items()):
+            s = hist.summary()
+            label = stage.replace('\\', '\\\\').replace('"', '\\"')
+            for q, key in zip(QUANTILES, ('p50_ms', 'p95_ms', 'p99_ms')):
+                lines.append(f'{name}{{stage="{label}",quantile="{q}"}} {s[key] / 1000.0:.9f}')
+            lines.append(f'{name}_sum{{stage="{label}"}} {s["sum"]:.9f}')
+            lines.append(f'{name}_count{{stage="{label}"}} {s["count"]}')
+            max_lines.append(f'{name}_max{{stage="{label}"}} {s["max_ms"] / 1000.0:.9f}')
+        if max_lines:
+            lines.append(f"# HELP {name}_max Slowest sample in the recent window.")
+            lines.append(f"# TYPE {name}_max gauge")
+            lines.extend(max_lines)
+        for gauge, value in sorted(self._gauge_values().items()):
+            metric = f"{self.prefix}_{gauge}"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages.clear()
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide registry configured from the ``metrics`` config section."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                cfg = get_config().get('metrics', {})
+                _registry = MetricsRegistry(
+                    enabled=bool(cfg.get('enabled', True)),
+                    window=int(cfg.get('window', 2048)),
+                )
+    return _registry
+
+
+@contextmanager
+def timer(stage: str) -> Iterator[None]:
+    """Time the enclosed block as ``stage``."""
+    registry = get_metrics()
+    if not registry.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(stage, time.perf_counter() - start)
+
+
+def timed(stage: str) -> Callable[[Callable], Callable]:
+    """Decorator form of :func:`timer`."""
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            registry = get_metrics()
+            if not registry.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                registry.observe(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
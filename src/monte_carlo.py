@@ -0,0 +1,327 @@
+"""Monte Carlo risk of a trade sequence under the live sizing rules.
+
+``BacktestEngine.calculate_performance_metrics`` scores the one path history
+happened to take. Whether the ``progressive_defense`` loss tiers and the
+per-symbol ``daily_loss_limit_pct`` cap actually keep the account alive is a
+question about the distribution of paths, so this module resamples per-trade
+R multiples (closed rows of the ``trades`` table, or replay/backtest output)
+into tens of thousands of alternative sequences and replays the sizing rules
+over all of them at once.
+
+Paths are rows of one ``(paths, trades)`` array. Without defense tiers or a
+daily cap the equity curves are a single cumulative product over that array;
+with them, position size depends on the realized loss of the day so far, so
+the simulation steps through trade positions and updates every path with one
+vectorised operation per step (``tier_multipliers`` is the array form of
+``OrderManager.get_position_size_multiplier``). Risk per trade compounds on
+current equity as in ``AutoTrader._calc_lot``.
+
+Resampling is either an i.i.d. bootstrap (``block_size <= 1``) or a circular
+block bootstrap, which keeps streaks of wins and losses that plain
+resampling breaks up.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+from .persistence import trade_r_multiple
+
+DEFAULT_LOSS_TIERS = [
+    {"realized_loss_pct": 0, "position_size_mult": 1.0, "label": "Normal"},
+    {"realized_loss_pct": 2, "position_size_mult": 0.5, "label": "50% size after -2%"},
+    {"realized_loss_pct": 3, "position_size_mult": 0.25, "label": "25% size after -3%"},
+    {"realized_loss_pct": 4, "position_size_mult": 0.0, "label": "HALT after -4%"},
+]
+DRAWDOWN_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def r_multiples(source: Any) -> Tuple[np.ndarray, Optional[pd.DatetimeIndex]]:
+    """Per-trade R multiples (and close times when known) from trade rows or backtest output.
+
+    Accepts ``ReplayBacktester.run`` output or its ``trades`` frame (``r_multiple``),
+    ``trades`` table rows (``pnl_r``, else entry/sl/close_price), or
+    ``BacktestEngine.trades`` (``Profit``; no stop distance is recorded there, so
+    profits are expressed in units of the average losing trade).
+    """
+    if isinstance(source, dict) and "trades" in source:
+        source = source["trades"]
+    frame = source if isinstance(source, pd.DataFrame) else pd.DataFrame(list(source or []))
+    if frame.empty:
+        return np.empty(0), None
+    if "r_multiple" in frame.columns:
+        values = pd.to_numeric(frame["r_multiple"], errors="coerce")
+    elif "Profit" in frame.columns and "pnl_r" not in frame.columns:
+        profit = pd.to_numeric(frame["Profit"], errors="coerce")
+        unit = float(-profit[profit < 0].mean()) if (profit < 0).any() else float(profit.abs().mean() or 1.0)
+        values = profit / unit
+    else:
+        values = pd.Series([trade_r_multiple(row) for row in frame.to_dict("records")], index=frame.index, dtype=float)
+    times = None
+    for col in ("close_time", "Date", "timestamp"):
+        if col in frame.columns:
+            times = pd.to_datetime(frame[col], errors="coerce")
+            break
+    keep = values.notna().to_numpy()
+    if times is not None:
+        times = pd.DatetimeIndex(times[keep])
+        if times.isna().any():
+            times = None
+    return values.to_numpy(dtype=np.float64)[keep], times
+
+
+def trades_per_day(times: Optional[pd.DatetimeIndex], default: int = 10) -> int:
+    """Mean closed trades per trading day (days with at least one close)."""
+    if times is None or len(times) == 0:
+        return int(default)
+    counts = pd.Series(1, index=times).groupby(times.normalize()).size()
+    return max(1, int(round(float(counts.mean()))))
+
+
+def tier_multipliers(loss_pct: np.ndarray, tiers: List[Dict[str, Any]]) -> np.ndarray:
+    """``OrderManager.get_position_size_multiplier`` for an array of realized loss percentages."""
+    ordered = sorted(tiers, key=lambda t: float(t["realized_loss_pct"]))
+    thresholds = np.array([float(t["realized_loss_pct"]) for t in ordered])
+    mults = np.array([float(t["position_size_mult"]) for t in ordered])
+    pos = np.searchsorted(thresholds, loss_pct, side="right") - 1
+    return np.where(pos >= 0, mults[np.clip(pos, 0, None)], 1.0)
+
+
+def resample_indices(n: int, paths: int, horizon: int, block_size: int, rng: np.random.Generator) -> np.ndarray:
+    """``(paths, horizon)`` indices into the source trades (i.i.d. or circular blocks)."""
+    if block_size <= 1:
+        return rng.integers(0, n, size=(paths, horizon))
+    blocks = -(-horizon // block_size)
+    starts = rng.integers(0, n, size=(paths, blocks, 1))
+    return ((starts + np.arange(block_size)) % n).reshape(paths, blocks * block_size)[:, :horizon]
+
+
+@dataclass
+class MonteCarloResult:
+    initial_balance: float
+    ruin_level: float
+    final_equity: np.ndarray
+    max_drawdown: np.ndarray  # negative fraction of the running peak
+    ruined: np.ndarray
+    halted_days: np.ndarray
+    days: int
+    equity_bands: pd.DataFrame
+    elapsed_seconds: float
+
+    @property
+    def summary(self) -> Dict[str, float]:
+        returns = self.final_equity / self.initial_balance - 1.0
+        out = {
+            "paths": float(len(self.final_equity)),
+            "ruin_probability": float(self.ruined.mean()),
+            "loss_probability": float((returns < 0).mean()),
+            "return_p5": float(np.quantile(returns, 0.05)),
+            "return_p50": float(np.quantile(returns, 0.5)),
+            "return_p95": float(np.quantile(returns, 0.95)),
+            "halted_day_pct": float(self.halted_days.mean() / self.days) if self.days else 0.0,
+        }
+        # Drawdown quantiles are of severity: p99 is the 1-in-100 worst path
+        for q in DRAWDOWN_QUANTILES:
+            out[f"max_drawdown_p{int(q * 100)}"] = float(np.quantile(self.max_drawdown, 1.0 - q))
+        return out
+
+    def print_report(self) -> None:
+        print("\n" + "=" * 60)
+        print("🎲 MONTE CARLO RISK REPORT")
+        print("=" * 60)
+        print(f"{'ruin_level':<24} {self.ruin_level:>14.2f}")
+        for key, value in self.summary.items():
+            print(f"{key:<24} {value:>14.4f}")
+        print(f"{'elapsed_seconds':<24} {self.elapsed_seconds:>14.3f}")
+        print("=" * 60)
+
+
+class MonteCarloSimulator:
+    """Resamples R multiples into equity paths under risk-per-trade, defense tiers and daily cap."""
+
+    def __init__(
+        self,
+        initial_balance: float = 10000.0,
+        risk_percent: float = 0.25,
+        loss_tiers: Optional[List[Dict[str, Any]]] = None,
+        defense_enabled: bool = True,
+        daily_loss_limit_pct: Optional[float] = 5.0,
+        ruin_drawdown_pct: float = 50.0,
+        block_size: int = 0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.initial_balance = float(initial_balance)
+        self.risk_pct = float(risk_percent) / 100.0
+        self.loss_tiers = loss_tiers if loss_tiers is not None else DEFAULT_LOSS_TIERS
+        self.defense_enabled = bool(defense_enabled)
+        self.daily_loss_limit_pct = float(daily_loss_limit_pct) if daily_loss_limit_pct is not None else None
+        self.ruin_drawdown_pct = float(ruin_drawdown_pct)
+        self.block_size = int(block_size)
+        self.rng = np.random.default_rng(seed)
+
+    @classmethod
+    def from_config(cls, symbol: Optional[str] = None, cfg: Optional[Dict] = None, **overrides) -> "MonteCarloSimulator":
+        cfg = cfg if cfg is not None else get_config()
+        symbol = symbol or cfg.get("broker", {}).get("symbol", "XAUUSDm")
+        risk = cfg.get("risk", {})
+        defense = risk.get("progressive_defense", {})
+        mc = cfg.get("monte_carlo", {})
+        args = dict(
+            initial_balance=float(mc.get("initial_balance", cfg.get("replay", {}).get("initial_balance", 10000.0))),
+            risk_percent=float(risk.get("risk_percent_per_trade", 0.25)),
+            loss_tiers=defense.get("loss_tiers", DEFAULT_LOSS_TIERS),
+            defense_enabled=bool(defense.get("enabled", True)),
+            daily_loss_limit_pct=float(risk.get("symbol_caps", {}).get(symbol, {}).get("daily_loss_limit_pct", 5.0)),
+            ruin_drawdown_pct=float(mc.get("ruin_drawdown_pct", 50.0)),
+            block_size=int(mc.get("block_size", 0)),
+            seed=mc.get("seed"),
+        )
+        args.update(overrides)
+        return cls(**args)
+
+    def simulate(
+        self,
+        r: np.ndarray,
+        paths: int = 20000,
+        horizon: Optional[int] = None,
+        per_day: int = 10,
+    ) -> MonteCarloResult:
+        """Simulate ``paths`` sequences of ``horizon`` trades, ``per_day`` trades to a trading day."""
+        r = np.asarray(r, dtype=np.float64)
+        if r.size == 0:
+            raise ValueError("no trades to resample")
+        started = time.perf_counter()
+        horizon = int(horizon or r.size)
+        per_day = max(1, int(per_day))
+        samples = r[resample_indices(r.size, int(paths), horizon, self.block_size, self.rng)]
+        ruin_level = self.initial_balance * (1.0 - self.ruin_drawdown_pct / 100.0)
+        days = -(-horizon // per_day)
+        if not self.defense_enabled and self.daily_loss_limit_pct is None:
+            final, max_dd, ruined, halted, bands = self._simulate_static(samples, ruin_level)
+        else:
+            final, max_dd, ruined, halted, bands = self._simulate_defended(samples, ruin_level, per_day)
+        return MonteCarloResult(
+            initial_balance=self.initial_balance,
+            ruin_level=ruin_level,
+            final_equity=final,
+            max_drawdown=max_dd,
+            ruined=ruined,
+            halted_days=halted,
+            days=days,
+            equity_bands=bands,
+            elapsed_seconds=time.perf_counter() - started,
+        )
+
+    @staticmethod
+    def _bands(equity_by_step: np.ndarray) -> pd.DataFrame:
+        """p5/p50/p95 equity per trade step from a ``(steps, paths)`` array."""
+        q = np.quantile(equity_by_step, [0.05, 0.5, 0.95], axis=1)
+        return pd.DataFrame({"p5": q[0], "p50": q[1], "p95": q[2]}, index=pd.RangeIndex(1, equity_by_step.shape[0] + 1, name="trade"))
+
+    def _simulate_static(self, samples: np.ndarray, ruin_level: float):
+        growth = np.maximum(1.0 + self.risk_pct * samples, 0.0)
+        equity = self.initial_balance * np.cumprod(growth, axis=1)
+        # Ruined paths stop trading at the first equity below the ruin level
+        below = equity <= ruin_level
+        ruined = below.any(axis=1)
+        first = np.where(ruined, below.argmax(axis=1), equity.shape[1] - 1)
+        steps = np.arange(equity.shape[1])
+        equity = np.where(steps[None, :] > first[:, None], equity[np.arange(len(equity)), first][:, None], equity)
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), self.initial_balance)
+        max_dd = np.minimum((equity / peak - 1.0).min(axis=1), 0.0)
+        halted = np.zeros(len(equity), dtype=np.int64)
+        step = max(1, equity.shape[1] // 500)
+        return equity[:, -1], max_dd, ruined, halted, self._bands(equity[:, ::step].T)
+
+    def _simulate_defended(self, samples: np.ndarray, ruin_level: float, per_day: int):
+        paths, horizon = samples.shape
+        equity = np.full(paths, self.initial_balance)
+        peak = equity.copy()
+        max_dd = np.zeros(paths)
+        ruined = np.zeros(paths, dtype=bool)
+        halted_today = np.zeros(paths, dtype=bool)
+        halted = np.zeros(paths, dtype=np.int64)
+        day_start = equity.copy()
+        band_every = max(1, horizon // 500)
+        band_rows = []
+        for t in range(horizon):
+            if t % per_day == 0:
+                halted += halted_today
+                halted_today[:] = False
+                day_start = equity.copy()
+            realized = equity - day_start
+            loss_pct = np.where((realized < 0) & (equity > 0), -realized / np.maximum(equity, 1e-12) * 100.0, 0.0)
+            mult = tier_multipliers(loss_pct, self.loss_tiers) if self.defense_enabled else np.ones(paths)
+            if self.daily_loss_limit_pct is not None:
+                capped = loss_pct >= self.daily_loss_limit_pct
+                mult = np.where(capped, 0.0, mult)
+            stopped = (mult <= 0) & ~ruined
+            halted_today |= stopped
+            mult = np.where(ruined, 0.0, mult)
+            equity = np.maximum(equity + equity * self.risk_pct * mult * samples[:, t], 0.0)
+            ruined |= equity <= ruin_level
+            np.maximum(peak, equity, out=peak)
+            np.minimum(max_dd, equity / peak - 1.0, out=max_dd)
+            if t % band_every == 0:
+                band_rows.append(equity.copy())
+        halted += halted_today
+        return equity, max_dd, ruined, halted, self._bands(np.vstack(band_rows))
+
+
+def simulate_from_db(symbol: Optional[str] = None, since: Optional[str] = None, paths: Optional[int] = None,
+                     horizon: Optional[int] = None, **overrides) -> MonteCarloResult:
+    """Monte Carlo over the closed trades in the live database."""
+    from .persistence import PersistenceManager
+
+    cfg = get_config()
+    symbol = symbol or cfg.get("broker", {}).get("symbol", "XAUUSDm")
+    # Read-only: never start a write-behind queue (or touch its journal) here
+    r, times = r_multiples(PersistenceManager(write_behind=False).closed_trades(symbol=symbol, since=since))
+    simulator = MonteCarloSimulator.from_config(symbol, cfg, **overrides)
+    mc = cfg.get("monte_carlo", {})
+    return simulator.simulate(
+        r,
+        paths=int(paths or mc.get("paths", 20000)),
+        horizon=horizon or mc.get("horizon_trades") or None,
+        per_day=trades_per_day(times),
+    )
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Monte Carlo risk of the closed-trade R multiples")
+    parser.add_argument("--csv", default=None, help="trades CSV (replay trades or a trades table export); default: live DB")
+    parser.add_argument("--symbol", default=None)
+    parser.add_argument("--since", default=None, help="only trades closed at/after this timestamp (DB source)")
+    parser.add_argument("--paths", type=int, default=None)
+    parser.add_argument("--horizon", type=int, default=None, help="trades per simulated path (default: history length)")
+    parser.add_argument("--block-size", type=int, default=None, help="circular block bootstrap length (<=1: i.i.d.)")
+    parser.add_argument("--no-defense", action="store_true", help="ignore the progressive defense tiers")
+    parser.add_argument("--bands", default=None, help="write the p5/p50/p95 equity bands to this CSV")
+    args = parser.parse_args()
+
+    overrides: Dict[str, Any] = {}
+    if args.block_size is not None:
+        overrides["block_size"] = args.block_size
+    if args.no_defense:
+        overrides["defense_enabled"] = False
+    if args.csv:
+        r_values, close_times = r_multiples(pd.read_csv(args.csv))
+        result = MonteCarloSimulator.from_config(args.symbol, **overrides).simulate(
+            r_values,
+            paths=int(args.paths or get_config().get("monte_carlo", {}).get("paths", 20000)),
+            horizon=args.horizon,
+            per_day=trades_per_day(close_times),
+        )
+    else:
+        result = simulate_from_db(args.symbol, args.since, args.paths, args.horizon, **overrides)
+    result.print_report()
+    if args.bands:
+        result.equity_bands.to_csv(args.bands)
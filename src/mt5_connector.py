@@ -1,6 +1,7 @@
 from typing import Optional, Dict
 import datetime as dt
 import os
+import threading
 
 try:
 	import MetaTrader5 as mt5
@@ -8,6 +9,13 @@ except Exception:
 	mt5 = None
 
 from .config import get_config
+from .broker_cache import get_broker_cache
+from .broker_gateway import broker_call
+
+# One terminal session per process: every connector (one per symbol) shares it,
+# so only the first initialize() pays for mt5.initialize/login.
+_session_lock = threading.Lock()
+_session_ready = False
 
 
 class MT5Connector:
@@ -27,19 +35,23 @@ class MT5Connector:
 		self.symbol = self.symbol or broker.get('symbol', 'XAUUSD')
 		password_env = cfg.get('secrets_env', {}).get('mt5_password_env', 'MT5_PASSWORD')
 		password = os.getenv(password_env)
-		# Initialize terminal (use explicit path if provided)
-		terminal_path = os.getenv('MT5_TERMINAL_PATH')
-		if terminal_path:
-			ok = mt5.initialize(path=terminal_path)
-		else:
-			ok = mt5.initialize()
-		if not ok:
-			return False
-		# Attempt login (if terminal not already logged in)
-		if login and password and server:
-			mt5.login(login=login, password=password, server=server)
+		global _session_ready
+		with _session_lock:
+			if not _session_ready:
+				# Initialize terminal (use explicit path if provided)
+				terminal_path = os.getenv('MT5_TERMINAL_PATH')
+				if terminal_path:
+					ok = broker_call(mt5.initialize, path=terminal_path)
+				else:
+					ok = broker_call(mt5.initialize)
+				if not ok:
+					return False
+				# Attempt login (if terminal not already logged in)
+				if login and password and server:
+					broker_call(mt5.login, login=login, password=password, server=server)
+				_session_ready = True
 		# Ensure symbol selected
-		mt5.symbol_select(self.symbol, True)
+		broker_call(mt5.symbol_select, self.symbol, True)
 		self.initialized = True
 		return True
 
@@ -47,14 +59,17 @@ class MT5Connector:
 		if not self.initialized and not self.initialize():
 			return None
 		try:
-			rates = mt5.copy_rates_from_pos(self.symbol, timeframe, 0, count)
+			rates = broker_call(mt5.copy_rates_from_pos, self.symbol, timeframe, 0, count)
 			return rates
 		except Exception:
 			return None
 
 	def shutdown(self):
+		global _session_ready
 		if mt5:
-			mt5.shutdown()
+			broker_call(mt5.shutdown)
+		with _session_lock:
+			_session_ready = False
 		self.initialized = False
 
 	def get_current_quote(self) -> Optional[Dict]:
@@ -62,18 +77,18 @@ class MT5Connector:
 			if not self.initialize():
 				return None
 		# Try last tick
-		tick = mt5.symbol_info_tick(self.symbol)
+		tick = broker_call(mt5.symbol_info_tick, self.symbol)
 		if tick:
 			price = float(tick.last) if tick.last else float(tick.bid or tick.ask or 0)
 			# Get previous close from last M1 bar
 			prev_close = price
-			rates = mt5.copy_rates_from_pos(self.symbol, mt5.TIMEFRAME_M1, 0, 3)
+			rates = broker_call(mt5.copy_rates_from_pos, self.symbol, mt5.TIMEFRAME_M1, 0, 3)
 			if rates is not None and len(rates) >= 2:
 				prev_close = float(rates[-2]['close'])
 			spread = 0.0
 			if tick.bid and tick.ask:
 				# Points, not pips
-				info = mt5.symbol_info(self.symbol)
+				info = self.get_symbol_info()
 				point = info.point if info else 0.01
 				spread = float((tick.ask - tick.bid) / (point or 0.01))
 			return {
@@ -90,7 +105,7 @@ class MT5Connector:
 		if not self.initialized and not self.initialize():
 			return []
 		try:
-			positions = mt5.positions_get()
+			positions = broker_call(mt5.positions_get)
 			if symbol_filter:
 				positions = [p for p in (positions or []) if p.symbol == symbol_filter]
 			return positions or []
@@ -104,37 +119,80 @@ class MT5Connector:
 			from datetime import datetime, timedelta
 			end = dt.datetime.now()
 			start = end - dt.timedelta(days=5)
-			history = mt5.history_deals_get(start, end)
+			history = broker_call(mt5.history_deals_get, start, end)
 			return history or []
 		except Exception:
 			return []
 
+	def get_deals_between(self, start, end):
+		"""All account deals (every symbol) with time in [start, end]."""
+		if not self.initialized and not self.initialize():
+			return []
+		try:
+			return broker_call(mt5.history_deals_get, start, end) or []
+		except Exception:
+			return []
+
 	def get_deals_for_position(self, position_id: int):
 		if not self.initialized and not self.initialize():
 			return []
 		try:
-			deals = mt5.history_deals_get(position=position_id)
+			deals = broker_call(mt5.history_deals_get, position=position_id)
 			return deals or []
 		except Exception:
 			return []
 
 	def get_equity(self) -> Optional[float]:
+		if not self.initialized and not self.initialize():
+			return None
+		ai = self.get_account_info()
+		return float(ai.equity) if ai else None
+
+	def get_account_info(self):
+		"""Account info through the shared broker metadata cache."""
 		if not self.initialized and not self.initialize():
 			return None
 		try:
-			ai = mt5.account_info()
-			return float(ai.equity) if ai else None
+			return get_broker_cache().account_info(lambda: broker_call(mt5.account_info))
 		except Exception:
 			return None
 
 	def get_symbol_info(self):
+		"""Symbol spec through the shared broker metadata cache."""
 		if not self.initialized and not self.initialize():
 			return None
 		try:
-			return mt5.symbol_info(self.symbol)
+			return get_broker_cache().symbol_info(self.symbol, lambda: broker_call(mt5.symbol_info, self.symbol))
 		except Exception:
 			return None
 
+	def get_tick_value(self):
+		"""(trade_tick_value, trade_tick_size) for the symbol, cached with a shorter TTL."""
+		if not self.initialized and not self.initialize():
+			return (1.0, 0.01)
+		try:
+			return get_broker_cache().tick_value(self.symbol, lambda: broker_call(mt5.symbol_info, self.symbol))
+		except Exception:
+			return (1.0, 0.01)
+
+	def today_realized_pnl_by_symbol(self) -> Dict[str, float]:
+		"""Today's realized profit per symbol from a single deals query."""
+		if not self.initialized and not self.initialize():
+			return {}
+		totals: Dict[str, float] = {}
+		try:
+			now = dt.datetime.now()
+			start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+			for d in broker_call(mt5.history_deals_get, start, now) or []:
+				try:
+					sym = getattr(d, 'symbol', '')
+					totals[sym] = totals.get(sym, 0.0) + float(getattr(d, 'profit', 0.0))
+				except Exception:
+					pass
+		except Exception:
+			pass
+		return totals
+
 	def today_realized_pnl(self) -> float:
 		"""Sum of today's realized profit for this symbol."""
 		if not self.initialized and not self.initialize():
@@ -142,7 +200,7 @@ class MT5Connector:
 		try:
 			now = dt.datetime.now()
 			start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-			deals = mt5.history_deals_get(start, now)
+			deals = broker_call(mt5.history_deals_get, start, now)
 			total = 0.0
 			if deals:
 				for d in deals:
@@ -205,6 +205,40 @@ class NewsGate:
 # HARDCODED FEBRUARY 2025 EVENTS (for testing / minimal live scenario)
 # ============================================================================
 
+def is_off_session(now: Optional[datetime], sessions: dict) -> bool:
+    """True when ``now`` falls outside the configured trading session.
+
+    ``sessions`` is the ``sessions`` config section (timezone, trade_start,
+    trade_end, days); windows may cross midnight. ``now`` may be naive UTC,
+    timezone-aware, or None for the current time.
+    """
+    tz = pytz.timezone(sessions.get('timezone', 'Africa/Johannesburg'))
+    if now is None:
+        now = datetime.now(tz)
+    elif now.tzinfo is None:
+        now = pytz.utc.localize(now).astimezone(tz)
+    else:
+        now = now.astimezone(tz)
+    days = sessions.get('days', ['Mon', 'Tue', 'Wed', 'Thu', 'Fri'])
+    day = now.strftime('%a')
+    start_h, start_m = map(int, sessions.get('trade_start', '10:00').split(':'))
+    end_h, end_m = map(int, sessions.get('trade_end', '19:00').split(':'))
+    start_dt = now.replace(hour=start_h, minute=start_m, second=0, microsecond=0)
+    end_dt = now.replace(hour=end_h, minute=end_m, second=0, microsecond=0)
+    # Same-day window (e.g., 08:00 -> 19:00)
+    if end_dt >= start_dt:
+        if day not in days:
+            return True
+        return not (start_dt <= now <= end_dt)
+    # Overnight window crossing midnight (e.g., 20:00 -> 03:00)
+    prev_day = (now - timedelta(days=1)).strftime('%a')
+    on_session = (
+        (now >= start_dt and day in days) or  # after start today and today allowed
+        (now <= end_dt and prev_day in days)   # before end today and previous day allowed
+    )
+    return not on_session
+
+
 def get_default_calendar() -> NewsCalendar:
     """Return a calendar with common Tier-1 USD events.
     
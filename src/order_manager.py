@@ -8,6 +8,8 @@ from .persistence import PersistenceManager
 from .executor import AutoTrader
 from .microstructure import MicrostructureGate, SpreadAnalyzer, ChopDetector
 from .news_calendar import NewsGate, get_default_calendar
+from .metrics import timed
+from .position_service import get_position_service
 try:
 	from .mt5_connector import MT5Connector
 except Exception:
@@ -59,6 +61,16 @@ class CampaignManager:
 		self.events[key].append(now)
 		self.last_time[key] = now
 
+	def remaining(self, symbol: str, side: int, level: str, now: Optional[datetime] = None) -> int:
+		"""How many entries a burst sent right now may contain (spacing allows only the first)"""
+		now = now or datetime.utcnow()
+		if not self.allow(symbol, side, level, now):
+			return 0
+		if self.min_spacing.total_seconds() > 0:
+			return 1
+		limit = self.max_per_level.get(level.upper(), self.max_per_level.get('HIGH', 6))
+		return max(0, limit - self.current_count(symbol, side, level, now))
+
 	def current_count(self, symbol: str, side: int, level: str, now: Optional[datetime] = None) -> int:
 		now = now or datetime.utcnow()
 		key = self._key(symbol, side, level)
@@ -68,14 +80,77 @@ class CampaignManager:
 		return len(q)
 
 
+def _deal_position(deal) -> Optional[int]:
+	pos = getattr(deal, 'position_id', None)
+	return pos if pos else getattr(deal, 'position', None)
+
+
+def select_closing_deal(deals, ticket: int):
+	"""Pick the exit deal for ``ticket``: the latest type-1 (exit) deal, else any of its deals."""
+	closing_deal = None
+	for d in deals or []:
+		if _deal_position(d) != ticket:
+			continue
+		if getattr(d, 'type', None) == 1:
+			if not closing_deal or getattr(d, 'time', 0) >= getattr(closing_deal, 'time', 0):
+				closing_deal = d
+		elif not closing_deal:
+			closing_deal = d
+	return closing_deal
+
+
+class DealHistoryIndex:
+	"""Account deal history indexed by position id, refreshed by delta at most once per cycle.
+
+	The first refresh loads ``lookback``; later ones only fetch deals since the
+	previous fetch (minus ``overlap`` for late-arriving deals). Nothing is
+	fetched in a cycle where no ticket needs resolving.
+	"""
+	def __init__(self, mt5, lookback: timedelta = timedelta(hours=120), overlap: timedelta = timedelta(seconds=120)):
+		self.mt5 = mt5
+		self.lookback = lookback
+		self.overlap = overlap
+		self._by_position: Dict[int, Dict[int, object]] = defaultdict(dict)
+		self._fetched_until: Optional[datetime] = None
+		self._stale = True
+		self.fetches = 0
+
+	def begin_cycle(self):
+		self._stale = True
+
+	def _refresh(self):
+		now = datetime.now()
+		start = (self._fetched_until - self.overlap) if self._fetched_until else now - self.lookback
+		# The broker stamps deals in server time, which may run ahead of local time
+		deals = self.mt5.get_deals_between(start, now + timedelta(days=1))
+		self.fetches += 1
+		for d in deals or []:
+			pos = _deal_position(d)
+			if pos:
+				self._by_position[pos][getattr(d, 'ticket', id(d))] = d
+		self._fetched_until = now
+		self._stale = False
+
+	def deals_for(self, ticket: int) -> List[object]:
+		if self._stale:
+			self._refresh()
+		return list(self._by_position.get(ticket, {}).values())
+
+	def prune(self, keep):
+		"""Drop indexed positions not in ``keep`` (tickets still being tracked)."""
+		for pos in [p for p in self._by_position if p not in keep]:
+			del self._by_position[pos]
+
+
 class OrderManager:
 	"""Manages open positions: reconciliation, timed exit, BE moves, tiered TP logic"""
-	def __init__(self, symbol: str):
+	def __init__(self, symbol: str, mt5=None, persistence: Optional[PersistenceManager] = None, autotrader: Optional[AutoTrader] = None):
 		self.symbol = symbol
 		self.cfg = get_config()
-		self.persistence = PersistenceManager()
-		self.autotrader = AutoTrader(symbol)
-		self.mt5 = MT5Connector() if MT5Connector else None
+		# Shared instances may be passed in (e.g. by the multi-symbol supervisor)
+		self.persistence = persistence or PersistenceManager()
+		self.autotrader = autotrader or AutoTrader(symbol)
+		self.mt5 = mt5 or (MT5Connector() if MT5Connector else None)
 		self.managed: Dict[int, ManagedOrder] = {}
 		# Per-symbol caps
 		cfg = get_config()
@@ -90,6 +165,14 @@ class OrderManager:
 		self.lm_retrace_points = float(lm.get('retrace_points', 10.0))
 		self.lm_window_seconds = int(lm.get('improvement_window_seconds', 20))
 		self._minimize_state: Dict[int, Dict] = {}
+		# Closed-ticket enrichment: one deal-history delta per cycle ("batched") or one query per ticket
+		rc = cfg.get('execution', {}).get('reconcile', {})
+		self.deal_history_mode = rc.get('deal_history_mode', 'batched')
+		self.deal_index = DealHistoryIndex(
+			self.mt5,
+			lookback=timedelta(hours=float(rc.get('history_lookback_hours', 120))),
+			overlap=timedelta(seconds=float(rc.get('overlap_seconds', 120))),
+		) if self.mt5 else None
 		
 		# ===== PROFESSOR'S FIXES =====
 		# Microstructure gates (spread, chop)
@@ -123,13 +206,47 @@ class OrderManager:
 			'tier': tier or ''
 		})
 
-	def reconcile(self):
-		"""Poll MT5 and update statuses; apply exit rules"""
+	def register_new_orders(self, orders: List[Dict]):
+		"""Track a batch of filled orders and mark them OPEN in one transaction"""
+		now = datetime.utcnow()
+		updates = []
+		for o in orders:
+			ticket = o['ticket']
+			tier = o.get('tier')
+			self.managed[ticket] = ManagedOrder(ticket=ticket, open_time=now, entry=o['entry'], sl=o['sl'], tp=o['tp'], direction=o['direction'], alert_level=o['alert_level'], tier=tier)
+			updates.append((ticket, {
+				'open_time': now.isoformat(),
+				'status': 'OPEN',
+				'alert_level': o['alert_level'],
+				'tier': tier or ''
+			}))
+		self.persistence.update_trades(updates)
+
+	@timed('reconcile')
+	def reconcile(self, positions=None, equity: Optional[float] = None, realized_today: Optional[float] = None, deal_index: Optional[DealHistoryIndex] = None, positions_as_of: Optional[datetime] = None):
+		"""Update statuses from the shared position snapshot; apply exit rules
+
+		A caller that already polled the account (the multi-symbol supervisor)
+		passes this symbol's positions, the equity and today's realized PnL, and
+		may share one ``deal_index`` across symbols for the cycle. Orders
+		registered after ``positions_as_of`` (UTC) are not yet expected in
+		``positions`` and are never treated as closed.
+		"""
 		if not self.mt5:
 			return
 		# Per-symbol caps: compute realized PnL today
-		realized_today = self.mt5.today_realized_pnl()
-		equity = self.mt5.get_equity() or 0.0
+		if realized_today is None:
+			realized_today = self.mt5.today_realized_pnl()
+		if positions is None:
+			snap = get_position_service().snapshot()
+			if not snap.ok:
+				return
+			positions = snap.for_symbol(self.symbol)
+			positions_as_of = snap.as_of
+			if equity is None and snap.equity is not None:
+				equity = snap.equity
+		if equity is None:
+			equity = self.mt5.get_equity() or 0.0
 		loss_pct_today = 0.0
 		if equity > 0 and realized_today < 0:
 			loss_pct_today = abs(realized_today) / equity * 100.0
@@ -139,64 +256,28 @@ class OrderManager:
 			self.halt_new_orders = True
 		else:
 			self.halt_new_orders = False
-		positions = self.mt5.get_positions(self.symbol)
 		open_tickets = {p.ticket for p in positions}
 		# Close detection for tickets we track but are not open anymore
-		for ticket, state in list(self.managed.items()):
-			if ticket not in open_tickets:
-				# closed: try enrich with close price/time from MT5 deals history
-				close_price = None
-				close_time_iso = None
-				pnl = None
-				try:
-					deals = []
-					if hasattr(self.mt5, 'get_deals_for_position'):
-						deals = self.mt5.get_deals_for_position(ticket)
-					if not deals:
-						deals = self.mt5.get_orders_history(count=500)
-					
-					# Find the exit deal for this position (deal_type 1 = exit, 0 = entry)
-					closing_deal = None
-					for d in deals or []:
-						# Check position field (not position_id) and deal type
-						pos = getattr(d, 'position', None)
-						deal_type = getattr(d, 'type', None)
-						
-						if pos != ticket:
-							continue
-						
-						# Look for exit deal (type 1) or just the latest deal
-						if deal_type == 1:  # Exit deal
-							if not closing_deal or getattr(d, 'time', 0) >= getattr(closing_deal, 'time', 0):
-								closing_deal = d
-						elif not closing_deal:  # Fallback to any deal
-							closing_deal = d
-					
-					if closing_deal:
-						close_price = float(getattr(closing_deal, 'price', 0.0))
-						pnl = float(getattr(closing_deal, 'profit', 0.0))
-						try:
-							import datetime as _dt
-							ts = getattr(closing_deal, 'time', None)
-							if ts:
-								close_time_iso = _dt.datetime.fromtimestamp(ts).isoformat()
-						except Exception as e:
-							print(f"⚠️ Error parsing close time for ticket {ticket}: {e}")
-					else:
-						print(f"⚠️ No closing deal found for ticket {ticket} in {len(deals or [])} deals")
-				except Exception as e:
-					print(f"❌ Error fetching close data for ticket {ticket}: {e}")
-				
-				payload = {'status': 'CLOSED'}
-				if close_price is not None and close_price > 0:
-					payload['close_price'] = close_price
-					print(f"✅ Saved close_price={close_price:.2f} for ticket {ticket}")
-				if close_time_iso is not None:
-					payload['close_time'] = close_time_iso
-				if pnl is not None:
-					payload['pnl'] = pnl
-				self.persistence.update_trade(ticket, payload)
+		closed = [
+			ticket for ticket, st in self.managed.items()
+			if ticket not in open_tickets and (positions_as_of is None or st.open_time <= positions_as_of)
+		]
+		if closed:
+			if self.deal_history_mode != 'batched':
+				deal_index = None
+			elif deal_index is None and self.deal_index is not None:
+				deal_index = self.deal_index
+				deal_index.begin_cycle()
+			updates = [(ticket, self._closed_trade_payload(ticket, deal_index)) for ticket in closed]
+			if hasattr(self.persistence, 'update_trades'):
+				self.persistence.update_trades(updates)
+			else:
+				for ticket, payload in updates:
+					self.persistence.update_trade(ticket, payload)
+			for ticket in closed:
 				self.managed.pop(ticket, None)
+			if deal_index is self.deal_index and deal_index is not None:
+				deal_index.prune(self.managed)
 		# Apply rules for open positions
 		for p in positions:
 			st = self.managed.get(p.ticket)
@@ -204,6 +285,44 @@ class OrderManager:
 				continue
 			self._apply_exit_rules(p, st)
 
+	def _closed_trade_payload(self, ticket: int, deal_index: Optional[DealHistoryIndex] = None) -> Dict:
+		"""Close price/time/PnL for a ticket that left the open positions, from MT5 deal history"""
+		close_price = None
+		close_time_iso = None
+		pnl = None
+		try:
+			deals = []
+			if deal_index is not None:
+				deals = deal_index.deals_for(ticket)
+			if not deals and hasattr(self.mt5, 'get_deals_for_position'):
+				deals = self.mt5.get_deals_for_position(ticket)
+			if not deals and deal_index is None:
+				deals = self.mt5.get_orders_history(count=500)
+			closing_deal = select_closing_deal(deals, ticket)
+			if closing_deal:
+				close_price = float(getattr(closing_deal, 'price', 0.0))
+				pnl = float(getattr(closing_deal, 'profit', 0.0))
+				try:
+					ts = getattr(closing_deal, 'time', None)
+					if ts:
+						close_time_iso = datetime.fromtimestamp(ts).isoformat()
+				except Exception as e:
+					print(f"⚠️ Error parsing close time for ticket {ticket}: {e}")
+			else:
+				print(f"⚠️ No closing deal found for ticket {ticket} in {len(deals or [])} deals")
+		except Exception as e:
+			print(f"❌ Error fetching close data for ticket {ticket}: {e}")
+
+		payload = {'status': 'CLOSED'}
+		if close_price is not None and close_price > 0:
+			payload['close_price'] = close_price
+			print(f"✅ Saved close_price={close_price:.2f} for ticket {ticket}")
+		if close_time_iso is not None:
+			payload['close_time'] = close_time_iso
+		if pnl is not None:
+			payload['pnl'] = pnl
+		return payload
+
 	def _apply_exit_rules(self, pos, st: ManagedOrder):
 		"""Apply BE, time-based exit, and tier TP for low/medium/high"""
 		try:
@@ -243,9 +362,7 @@ class OrderManager:
 
 	def _approx_unrealized_dollars(self, pos, current_price: float) -> float:
 		try:
-			info = self.mt5.get_symbol_info()
-			tick_val = float(getattr(info, 'trade_tick_value', 1.0)) if info else 1.0
-			tick_size = float(getattr(info, 'trade_tick_size', 0.01)) if info else 0.01
+			tick_val, tick_size = self.mt5.get_tick_value()
 			points = (current_price - pos.price_open) if pos.type == 0 else (pos.price_open - current_price)  # 0=buy,1=sell
 			ticks = points / (tick_size or 0.01)
 			return float(pos.volume) * ticks * tick_val
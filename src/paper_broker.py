@@ -0,0 +1,768 @@
+"""Simulated MetaTrader5 terminal for offline runs, integration tests and benchmarks.
+
+The execution path (``executor``, ``mt5_connector``, ``order_manager``, the
+dashboard) talks to the ``MetaTrader5`` package, which only exists next to a
+Windows terminal. This module implements the subset of that API the code uses
+against an in-process :class:`PaperBroker`:
+
+``initialize``/``login``/``shutdown``, ``symbol_select``, ``symbol_info``,
+``symbol_info_tick``, ``copy_rates_from_pos``, ``order_send`` (market deals,
+closes and SL/TP changes), ``order_calc_margin``, ``positions_get``,
+``history_deals_get`` and ``account_info``, plus the constants they need.
+
+Prices come from a tick source: :class:`SyntheticTicks` (seeded random walk)
+or :class:`RecordedTicks` (a DataFrame/CSV with time, bid, ask). Every order
+send pays a configurable latency, fills with adverse slippage, and may be
+rejected at random. Stops and targets are checked on each tick.
+
+:func:`install` registers this module as ``MetaTrader5`` and rebinds the
+already-imported ``mt5`` references, so the rest of the code runs unchanged::
+
+    from src import paper_broker
+    broker = paper_broker.install()
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+
+# --- Constants (same values as the MetaTrader5 package) -----------------------
+TIMEFRAME_M1 = 1
+TIMEFRAME_M5 = 5
+TIMEFRAME_M15 = 15
+TIMEFRAME_M30 = 30
+TIMEFRAME_H1 = 16385
+TIMEFRAME_H4 = 16388
+TIMEFRAME_D1 = 16408
+_TIMEFRAME_MINUTES = {
+    TIMEFRAME_M1: 1, TIMEFRAME_M5: 5, TIMEFRAME_M15: 15, TIMEFRAME_M30: 30,
+    TIMEFRAME_H1: 60, TIMEFRAME_H4: 240, TIMEFRAME_D1: 1440,
+}
+
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+DEAL_TYPE_BUY = 0
+DEAL_TYPE_SELL = 1
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_REASON_EXPERT = 3
+DEAL_REASON_SL = 4
+DEAL_REASON_TP = 5
+
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_SLTP = 6
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ORDER_FILLING_RETURN = 2
+
+TRADE_RETCODE_REQUOTE = 10004
+TRADE_RETCODE_REJECT = 10006
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_INVALID_VOLUME = 10014
+TRADE_RETCODE_INVALID_STOPS = 10016
+TRADE_RETCODE_NO_MONEY = 10019
+TRADE_RETCODE_POSITION_CLOSED = 10036
+
+_RATE_DTYPE = np.dtype([
+    ("time", "<i8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"), ("close", "<f8"),
+    ("tick_volume", "<u8"), ("spread", "<i4"), ("real_volume", "<u8"),
+])
+
+
+# --- Records (MetaTrader5 returns named tuples) -------------------------------
+class Tick(NamedTuple):
+    time: int
+    bid: float
+    ask: float
+    last: float
+    volume: int
+    time_msc: int
+    flags: int = 0
+    volume_real: float = 0.0
+
+
+class SymbolInfo(NamedTuple):
+    name: str
+    point: float
+    digits: int
+    trade_contract_size: float
+    trade_tick_value: float
+    trade_tick_size: float
+    volume_min: float
+    volume_max: float
+    volume_step: float
+    stops_level: int
+    spread: int
+    bid: float
+    ask: float
+    visible: bool = True
+
+
+class TradePosition(NamedTuple):
+    ticket: int
+    time: int
+    type: int
+    magic: int
+    identifier: int
+    volume: float
+    price_open: float
+    sl: float
+    tp: float
+    price_current: float
+    swap: float
+    profit: float
+    symbol: str
+    comment: str
+
+
+class TradeDeal(NamedTuple):
+    ticket: int
+    order: int
+    time: int
+    time_msc: int
+    type: int
+    entry: int
+    magic: int
+    position_id: int
+    reason: int
+    volume: float
+    price: float
+    commission: float
+    swap: float
+    profit: float
+    fee: float
+    symbol: str
+    comment: str
+
+
+class AccountInfo(NamedTuple):
+    login: int
+    server: str
+    currency: str
+    leverage: int
+    balance: float
+    equity: float
+    profit: float
+    margin: float
+    margin_free: float
+    margin_level: float
+
+
+class OrderSendResult(NamedTuple):
+    retcode: int
+    deal: int
+    order: int
+    volume: float
+    price: float
+    bid: float
+    ask: float
+    comment: str
+    request_id: int
+    retcode_external: int
+    request: Dict[str, Any]
+
+
+# --- Tick sources -------------------------------------------------------------
+class SyntheticTicks:
+    """Seeded Gaussian random walk. ``clock='wall'`` stamps ticks with the current time."""
+
+    def __init__(
+        self,
+        start_price: float = 2000.0,
+        volatility: float = 0.15,
+        spread: float = 0.20,
+        interval_seconds: float = 1.0,
+        seed: Optional[int] = None,
+        clock: str = "wall",
+        start_time: Optional[float] = None,
+    ) -> None:
+        self.price = float(start_price)
+        self.volatility = float(volatility)
+        self.spread = float(spread)
+        self.interval = float(interval_seconds)
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self._t = float(start_time if start_time is not None else time.time())
+
+    def history(self, minutes: int, end_time: float) -> pd.DataFrame:
+        """M1 bars leading up to ``end_time`` that end at the current price."""
+        n = max(1, int(minutes))
+        steps = np.array([self.rng.gauss(0.0, self.volatility * 4.0) for _ in range(n)])
+        closes = self.price - np.cumsum(steps[::-1])[::-1] + steps[-1]
+        opens = np.concatenate([[closes[0]], closes[:-1]])
+        wiggle = np.abs(np.array([self.rng.gauss(0.0, self.volatility * 2.0) for _ in range(n)]))
+        start = (int(end_time) // 60 - n) * 60
+        return pd.DataFrame({
+            "time": start + np.arange(n) * 60,
+            "open": opens,
+            "high": np.maximum(opens, closes) + wiggle,
+            "low": np.minimum(opens, closes) - wiggle,
+            "close": closes,
+            "tick_volume": np.full(n, 60, dtype=np.uint64),
+        })
+
+    def __iter__(self) -> Iterator[Tick]:
+        return self
+
+    def __next__(self) -> Tick:
+        self.price = max(0.01, self.price + self.rng.gauss(0.0, self.volatility))
+        self._t = time.time() if self.clock == "wall" else self._t + self.interval
+        bid = round(self.price - self.spread / 2.0, 2)
+        ask = round(self.price + self.spread / 2.0, 2)
+        return Tick(int(self._t), bid, ask, round(self.price, 2), 1, int(self._t * 1000))
+
+
+class RecordedTicks:
+    """Replays a recorded tick file (columns: time, bid, ask[, last, volume]); time in epoch seconds or datetimes."""
+
+    def __init__(self, data: Union[str, pd.DataFrame], loop: bool = False) -> None:
+        df = pd.read_csv(data) if isinstance(data, str) else data.copy()
+        if not np.issubdtype(df["time"].dtype, np.number):
+            df["time"] = pd.to_datetime(df["time"]).astype("int64") // 10**9
+        if "last" not in df.columns:
+            df["last"] = (df["bid"] + df["ask"]) / 2.0
+        if "volume" not in df.columns:
+            df["volume"] = 1
+        self._rows = df[["time", "bid", "ask", "last", "volume"]].to_numpy()
+        self._pos = 0
+        self.loop = loop
+
+    def history(self, minutes: int, end_time: float) -> pd.DataFrame:
+        return pd.DataFrame(columns=["time", "open", "high", "low", "close", "tick_volume"])
+
+    def __iter__(self) -> Iterator[Tick]:
+        return self
+
+    def __next__(self) -> Tick:
+        if self._pos >= len(self._rows):
+            if not self.loop or not len(self._rows):
+                raise StopIteration
+            self._pos = 0
+        t, bid, ask, last, volume = self._rows[self._pos]
+        self._pos += 1
+        return Tick(int(t), float(bid), float(ask), float(last), int(volume), int(float(t) * 1000))
+
+
+# --- Execution models ---------------------------------------------------------
+@dataclass
+class ExecutionModel:
+    """Latency, slippage and rejection applied to every order_send."""
+    latency_ms: float = 0.0
+    latency_jitter_ms: float = 0.0
+    slippage_points: float = 0.0  # maximum adverse slippage, uniformly drawn
+    reject_rate: float = 0.0  # probability of a random broker reject
+    requote_rate: float = 0.0  # probability of a requote
+    seed: Optional[int] = None
+    rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.rng = random.Random(self.seed)
+
+    def wait(self) -> None:
+        delay = self.latency_ms + (self.rng.uniform(-1.0, 1.0) * self.latency_jitter_ms if self.latency_jitter_ms else 0.0)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+
+    def slippage(self, point: float) -> float:
+        return self.rng.uniform(0.0, self.slippage_points) * point if self.slippage_points > 0 else 0.0
+
+    def outcome(self) -> int:
+        roll = self.rng.random()
+        if roll < self.reject_rate:
+            return TRADE_RETCODE_REJECT
+        if roll < self.reject_rate + self.requote_rate:
+            return TRADE_RETCODE_REQUOTE
+        return TRADE_RETCODE_DONE
+
+
+@dataclass
+class SymbolSpec:
+    name: str
+    point: float = 0.01
+    digits: int = 2
+    contract_size: float = 100.0
+    tick_value: float = 1.0
+    tick_size: float = 0.01
+    volume_min: float = 0.01
+    volume_max: float = 100.0
+    volume_step: float = 0.01
+    stops_level: int = 0
+
+
+@dataclass
+class _Position:
+    ticket: int
+    symbol: str
+    type: int
+    volume: float
+    price_open: float
+    sl: float
+    tp: float
+    time: int
+    magic: int
+    comment: str
+
+
+class _SymbolState:
+    def __init__(self, spec: SymbolSpec, source, history_minutes: int) -> None:
+        self.spec = spec
+        self.source = source
+        self.tick: Optional[Tick] = None
+        self.selected = False
+        self.exhausted = False
+        self.bars: List[List[float]] = []  # [time, open, high, low, close, tick_volume]
+        self._history_minutes = history_minutes
+
+    def prime(self) -> None:
+        self.tick = next(self.source)
+        hist = self.source.history(self._history_minutes, self.tick.time)
+        self.bars = hist[["time", "open", "high", "low", "close", "tick_volume"]].astype(float).values.tolist()
+        self._add_to_bars(self.tick)
+
+    def _add_to_bars(self, tick: Tick) -> None:
+        minute = (tick.time // 60) * 60
+        price = tick.bid
+        if self.bars and self.bars[-1][0] == minute:
+            bar = self.bars[-1]
+            bar[2] = max(bar[2], price)
+            bar[3] = min(bar[3], price)
+            bar[4] = price
+            bar[5] += 1
+        elif not self.bars or minute > self.bars[-1][0]:
+            self.bars.append([minute, price, price, price, price, 1])
+
+    def advance(self) -> Optional[Tick]:
+        if self.tick is None:
+            self.prime()
+            return self.tick
+        try:
+            tick = next(self.source)
+        except StopIteration:
+            self.exhausted = True
+            return self.tick
+        self.tick = tick
+        self._add_to_bars(tick)
+        return tick
+
+
+# --- Broker -------------------------------------------------------------------
+class PaperBroker:
+    """In-process account, symbols, positions and deal history."""
+
+    def __init__(
+        self,
+        balance: float = 10000.0,
+        leverage: int = 500,
+        currency: str = "USD",
+        execution: Optional[ExecutionModel] = None,
+        auto_advance: bool = True,
+        history_minutes: int = 3000,
+    ) -> None:
+        self.balance = float(balance)
+        self.leverage = int(leverage)
+        self.currency = currency
+        self.execution = execution or ExecutionModel()
+        self.auto_advance = auto_advance
+        self.history_minutes = int(history_minutes)
+        self.symbols: Dict[str, _SymbolState] = {}
+        self.positions: Dict[int, _Position] = {}
+        self.deals: List[TradeDeal] = []
+        self._next_ticket = 1000
+        self._lock = threading.RLock()
+        self.initialized = False
+        self.stats = {"order_sends": 0, "fills": 0, "rejects": 0, "requotes": 0, "stops_hit": 0}
+
+    @classmethod
+    def from_config(cls) -> "PaperBroker":
+        cfg = get_config().get("paper_broker", {})
+        broker = cls(
+            balance=cfg.get("balance", 10000.0),
+            leverage=cfg.get("leverage", 500),
+            execution=ExecutionModel(
+                latency_ms=cfg.get("latency_ms", 0.0),
+                latency_jitter_ms=cfg.get("latency_jitter_ms", 0.0),
+                slippage_points=cfg.get("slippage_points", 0.0),
+                reject_rate=cfg.get("reject_rate", 0.0),
+                requote_rate=cfg.get("requote_rate", 0.0),
+                seed=cfg.get("seed"),
+            ),
+            history_minutes=cfg.get("history_minutes", 3000),
+        )
+        for name, sym_cfg in (cfg.get("symbols") or {}).items():
+            sym_cfg = dict(sym_cfg)
+            ticks_path = sym_cfg.pop("ticks_csv", None)
+            synth = {k: sym_cfg.pop(k) for k in ("start_price", "volatility", "spread", "seed") if k in sym_cfg}
+            source = RecordedTicks(ticks_path, loop=True) if ticks_path else SyntheticTicks(**synth)
+            broker.add_symbol(SymbolSpec(name=name, **sym_cfg), source)
+        return broker
+
+    # ------------------------------------------------------------------
+    # Setup / market data
+    # ------------------------------------------------------------------
+    def add_symbol(self, spec: Union[SymbolSpec, str], source=None) -> None:
+        if isinstance(spec, str):
+            spec = SymbolSpec(name=spec)
+        with self._lock:
+            self.symbols[spec.name] = _SymbolState(spec, source or SyntheticTicks(), self.history_minutes)
+
+    def _state(self, symbol: str) -> Optional[_SymbolState]:
+        state = self.symbols.get(symbol)
+        if state is None:
+            # Unknown symbols get a default spec and a random walk, like a demo server would
+            self.add_symbol(symbol)
+            state = self.symbols[symbol]
+        if state.tick is None:
+            state.prime()
+        return state
+
+    def advance(self, symbol: Optional[str] = None, steps: int = 1) -> None:
+        """Move the tick feed forward and trigger stops/targets."""
+        with self._lock:
+            names = [symbol] if symbol else list(self.symbols)
+            for _ in range(max(1, steps)):
+                for name in names:
+                    state = self._state(name)
+                    tick = state.advance()
+                    if tick is not None:
+                        self._check_stops(name, tick)
+
+    def tick(self, symbol: str) -> Optional[Tick]:
+        with self._lock:
+            if self.auto_advance and symbol in self.symbols and self.symbols[symbol].tick is not None:
+                self.advance(symbol)
+            state = self._state(symbol)
+            return state.tick
+
+    def rates(self, symbol: str, timeframe: int, start_pos: int, count: int):
+        minutes = _TIMEFRAME_MINUTES.get(timeframe)
+        if minutes is None:
+            return None
+        with self._lock:
+            state = self._state(symbol)
+            bars = np.array(state.bars, dtype=float)
+        if not len(bars):
+            return np.zeros(0, dtype=_RATE_DTYPE)
+        if minutes > 1:
+            df = pd.DataFrame(bars, columns=["time", "open", "high", "low", "close", "tick_volume"])
+            df["bucket"] = (df["time"] // (minutes * 60)) * minutes * 60
+            g = df.groupby("bucket", sort=True)
+            bars = pd.DataFrame({
+                "time": g["time"].first().index,
+                "open": g["open"].first().values,
+                "high": g["high"].max().values,
+                "low": g["low"].min().values,
+                "close": g["close"].last().values,
+                "tick_volume": g["tick_volume"].sum().values,
+            }).to_numpy(dtype=float)
+        end = len(bars) - int(start_pos)
+        chosen = bars[max(0, end - int(count)):max(0, end)]
+        out = np.zeros(len(chosen), dtype=_RATE_DTYPE)
+        for i, name in enumerate(("time", "open", "high", "low", "close", "tick_volume")):
+            out[name] = chosen[:, i]
+        spec = self.symbols[symbol].spec
+        tick = self.symbols[symbol].tick
+        out["spread"] = int(round((tick.ask - tick.bid) / spec.point)) if tick else 0
+        return out
+
+    def symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        with self._lock:
+            state = self._state(symbol)
+            s, t = state.spec, state.tick
+            return SymbolInfo(
+                name=s.name, point=s.point, digits=s.digits, trade_contract_size=s.contract_size,
+                trade_tick_value=s.tick_value, trade_tick_size=s.tick_size, volume_min=s.volume_min,
+                volume_max=s.volume_max, volume_step=s.volume_step, stops_level=s.stops_level,
+                spread=int(round((t.ask - t.bid) / s.point)), bid=t.bid, ask=t.ask, visible=state.selected,
+            )
+
+    # ------------------------------------------------------------------
+    # Account
+    # ------------------------------------------------------------------
+    def _profit(self, pos: _Position, price: float) -> float:
+        spec = self.symbols[pos.symbol].spec
+        diff = (price - pos.price_open) if pos.type == POSITION_TYPE_BUY else (pos.price_open - price)
+        return diff / (spec.tick_size or spec.point) * spec.tick_value * pos.volume
+
+    def _close_price(self, pos: _Position) -> float:
+        tick = self.symbols[pos.symbol].tick
+        return tick.bid if pos.type == POSITION_TYPE_BUY else tick.ask
+
+    def calc_margin(self, order_type: int, symbol: str, volume: float, price: float) -> Optional[float]:
+        with self._lock:
+            state = self._state(symbol)
+        if volume <= 0 or price <= 0:
+            return None
+        return round(volume * state.spec.contract_size * price / self.leverage, 2)
+
+    def account(self) -> AccountInfo:
+        with self._lock:
+            floating = sum(self._profit(p, self._close_price(p)) for p in self.positions.values())
+            margin = sum(
+                self.calc_margin(p.type, p.symbol, p.volume, p.price_open) or 0.0 for p in self.positions.values()
+            )
+            equity = self.balance + floating
+            return AccountInfo(
+                login=1, server="PaperBroker", currency=self.currency, leverage=self.leverage,
+                balance=round(self.balance, 2), equity=round(equity, 2), profit=round(floating, 2),
+                margin=round(margin, 2), margin_free=round(equity - margin, 2),
+                margin_level=round(equity / margin * 100.0, 2) if margin else 0.0,
+            )
+
+    def position_list(self, symbol: Optional[str] = None, ticket: Optional[int] = None) -> tuple:
+        with self._lock:
+            out = []
+            for p in self.positions.values():
+                if symbol and p.symbol != symbol:
+                    continue
+                if ticket and p.ticket != ticket:
+                    continue
+                price = self._close_price(p)
+                out.append(TradePosition(
+                    ticket=p.ticket, time=p.time, type=p.type, magic=p.magic, identifier=p.ticket,
+                    volume=p.volume, price_open=p.price_open, sl=p.sl, tp=p.tp, price_current=price,
+                    swap=0.0, profit=round(self._profit(p, price), 2), symbol=p.symbol, comment=p.comment,
+                ))
+            return tuple(out)
+
+    def deal_list(self, date_from=None, date_to=None, position: Optional[int] = None) -> tuple:
+        def ts(value):
+            if value is None:
+                return None
+            return value.timestamp() if isinstance(value, datetime) else float(value)
+        lo, hi = ts(date_from), ts(date_to)
+        with self._lock:
+            return tuple(
+                d for d in self.deals
+                if (position is None or d.position_id == position)
+                and (lo is None or d.time >= lo) and (hi is None or d.time <= hi)
+            )
+
+    # ------------------------------------------------------------------
+    # Trading
+    # ------------------------------------------------------------------
+    def _ticket(self) -> int:
+        self._next_ticket += 1
+        return self._next_ticket
+
+    def _result(self, retcode: int, request: Dict, comment: str, deal: int = 0, order: int = 0,
+                volume: float = 0.0, price: float = 0.0, tick: Optional[Tick] = None) -> OrderSendResult:
+        return OrderSendResult(
+            retcode=retcode, deal=deal, order=order, volume=volume, price=price,
+            bid=tick.bid if tick else 0.0, ask=tick.ask if tick else 0.0, comment=comment,
+            request_id=0, retcode_external=0, request=dict(request),
+        )
+
+    def _add_deal(self, pos: _Position, entry: int, volume: float, price: float, reason: int, profit: float,
+                  tick: Tick, order: int) -> int:
+        deal_ticket = self._ticket()
+        deal_type = pos.type if entry == DEAL_ENTRY_IN else (1 - pos.type)
+        self.deals.append(TradeDeal(
+            ticket=deal_ticket, order=order, time=tick.time, time_msc=tick.time_msc, type=deal_type, entry=entry,
+            magic=pos.magic, position_id=pos.ticket, reason=reason, volume=volume, price=price, commission=0.0,
+            swap=0.0, profit=round(profit, 2), fee=0.0, symbol=pos.symbol, comment=pos.comment,
+        ))
+        return deal_ticket
+
+    def _close(self, pos: _Position, volume: float, price: float, reason: int, tick: Tick, order: int) -> int:
+        volume = min(volume, pos.volume)
+        part = _Position(**{**pos.__dict__, "volume": volume})
+        profit = self._profit(part, price)
+        self.balance += profit
+        deal = self._add_deal(pos, DEAL_ENTRY_OUT, volume, price, reason, profit, tick, order)
+        pos.volume = round(pos.volume - volume, 2)
+        if pos.volume <= 0:
+            self.positions.pop(pos.ticket, None)
+        return deal
+
+    def _check_stops(self, symbol: str, tick: Tick) -> None:
+        for pos in [p for p in self.positions.values() if p.symbol == symbol]:
+            price = tick.bid if pos.type == POSITION_TYPE_BUY else tick.ask
+            long = pos.type == POSITION_TYPE_BUY
+            if pos.sl and ((long and price <= pos.sl) or (not long and price >= pos.sl)):
+                self._close(pos, pos.volume, pos.sl, DEAL_REASON_SL, tick, 0)
+                self.stats["stops_hit"] += 1
+            elif pos.tp and ((long and price >= pos.tp) or (not long and price <= pos.tp)):
+                self._close(pos, pos.volume, pos.tp, DEAL_REASON_TP, tick, 0)
+                self.stats["stops_hit"] += 1
+
+    def send(self, request: Dict[str, Any]) -> OrderSendResult:
+        self.stats["order_sends"] += 1
+        self.execution.wait()
+        action = request.get("action")
+        symbol = request.get("symbol")
+        with self._lock:
+            if action == TRADE_ACTION_SLTP:
+                pos = self.positions.get(int(request.get("position", 0)))
+                if pos is None:
+                    return self._result(TRADE_RETCODE_POSITION_CLOSED, request, "Position doesn't exist")
+                pos.sl = float(request.get("sl") or 0.0)
+                pos.tp = float(request.get("tp") or 0.0)
+                return self._result(TRADE_RETCODE_DONE, request, "Request executed", order=pos.ticket)
+            if action != TRADE_ACTION_DEAL or not symbol:
+                return self._result(TRADE_RETCODE_INVALID, request, "Invalid request")
+            state = self._state(symbol)
+            spec, tick = state.spec, state.tick
+            outcome = self.execution.outcome()
+            if outcome != TRADE_RETCODE_DONE:
+                self.stats["rejects" if outcome == TRADE_RETCODE_REJECT else "requotes"] += 1
+                return self._result(outcome, request, "Requote" if outcome == TRADE_RETCODE_REQUOTE else "Rejected", tick=tick)
+            order_type = int(request.get("type", ORDER_TYPE_BUY))
+            volume = float(request.get("volume", 0.0))
+            market = tick.ask if order_type == ORDER_TYPE_BUY else tick.bid
+            slip = self.execution.slippage(spec.point)
+            fill = round(market + slip if order_type == ORDER_TYPE_BUY else market - slip, spec.digits)
+            requested = request.get("price")
+            deviation = float(request.get("deviation", 0) or 0) * spec.point
+            if requested and deviation and abs(fill - float(requested)) > deviation:
+                self.stats["requotes"] += 1
+                return self._result(TRADE_RETCODE_REQUOTE, request, "Requote", tick=tick)
+
+            if request.get("position"):
+                pos = self.positions.get(int(request["position"]))
+                if pos is None:
+                    return self._result(TRADE_RETCODE_POSITION_CLOSED, request, "Position doesn't exist", tick=tick)
+                deal = self._close(pos, volume or pos.volume, fill, DEAL_REASON_EXPERT, tick, self._ticket())
+                self.stats["fills"] += 1
+                return self._result(TRADE_RETCODE_DONE, request, "Request executed", deal=deal,
+                                    order=pos.ticket, volume=volume, price=fill, tick=tick)
+
+            steps = (volume - spec.volume_min) / spec.volume_step
+            if volume < spec.volume_min or volume > spec.volume_max or abs(steps - round(steps)) > 1e-6:
+                return self._result(TRADE_RETCODE_INVALID_VOLUME, request, "Invalid volume", tick=tick)
+            sl, tp = float(request.get("sl") or 0.0), float(request.get("tp") or 0.0)
+            min_dist = spec.stops_level * spec.point
+            long = order_type == ORDER_TYPE_BUY
+            if (sl and ((long and sl > fill - min_dist) or (not long and sl < fill + min_dist))) or \
+                    (tp and ((long and tp < fill + min_dist) or (not long and tp > fill - min_dist))):
+                return self._result(TRADE_RETCODE_INVALID_STOPS, request, "Invalid stops", tick=tick)
+            needed = self.calc_margin(order_type, symbol, volume, fill) or 0.0
+            if needed > self.account().margin_free:
+                return self._result(TRADE_RETCODE_NO_MONEY, request, "No money", tick=tick)
+            ticket = self._ticket()
+            pos = _Position(
+                ticket=ticket, symbol=symbol, type=POSITION_TYPE_BUY if long else POSITION_TYPE_SELL,
+                volume=volume, price_open=fill, sl=sl, tp=tp, time=tick.time,
+                magic=int(request.get("magic", 0) or 0), comment=str(request.get("comment", "")),
+            )
+            self.positions[ticket] = pos
+            deal = self._add_deal(pos, DEAL_ENTRY_IN, volume, fill, DEAL_REASON_EXPERT, 0.0, tick, ticket)
+            self.stats["fills"] += 1
+            return self._result(TRADE_RETCODE_DONE, request, "Request executed", deal=deal, order=ticket,
+                                volume=volume, price=fill, tick=tick)
+
+
+# --- MetaTrader5-compatible module API ---------------------------------------
+_broker: Optional[PaperBroker] = None
+
+
+def _default() -> PaperBroker:
+    global _broker
+    if _broker is None:
+        _broker = PaperBroker.from_config()
+    return _broker
+
+
+def initialize(*args, **kwargs) -> bool:
+    _default().initialized = True
+    return True
+
+
+def login(*args, **kwargs) -> bool:
+    return True
+
+
+def shutdown() -> None:
+    if _broker is not None:
+        _broker.initialized = False
+
+
+def last_error():
+    return (1, "Success")
+
+
+def symbol_select(symbol: str, enable: bool = True) -> bool:
+    _default()._state(symbol).selected = bool(enable)
+    return True
+
+
+def symbol_info(symbol: str):
+    return _default().symbol_info(symbol)
+
+
+def symbol_info_tick(symbol: str):
+    return _default().tick(symbol)
+
+
+def copy_rates_from_pos(symbol: str, timeframe: int, start_pos: int, count: int):
+    return _default().rates(symbol, timeframe, start_pos, count)
+
+
+def order_send(request: Dict[str, Any]):
+    return _default().send(request)
+
+
+def order_calc_margin(action: int, symbol: str, volume: float, price: float):
+    return _default().calc_margin(action, symbol, volume, price)
+
+
+def positions_get(symbol: Optional[str] = None, group: Optional[str] = None, ticket: Optional[int] = None):
+    return _default().position_list(symbol=symbol, ticket=ticket)
+
+
+def positions_total() -> int:
+    return len(_default().positions)
+
+
+def history_deals_get(date_from=None, date_to=None, group: Optional[str] = None, position: Optional[int] = None, ticket: Optional[int] = None):
+    return _default().deal_list(date_from, date_to, position=position)
+
+
+def account_info():
+    return _default().account()
+
+
+def install(broker: Optional[PaperBroker] = None) -> PaperBroker:
+    """Serve ``import MetaTrader5`` from this module and rebind already-imported modules."""
+    global _broker
+    _broker = broker or _default()
+    module = sys.modules[__name__]
+    sys.modules["MetaTrader5"] = module
+    for name in ("src.executor", "src.mt5_connector", "executor", "mt5_connector"):
+        loaded = sys.modules.get(name)
+        if loaded is not None and hasattr(loaded, "mt5"):
+            loaded.mt5 = module
+    return _broker
+
+
+if __name__ == "__main__":
+    # Quick latency benchmark of the order path against the simulated terminal
+    from . import paper_broker
+    broker = paper_broker.install()
+    from .executor import AutoTrader
+    from .metrics import get_metrics
+
+    symbol = get_config().get("broker", {}).get("symbol", "XAUUSD")
+    trader = AutoTrader(symbol)
+    trader.enabled = True
+    for i in range(200):
+        tick = broker.tick(symbol)
+        side = 1 if i % 2 == 0 else -1
+        entry = tick.ask if side == 1 else tick.bid
+        trader.place_market_order(side, entry, entry - 5 * side, entry + 5 * side)
+    for name, summary in get_metrics().snapshot()["stages"].items():
+        print(f"{name}: p50={summary['p50_ms']:.3f}ms p99={summary['p99_ms']:.3f}ms n={summary['count']}")
+    print(broker.stats, broker.account())
@@ -1,179 +1,602 @@
+import atexit
 import os
+import queue
 import sqlite3
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+from datetime import datetime, timedelta, timezone
+
+from .config import get_config
+from .metrics import get_metrics, timed
+from .write_behind import JournalLockedError, TradeJournal, WriteBehindQueue
 
 DB_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'trades.sqlite')
 
+# Applied to every pooled connection. WAL lets readers run alongside the writer;
+# synchronous=NORMAL only fsyncs at checkpoints, which is durable across app
+# crashes (a power loss can drop the last commits but never corrupts the file).
+_PRAGMAS = (
+	"PRAGMA synchronous=NORMAL",
+	"PRAGMA busy_timeout=5000",
+	"PRAGMA temp_store=MEMORY",
+	"PRAGMA cache_size=-8000",
+)
+
+SIGNAL_COLUMNS = [
+	'timestamp','symbol','current_price','signal','signal_type','confidence','rsi','macd','macd_signal',
+	'sma_20','sma_50','price_change','price_change_pct','alert_level','alert_color','target_pips','success_rate',
+	'entry_price','stop_loss','take_profit_1','take_profit_2','take_profit_3','risk_reward_ratio','atr_value',
+	'position_size_percent','risk_amount_dollars','potential_profit_tp1','potential_profit_tp2','potential_profit_tp3',
+	'signal_strength','signal_vote_sum','signal_pos_votes','signal_neg_votes','signal_total_votes'
+]
+_INSERT_SIGNAL_SQL = f"INSERT INTO signals ({','.join(SIGNAL_COLUMNS)}) VALUES ({','.join(['?'] * len(SIGNAL_COLUMNS))})"
+
+# engine_daily_stats: one row per (day, engine, tier, alert_level, symbol), kept in
+# step with the trades table so analytics reads never scan trades.
+ANALYTICS_DIMS = ('day', 'engine', 'tier', 'alert_level', 'symbol')
+_ANALYTICS_VALUES = ('trades', 'closed', 'wins', 'losses', 'pnl_sum', 'r_sum', 'r_count')
+_UPSERT_ANALYTICS_SQL = (
+	f"INSERT INTO engine_daily_stats ({','.join(ANALYTICS_DIMS + _ANALYTICS_VALUES)}) "
+	f"VALUES ({','.join(['?'] * (len(ANALYTICS_DIMS) + len(_ANALYTICS_VALUES)))}) "
+	f"ON CONFLICT ({','.join(ANALYTICS_DIMS)}) DO UPDATE SET "
+	+ ', '.join(f"{v} = {v} + excluded.{v}" for v in _ANALYTICS_VALUES)
+)
+_PRUNE_ANALYTICS_SQL = (
+	f"DELETE FROM engine_daily_stats WHERE {' AND '.join(f'{d} = ?' for d in ANALYTICS_DIMS)} AND trades <= 0"
+)
+
+
+def _to_float(value) -> Optional[float]:
+	try:
+		if value in (None, '', '-'):
+			return None
+		return float(value)
+	except (TypeError, ValueError):
+		return None
+
+
+def trade_r_multiple(trade: Dict[str, Any]) -> Optional[float]:
+	"""Stored pnl_r of a trade row, else derived from entry/sl/close_price; None if unknown."""
+	r_mult = _to_float(trade.get('pnl_r'))
+	if r_mult is None:
+		entry, sl, close = _to_float(trade.get('entry')), _to_float(trade.get('sl')), _to_float(trade.get('close_price'))
+		direction = _to_float(trade.get('direction'))
+		if None not in (entry, sl, close) and direction in (1.0, -1.0) and abs(entry - sl) > 0:
+			r_mult = (close - entry) * direction / abs(entry - sl)
+	return r_mult
+
+
+def trade_contribution(trade: Dict[str, Any]):
+	"""(dims, values) a trade row adds to engine_daily_stats.
+
+	Every trade counts towards ``trades`` on the day it was opened; closed trades
+	add win/loss, PnL and R multiple (stored pnl_r, else derived from entry/sl/close).
+	"""
+	dims = (
+		str(trade.get('timestamp') or '')[:10],
+		trade.get('engine') or '',
+		trade.get('tier') or '',
+		trade.get('alert_level') or '',
+		trade.get('symbol') or '',
+	)
+	if str(trade.get('status') or '').upper() != 'CLOSED':
+		return dims, (1, 0, 0, 0, 0.0, 0.0, 0)
+	pnl = _to_float(trade.get('pnl'))
+	r_mult = trade_r_multiple(trade)
+	return dims, (
+		1,
+		1,
+		1 if pnl is not None and pnl > 0 else 0,
+		1 if pnl is not None and pnl < 0 else 0,
+		pnl or 0.0,
+		r_mult or 0.0,
+		1 if r_mult is not None else 0,
+	)
+
+
+def _finish_analytics_row(r: Dict[str, Any]) -> Dict[str, Any]:
+	closed = r.get('closed') or 0
+	r['win_rate'] = (r['wins'] / closed * 100.0) if closed else 0.0
+	r['avg_r'] = (r['r_sum'] / r['r_count']) if r.get('r_count') else 0.0
+	return r
+
+
+def rollup_analytics(rows: List[Dict[str, Any]], group_by: List[str]) -> List[Dict[str, Any]]:
+	"""Re-sum analytics rows (as returned by ``engine_analytics``) onto the coarser ``group_by``."""
+	dims = [d for d in group_by if d in ANALYTICS_DIMS]
+	groups: Dict[tuple, List[float]] = {}
+	for row in rows:
+		acc = groups.setdefault(tuple(row.get(d) or '' for d in dims), [0] * len(_ANALYTICS_VALUES))
+		for i, v in enumerate(_ANALYTICS_VALUES):
+			acc[i] += row.get(v) or 0
+	out = []
+	for key in sorted(groups):
+		r = dict(zip(dims, key))
+		r.update(zip(_ANALYTICS_VALUES, groups[key]))
+		out.append(_finish_analytics_row(r))
+	return out
+
+
+class SQLitePool:
+	"""Long-lived connections to one database file: a single writer plus pooled readers.
+
+	Statements are reused through each connection's statement cache, so callers
+	should keep SQL text stable (placeholders, not interpolated values).
+	"""
+	def __init__(self, db_path: str, max_readers: int = 4):
+		self.db_path = db_path
+		os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+		self._write_lock = threading.RLock()
+		self._writer = self._connect()
+		self._writer.execute("PRAGMA journal_mode=WAL")
+		self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+		self._reader_lock = threading.Lock()
+		self._reader_count = 0
+		self.max_readers = max(1, int(max_readers))
+
+	def _connect(self, readonly: bool = False) -> sqlite3.Connection:
+		conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False, cached_statements=256)
+		conn.row_factory = sqlite3.Row
+		for pragma in _PRAGMAS:
+			conn.execute(pragma)
+		if readonly:
+			conn.execute("PRAGMA query_only=ON")
+		return conn
+
+	@contextmanager
+	def write(self) -> Iterator[sqlite3.Connection]:
+		"""Exclusive use of the writer; commits on success, rolls back on error."""
+		with self._write_lock:
+			try:
+				yield self._writer
+				self._writer.commit()
+			except Exception:
+				self._writer.rollback()
+				raise
+
+	@contextmanager
+	def read(self) -> Iterator[sqlite3.Connection]:
+		"""A pooled read-only connection (never waits on the writer in WAL mode)."""
+		conn = self._acquire_reader()
+		try:
+			yield conn
+		finally:
+			if conn.in_transaction:
+				conn.rollback()
+			self._readers.put(conn)
+
+	def _acquire_reader(self) -> sqlite3.Connection:
+		try:
+			return self._readers.get_nowait()
+		except queue.Empty:
+			pass
+		with self._reader_lock:
+			if self._reader_count < self.max_readers:
+				self._reader_count += 1
+				return self._connect(readonly=True)
+		return self._readers.get()
+
+	def vacuum(self):
+		"""Checkpoint the WAL and rebuild the file to give freed pages back to the OS."""
+		with self._write_lock:
+			self._writer.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+			self._writer.execute("VACUUM")
+
+	def close(self):
+		with self._write_lock:
+			try:
+				self._writer.close()
+			except Exception:
+				pass
+		while True:
+			try:
+				self._readers.get_nowait().close()
+			except queue.Empty:
+				break
+			except Exception:
+				pass
+
+
+_pools: Dict[str, SQLitePool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path: str = DB_PATH, max_readers: int = 4) -> SQLitePool:
+	"""Process-wide pool for ``db_path`` shared by every PersistenceManager."""
+	key = os.path.abspath(db_path)
+	with _pools_lock:
+		pool = _pools.get(key)
+		if pool is None:
+			pool = SQLitePool(key, max_readers=max_readers)
+			_pools[key] = pool
+		return pool
+
+
+_queues: Dict[str, WriteBehindQueue] = {}
+
+
+def get_write_behind(manager: 'PersistenceManager', settings: Dict[str, Any]) -> Optional[WriteBehindQueue]:
+	"""Process-wide write-behind queue for the manager's database file.
+
+	Returns None (write through) when another process owns the database's trade
+	journal: replaying or truncating it here could re-apply or lose that
+	process's uncommitted trade ops.
+	"""
+	key = os.path.abspath(manager.db_path)
+	with _pools_lock:
+		q = _queues.get(key)
+		if q is None:
+			# Trade ops are journaled next to the database unless journal_path is null
+			journal_path = settings.get('journal_path', key + '-wbjournal')
+			try:
+				journal = TradeJournal(journal_path, fsync=settings.get('journal_fsync', True)) if journal_path else None
+			except JournalLockedError as e:
+				print(f"ℹ️ Write-behind off for {key}: {e}; writing through")
+				return None
+			q = WriteBehindQueue(
+				manager.apply_batch,
+				max_signals=settings.get('max_signals', 5000),
+				max_trade_ops=settings.get('max_trade_ops', 10000),
+				batch_size=settings.get('batch_size', 256),
+				flush_interval=settings.get('flush_interval_seconds', 0.5),
+				overflow=settings.get('overflow', 'drop_oldest'),
+				journal=journal,
+				committed_seq=manager.journal_checkpoint() if journal else 0,
+			)
+			_queues[key] = q
+			get_metrics().register_gauge('write_behind_depth', lambda: sum(x.depth for x in _queues.values()))
+			get_metrics().register_gauge(
+				'write_behind_signals_dropped',
+				lambda: sum(x.stats['signals_dropped'] + x.stats['signals_coalesced'] for x in _queues.values())
+			)
+		return q
+
+
+def close_pools():
+	# Drain pending writes before the connections go away
+	for q in list(_queues.values()):
+		q.close()
+	_queues.clear()
+	with _pools_lock:
+		for pool in _pools.values():
+			pool.close()
+		_pools.clear()
+
+
+atexit.register(close_pools)
+
 
 class PersistenceManager:
-	def __init__(self, db_path: str = DB_PATH):
+	def __init__(self, db_path: str = DB_PATH, write_behind: Optional[bool] = None):
 		self.db_path = db_path
-		self._ensure_db()
+		self._pool = get_pool(db_path)
 		self._migrate_db()
+		# Writes go through the shared write-behind queue when enabled (persistence.write_behind)
+		wb_cfg = get_config().get('persistence', {}).get('write_behind', {})
+		if write_behind is None:
+			write_behind = bool(wb_cfg.get('enabled', False))
+		self._queue = get_write_behind(self, wb_cfg) if write_behind else None
 
-	def _ensure_db(self):
-		dirname = os.path.dirname(self.db_path)
-		os.makedirs(dirname, exist_ok=True)
-		with sqlite3.connect(self.db_path) as conn:
+	def _migrate_db(self):
+		"""Apply pending schema migrations in order, recording each step.
+
+		The version lives in PRAGMA user_version; every step is idempotent so
+		databases created before versioning (user_version 0) upgrade in place.
+		"""
+		with self._pool.write() as conn:
 			conn.execute(
-				"""
-				CREATE TABLE IF NOT EXISTS signals (
-					id INTEGER PRIMARY KEY AUTOINCREMENT,
-					timestamp TEXT NOT NULL,
-					symbol TEXT NOT NULL,
-					current_price REAL,
-					signal INTEGER,
-					signal_type TEXT,
-					confidence REAL,
-					rsi REAL,
-					macd REAL,
-					macd_signal REAL,
-					sma_20 REAL,
-					sma_50 REAL,
-					price_change REAL,
-					price_change_pct REAL,
-					alert_level TEXT,
-					alert_color TEXT,
-					target_pips INTEGER,
-					success_rate REAL,
-					entry_price REAL,
-					stop_loss REAL,
-					take_profit_1 REAL,
-					take_profit_2 REAL,
-					take_profit_3 REAL,
-					risk_reward_ratio REAL,
-					atr_value REAL,
-					position_size_percent REAL,
-					risk_amount_dollars REAL,
-					potential_profit_tp1 REAL,
-					potential_profit_tp2 REAL,
-					potential_profit_tp3 REAL
-				)
-				"""
+				"CREATE TABLE IF NOT EXISTS schema_migrations (version INTEGER PRIMARY KEY, name TEXT, applied_at TEXT)"
 			)
-			conn.execute(
-				"""
-				CREATE TABLE IF NOT EXISTS trades (
-					id INTEGER PRIMARY KEY AUTOINCREMENT,
-					timestamp TEXT NOT NULL,
-					symbol TEXT NOT NULL,
-					direction INTEGER,
-					entry REAL,
-					sl REAL,
-					tp REAL,
-					lots REAL,
-					ticket INTEGER,
-					status TEXT
+			current = conn.execute("PRAGMA user_version").fetchone()[0]
+			for version, name, step in self._migrations():
+				if version <= current:
+					continue
+				step(conn)
+				conn.execute(
+					"INSERT OR REPLACE INTO schema_migrations (version, name, applied_at) VALUES (?, ?, ?)",
+					(version, name, datetime.utcnow().isoformat())
 				)
-				"""
+				conn.execute(f"PRAGMA user_version = {int(version)}")
+				print(f"🗄️ Schema migrated to v{version}: {name}")
+			# Column set is fixed between migrations; cache it for save_trade
+			self._trade_columns = frozenset(r['name'] for r in conn.execute("PRAGMA table_info(trades)").fetchall())
+		self._trade_insert_sql: Dict[tuple, str] = {}
+
+	def _migrations(self):
+		return [
+			(1, 'base tables', self._m1_base_tables),
+			(2, 'trade lifecycle columns', self._m2_trade_lifecycle_columns),
+			(3, 'signal quality columns', self._m3_signal_quality_columns),
+			(4, 'hot-path indexes', self._m4_indexes),
+			(5, 'signal rollups', self._m5_signal_rollups),
+			(6, 'engine daily stats', self._m6_engine_daily_stats),
+			(7, 'write-behind checkpoint', self._m7_write_behind_checkpoint),
+		]
+
+	@staticmethod
+	def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]):
+		existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+		for col, col_type in columns.items():
+			if col not in existing:
+				try:
+					conn.execute(f"ALTER TABLE {table} ADD COLUMN {col} {col_type}")
+				except Exception:
+					pass
+
+	def _m1_base_tables(self, conn: sqlite3.Connection):
+		conn.execute(
+			"""
+			CREATE TABLE IF NOT EXISTS signals (
+				id INTEGER PRIMARY KEY AUTOINCREMENT,
+				timestamp TEXT NOT NULL,
+				symbol TEXT NOT NULL,
+				current_price REAL,
+				signal INTEGER,
+				signal_type TEXT,
+				confidence REAL,
+				rsi REAL,
+				macd REAL,
+				macd_signal REAL,
+				sma_20 REAL,
+				sma_50 REAL,
+				price_change REAL,
+				price_change_pct REAL,
+				alert_level TEXT,
+				alert_color TEXT,
+				target_pips INTEGER,
+				success_rate REAL,
+				entry_price REAL,
+				stop_loss REAL,
+				take_profit_1 REAL,
+				take_profit_2 REAL,
+				take_profit_3 REAL,
+				risk_reward_ratio REAL,
+				atr_value REAL,
+				position_size_percent REAL,
+				risk_amount_dollars REAL,
+				potential_profit_tp1 REAL,
+				potential_profit_tp2 REAL,
+				potential_profit_tp3 REAL
+			)
+			"""
+		)
+		conn.execute(
+			"""
+			CREATE TABLE IF NOT EXISTS trades (
+				id INTEGER PRIMARY KEY AUTOINCREMENT,
+				timestamp TEXT NOT NULL,
+				symbol TEXT NOT NULL,
+				direction INTEGER,
+				entry REAL,
+				sl REAL,
+				tp REAL,
+				lots REAL,
+				ticket INTEGER,
+				status TEXT
 			)
-			conn.commit()
+			"""
+		)
 
-	def _migrate_db(self):
-		"""Add new lifecycle columns if missing"""
-		with sqlite3.connect(self.db_path) as conn:
-			# ---- trades table migrations ----
-			existing_cols = {}
-			for row in conn.execute("PRAGMA table_info(trades)").fetchall():
-				existing_cols[row[1]] = True
-			# Columns to add
-			columns_to_add = {
-				'open_time': 'TEXT',
-				'close_time': 'TEXT',
-				'close_price': 'REAL',
-				'pnl': 'REAL',
-				'pnl_r': 'REAL',
-				'reason': 'TEXT',
-				'alert_level': 'TEXT',
-				'campaign_id': 'TEXT',
-				'tier': 'TEXT',
-				'engine': 'TEXT'
-			}
-			for col, col_type in columns_to_add.items():
-				if col not in existing_cols:
-					try:
-						conn.execute(f"ALTER TABLE trades ADD COLUMN {col} {col_type}")
-					except Exception:
-						pass
-
-			# ---- signals table migrations (quality metrics) ----
-			existing_signal_cols = {}
-			for row in conn.execute("PRAGMA table_info(signals)").fetchall():
-				existing_signal_cols[row[1]] = True
-			signal_columns_to_add = {
-				'signal_strength': 'REAL',
-				'signal_vote_sum': 'REAL',
-				'signal_pos_votes': 'INTEGER',
-				'signal_neg_votes': 'INTEGER',
-				'signal_total_votes': 'INTEGER',
-			}
-			for col, col_type in signal_columns_to_add.items():
-				if col not in existing_signal_cols:
-					try:
-						conn.execute(f"ALTER TABLE signals ADD COLUMN {col} {col_type}")
-					except Exception:
-						pass
-			conn.commit()
+	def _m2_trade_lifecycle_columns(self, conn: sqlite3.Connection):
+		self._add_missing_columns(conn, 'trades', {
+			'open_time': 'TEXT',
+			'close_time': 'TEXT',
+			'close_price': 'REAL',
+			'pnl': 'REAL',
+			'pnl_r': 'REAL',
+			'reason': 'TEXT',
+			'alert_level': 'TEXT',
+			'campaign_id': 'TEXT',
+			'tier': 'TEXT',
+			'engine': 'TEXT'
+		})
+
+	def _m3_signal_quality_columns(self, conn: sqlite3.Connection):
+		self._add_missing_columns(conn, 'signals', {
+			'signal_strength': 'REAL',
+			'signal_vote_sum': 'REAL',
+			'signal_pos_votes': 'INTEGER',
+			'signal_neg_votes': 'INTEGER',
+			'signal_total_votes': 'INTEGER',
+		})
+
+	def _m4_indexes(self, conn: sqlite3.Connection):
+		# update_trade / reconcile look trades up by ticket
+		conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_ticket ON trades(ticket)")
+		# get_open_trades filters on status (and usually symbol)
+		conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_status_symbol ON trades(status, symbol)")
+		# recent_trades filters and sorts on timestamp
+		conn.execute("CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades(timestamp)")
+		conn.execute("CREATE INDEX IF NOT EXISTS idx_signals_timestamp ON signals(timestamp)")
 
+	def _m5_signal_rollups(self, conn: sqlite3.Connection):
+		# Aggregated HOLD signals written by src.retention once raw rows age out
+		conn.execute(
+			"""
+			CREATE TABLE IF NOT EXISTS signal_rollups (
+				resolution TEXT NOT NULL,
+				bucket TEXT NOT NULL,
+				symbol TEXT NOT NULL,
+				samples INTEGER NOT NULL,
+				open_price REAL,
+				high_price REAL,
+				low_price REAL,
+				close_price REAL,
+				avg_confidence REAL,
+				avg_rsi REAL,
+				avg_atr REAL,
+				PRIMARY KEY (resolution, bucket, symbol)
+			)
+			"""
+		)
+
+	def _m6_engine_daily_stats(self, conn: sqlite3.Connection):
+		conn.execute(
+			"""
+			CREATE TABLE IF NOT EXISTS engine_daily_stats (
+				day TEXT NOT NULL,
+				engine TEXT NOT NULL,
+				tier TEXT NOT NULL,
+				alert_level TEXT NOT NULL,
+				symbol TEXT NOT NULL,
+				trades INTEGER NOT NULL DEFAULT 0,
+				closed INTEGER NOT NULL DEFAULT 0,
+				wins INTEGER NOT NULL DEFAULT 0,
+				losses INTEGER NOT NULL DEFAULT 0,
+				pnl_sum REAL NOT NULL DEFAULT 0,
+				r_sum REAL NOT NULL DEFAULT 0,
+				r_count INTEGER NOT NULL DEFAULT 0,
+				PRIMARY KEY (day, engine, tier, alert_level, symbol)
+			)
+			"""
+		)
+		# Backfill from existing trades
+		conn.execute("DELETE FROM engine_daily_stats")
+		for row in conn.execute("SELECT * FROM trades").fetchall():
+			self._apply_contribution(conn, trade_contribution(dict(row)))
+
+	def _m7_write_behind_checkpoint(self, conn: sqlite3.Connection):
+		# Last trade-journal sequence number committed by the write-behind queue
+		conn.execute("CREATE TABLE IF NOT EXISTS write_behind_checkpoint (id INTEGER PRIMARY KEY CHECK (id = 1), seq INTEGER NOT NULL)")
+
+	def journal_checkpoint(self) -> int:
+		with self._pool.read() as conn:
+			row = conn.execute("SELECT seq FROM write_behind_checkpoint WHERE id = 1").fetchone()
+			return int(row[0]) if row else 0
+
+	@timed('db.save_signal')
 	def save_signal(self, data: Dict[str, Any]) -> None:
 		# Accept dict-like LiveSignal
-		with sqlite3.connect(self.db_path) as conn:
-			columns = [
-				'timestamp','symbol','current_price','signal','signal_type','confidence','rsi','macd','macd_signal',
-				'sma_20','sma_50','price_change','price_change_pct','alert_level','alert_color','target_pips','success_rate',
-				'entry_price','stop_loss','take_profit_1','take_profit_2','take_profit_3','risk_reward_ratio','atr_value',
-				'position_size_percent','risk_amount_dollars','potential_profit_tp1','potential_profit_tp2','potential_profit_tp3',
-				'signal_strength','signal_vote_sum','signal_pos_votes','signal_neg_votes','signal_total_votes'
-			]
-			placeholders = ','.join(['?']*len(columns))
-			values = [data.get(col) for col in columns]
-			conn.execute(f"INSERT INTO signals ({','.join(columns)}) VALUES ({placeholders})", values)
-			conn.commit()
+		if self._queue is not None:
+			self._queue.put_signal(dict(data))
+			return
+		with self._pool.write() as conn:
+			self._insert_signal(conn, data)
 
+	@timed('db.save_trade')
 	def save_trade(self, trade: Dict[str, Any]) -> None:
-		with sqlite3.connect(self.db_path) as conn:
-			# Insert with dynamic columns (only ones present in table)
-			conn.row_factory = sqlite3.Row
-			table_cols = [r['name'] for r in conn.execute("PRAGMA table_info(trades)").fetchall()]
-			cols = [c for c in trade.keys() if c in table_cols]
-			placeholders = ','.join(['?']*len(cols))
-			values = [trade.get(c) for c in cols]
-			conn.execute(f"INSERT INTO trades ({','.join(cols)}) VALUES ({placeholders})", values)
-			conn.commit()
+		if self._queue is not None:
+			self._queue.put_trade(dict(trade))
+			return
+		with self._pool.write() as conn:
+			self._insert_trade(conn, trade)
+
+	@timed('db.save_trades')
+	def save_trades(self, trades: List[Dict[str, Any]]) -> None:
+		"""Insert several trades in one transaction."""
+		if not trades:
+			return
+		if self._queue is not None:
+			self._queue.put_trades([dict(t) for t in trades])
+			return
+		with self._pool.write() as conn:
+			for trade in trades:
+				self._insert_trade(conn, trade)
 
+	@timed('db.update_trade')
 	def update_trade(self, ticket: int, fields: Dict[str, Any]) -> None:
 		if not fields:
 			return
-		with sqlite3.connect(self.db_path) as conn:
-			conn.row_factory = sqlite3.Row
-			row = conn.execute("SELECT direction, entry, lots FROM trades WHERE ticket = ?", (ticket,)).fetchone()
-			if row:
-				needs_close_price = (
-					'close_price' not in fields
-					or fields.get('close_price') in (None, '', '-')
-				)
-				pnl_value = fields.get('pnl')
-				if needs_close_price and pnl_value not in (None, '', '-'):
-					try:
-						direction = int(row['direction']) if row['direction'] is not None else None
-						entry = float(row['entry']) if row['entry'] is not None else None
-						lots = float(row['lots']) if row['lots'] not in (None, 0) else 0.01
-						pnl_float = float(pnl_value)
-						if direction in (1, -1) and entry is not None and lots not in (None, 0):
-							price_delta = pnl_float / (lots * 100.0)
-							close_price = entry + price_delta if direction == 1 else entry - price_delta
-							fields['close_price'] = close_price
-					except Exception:
-						pass
-			set_clause = ', '.join([f"{k} = ?" for k in fields.keys()])
-			values = list(fields.values()) + [ticket]
-			conn.execute(f"UPDATE trades SET {set_clause} WHERE ticket = ?", values)
-			conn.commit()
+		if self._queue is not None:
+			self._queue.put_update(ticket, dict(fields))
+			return
+		with self._pool.write() as conn:
+			self._update_trade(conn, ticket, fields)
+
+	@timed('db.update_trades')
+	def update_trades(self, updates: List[tuple]) -> None:
+		"""Apply several (ticket, fields) updates in one transaction."""
+		updates = [(ticket, fields) for ticket, fields in updates if fields]
+		if not updates:
+			return
+		if self._queue is not None:
+			self._queue.put_updates([(ticket, dict(fields)) for ticket, fields in updates])
+			return
+		with self._pool.write() as conn:
+			for ticket, fields in updates:
+				self._update_trade(conn, ticket, fields)
+
+	@timed('db.write_batch')
+	def apply_batch(self, ops: List[tuple]) -> None:
+		"""Apply queued ("signal", data) / ("trade", data) / ("update", ticket, fields) ops in one transaction.
+
+		A trailing ("checkpoint", seq) op records the last journaled trade op in the same transaction.
+		"""
+		with self._pool.write() as conn:
+			for op in ops:
+				if op[0] == 'signal':
+					self._insert_signal(conn, op[1])
+				elif op[0] == 'trade':
+					self._insert_trade(conn, op[1])
+				elif op[0] == 'update':
+					self._update_trade(conn, op[1], op[2])
+				elif op[0] == 'checkpoint':
+					conn.execute("INSERT OR REPLACE INTO write_behind_checkpoint (id, seq) VALUES (1, ?)", (int(op[1]),))
+
+	def flush(self, timeout: Optional[float] = None) -> bool:
+		"""Wait for queued writes to reach the database (no-op without write-behind)."""
+		if self._queue is None:
+			return True
+		return self._queue.flush(timeout)
+
+	def write_behind_stats(self) -> Optional[Dict[str, Any]]:
+		return self._queue.get_stats() if self._queue is not None else None
+
+	def _insert_signal(self, conn: sqlite3.Connection, data: Dict[str, Any]) -> None:
+		conn.execute(_INSERT_SIGNAL_SQL, [data.get(col) for col in SIGNAL_COLUMNS])
+
+	def _insert_trade(self, conn: sqlite3.Connection, trade: Dict[str, Any]) -> None:
+		# Insert with dynamic columns (only ones present in table)
+		cols = tuple(c for c in trade.keys() if c in self._trade_columns)
+		sql = self._trade_insert_sql.get(cols)
+		if sql is None:
+			sql = f"INSERT INTO trades ({','.join(cols)}) VALUES ({','.join(['?'] * len(cols))})"
+			self._trade_insert_sql[cols] = sql
+		conn.execute(sql, [trade.get(c) for c in cols])
+		self._apply_contribution(conn, trade_contribution({c: trade.get(c) for c in cols}))
+
+	@staticmethod
+	def _apply_contribution(conn: sqlite3.Connection, contribution, sign: int = 1) -> None:
+		dims, values = contribution
+		conn.execute(_UPSERT_ANALYTICS_SQL, list(dims) + [v * sign for v in values])
+		if sign < 0:
+			conn.execute(_PRUNE_ANALYTICS_SQL, list(dims))
+
+	def _update_trade(self, conn: sqlite3.Connection, ticket: int, fields: Dict[str, Any]) -> None:
+		rows = conn.execute("SELECT * FROM trades WHERE ticket = ?", (ticket,)).fetchall()
+		row = rows[0] if rows else None
+		if row:
+			needs_close_price = (
+				'close_price' not in fields
+				or fields.get('close_price') in (None, '', '-')
+			)
+			pnl_value = fields.get('pnl')
+			if needs_close_price and pnl_value not in (None, '', '-'):
+				try:
+					direction = int(row['direction']) if row['direction'] is not None else None
+					entry = float(row['entry']) if row['entry'] is not None else None
+					lots = float(row['lots']) if row['lots'] not in (None, 0) else 0.01
+					pnl_float = float(pnl_value)
+					if direction in (1, -1) and entry is not None and lots not in (None, 0):
+						price_delta = pnl_float / (lots * 100.0)
+						close_price = entry + price_delta if direction == 1 else entry - price_delta
+						fields['close_price'] = close_price
+				except Exception:
+					pass
+		set_clause = ', '.join([f"{k} = ?" for k in fields.keys()])
+		values = list(fields.values()) + [ticket]
+		conn.execute(f"UPDATE trades SET {set_clause} WHERE ticket = ?", values)
+		# Move each updated trade's share of engine_daily_stats from its old state to its new one
+		for before in rows:
+			before = dict(before)
+			old, new = trade_contribution(before), trade_contribution({**before, **fields})
+			if old != new:
+				self._apply_contribution(conn, old, -1)
+				self._apply_contribution(conn, new)
 
 	def get_open_trades(self, symbol: Optional[str] = None) -> List[Dict[str, Any]]:
-		with sqlite3.connect(self.db_path) as conn:
-			conn.row_factory = sqlite3.Row
+		with self._pool.read() as conn:
 			if symbol:
 				rows = conn.execute("SELECT * FROM trades WHERE status IN ('SENT','OPEN') AND symbol = ?", (symbol,)).fetchall()
 			else:
@@ -187,22 +610,95 @@ class PersistenceManager:
 		from datetime import datetime as _dt, timedelta as _td
 		cutoff_dt = _dt.utcnow() - _td(hours=hours)
 		cutoff_str = cutoff_dt.strftime('%Y-%m-%d %H:%M:%S')
-		with sqlite3.connect(self.db_path) as conn:
-			conn.row_factory = sqlite3.Row
+		with self._pool.read() as conn:
 			rows = conn.execute(
 				"SELECT * FROM trades WHERE timestamp >= ? ORDER BY timestamp DESC LIMIT ?",
 				(cutoff_str, limit)
 			).fetchall()
 			return [dict(r) for r in rows]
 
+	def engine_analytics(
+		self,
+		since_day: str,
+		until_day: Optional[str] = None,
+		symbol: Optional[str] = None,
+		group_by: Optional[List[str]] = None,
+	) -> List[Dict[str, Any]]:
+		"""Summed engine_daily_stats for days in [since_day, until_day] (YYYY-MM-DD), grouped by ``group_by``."""
+		dims = [d for d in (group_by or ['engine']) if d in ANALYTICS_DIMS]
+		sums = ', '.join(f"SUM({v}) AS {v}" for v in _ANALYTICS_VALUES)
+		where, params = ["day >= ?"], [since_day]
+		if until_day:
+			where.append("day <= ?")
+			params.append(until_day)
+		if symbol:
+			where.append("symbol = ?")
+			params.append(symbol)
+		sql = f"SELECT {', '.join(dims + [sums])} FROM engine_daily_stats WHERE {' AND '.join(where)}"
+		if dims:
+			sql += f" GROUP BY {', '.join(dims)} ORDER BY {', '.join(dims)}"
+		with self._pool.read() as conn:
+			rows = [dict(r) for r in conn.execute(sql, params).fetchall()]
+		return [_finish_analytics_row(r) for r in rows]
+
+	def engine_analytics_since(
+		self,
+		since: datetime,
+		symbol: Optional[str] = None,
+		group_by: Optional[List[str]] = None,
+	) -> List[Dict[str, Any]]:
+		"""Like ``engine_analytics`` but hour-precise: trades opened at/after ``since`` (naive UTC).
+
+		Whole days after ``since`` come from engine_daily_stats; only the partial
+		first day is read from the trades rows.
+		"""
+		dims = [d for d in (group_by or ['engine']) if d in ANALYTICS_DIMS]
+		since_day = since.strftime('%Y-%m-%d')
+		next_day = (since + timedelta(days=1)).strftime('%Y-%m-%d')
+		rows = self.engine_analytics(next_day, symbol=symbol, group_by=dims or list(ANALYTICS_DIMS))
+		query = "SELECT * FROM trades WHERE timestamp >= ? AND timestamp < ?"
+		params: List[Any] = [since_day, next_day]
+		if symbol:
+			query += " AND symbol = ?"
+			params.append(symbol)
+		with self._pool.read() as conn:
+			trades = [dict(r) for r in conn.execute(query, params).fetchall()]
+		for trade in trades:
+			try:
+				opened = datetime.fromisoformat(str(trade.get('timestamp')).replace('Z', '+00:00'))
+			except ValueError:
+				continue
+			if opened.tzinfo is not None:
+				opened = opened.astimezone(timezone.utc).replace(tzinfo=None)
+			if opened < since:
+				continue
+			trade_dims, values = trade_contribution(trade)
+			row = dict(zip(ANALYTICS_DIMS, trade_dims))
+			row.update(zip(_ANALYTICS_VALUES, values))
+			rows.append(row)
+		return rollup_analytics(rows, dims)
+
+	def closed_trades(self, symbol: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+		"""Closed trades in close order, optionally for one symbol and closed at/after ``since``."""
+		query = "SELECT * FROM trades WHERE status = 'CLOSED'"
+		params: List[Any] = []
+		if symbol:
+			query += " AND symbol = ?"
+			params.append(symbol)
+		if since:
+			query += " AND COALESCE(close_time, timestamp) >= ?"
+			params.append(since)
+		query += " ORDER BY COALESCE(close_time, timestamp), id"
+		with self._pool.read() as conn:
+			rows = conn.execute(query, params).fetchall()
+			return [dict(r) for r in rows]
+
 	def latest_signal(self) -> Optional[Dict[str, Any]]:
-		with sqlite3.connect(self.db_path) as conn:
-			conn.row_factory = sqlite3.Row
+		with self._pool.read() as conn:
 			row = conn.execute("SELECT * FROM signals ORDER BY id DESC LIMIT 1").fetchone()
 			return dict(row) if row else None
 
 	def recent_signals(self, limit: int = 10) -> List[Dict[str, Any]]:
-		with sqlite3.connect(self.db_path) as conn:
-			conn.row_factory = sqlite3.Row
+		with self._pool.read() as conn:
 			rows = conn.execute("SELECT * FROM signals ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
 			return [dict(r) for r in rows]
\ No newline at end of file
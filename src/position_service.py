@@ -0,0 +1,219 @@
+"""One shared poller for open positions and account PnL.
+
+The dashboard routes (total profit, close all/profitable/losing), the
+auto-take-profit monitor and every ``OrderManager.reconcile`` each built their
+own ``MT5Connector`` and called ``positions_get`` on their own schedule, which
+added up to several times the polling we need and competed with order sends.
+``PositionService`` polls positions and account info at ``poll_interval_seconds``
+and keeps the latest :class:`PositionSnapshot` in memory. Readers take the
+snapshot, or ask for one no older than ``max_age``; subscribers get a callback
+with every new snapshot, always on the background polling thread and one at a
+time, whichever thread took the poll. A poll made for any caller (for example
+the supervisor's reconcile) counts as the scheduled poll, so the background
+thread only fills the gaps.
+
+A snapshot's ``as_of``/``taken_at`` are stamped before the broker is asked, so
+anything opened during the round-trip counts as newer than the snapshot.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import get_config
+
+try:
+    from .mt5_connector import MT5Connector
+except ImportError:
+    MT5Connector = None
+
+
+@dataclass(frozen=True)
+class PositionSnapshot:
+    positions: Tuple[Any, ...] = ()
+    taken_at: float = 0.0  # time.monotonic() when the poll started
+    as_of: Optional[datetime] = None  # UTC wall time when the poll started
+    equity: Optional[float] = None
+    currency: str = "USD"
+    ok: bool = False
+    by_symbol: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    @property
+    def total_profit(self) -> float:
+        return sum(float(getattr(p, "profit", 0.0) or 0.0) for p in self.positions)
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.taken_at if self.taken_at else float("inf")
+
+    def for_symbol(self, symbol: Optional[str]) -> List[Any]:
+        if not symbol:
+            return list(self.positions)
+        return [p for p in self.positions if getattr(p, "symbol", None) == symbol]
+
+
+class PositionService:
+    """Polls the broker at a fixed rate and fans the snapshot out to readers and subscribers."""
+
+    def __init__(self, connector=None, poll_interval: float = 2.0, max_staleness: float = 5.0) -> None:
+        self.connector = connector
+        self.poll_interval = float(poll_interval)
+        self.max_staleness = float(max_staleness)
+        self._snapshot = PositionSnapshot()
+        self._poll_lock = threading.Lock()
+        self._subscribers: List[Callable[[PositionSnapshot], None]] = []
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._dispatched: Optional[PositionSnapshot] = None
+        self.polls = 0
+        self.errors = 0
+
+    def _connector(self):
+        if self.connector is None and MT5Connector is not None:
+            self.connector = MT5Connector()
+        if self.connector is not None and not self.connector.initialized:
+            self.connector.initialize()
+        return self.connector
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def snapshot(self, max_age: Optional[float] = None) -> PositionSnapshot:
+        """Latest snapshot; polls now if it is older than ``max_age`` (default: max_staleness)."""
+        limit = self.max_staleness if max_age is None else max_age
+        snap = self._snapshot
+        if snap.age > limit:
+            snap = self.refresh(max_age=limit)
+        return snap
+
+    def positions(self, symbol: Optional[str] = None, max_age: Optional[float] = None) -> List[Any]:
+        return self.snapshot(max_age).for_symbol(symbol)
+
+    def refresh(self, max_age: float = 0.0) -> PositionSnapshot:
+        """Poll the broker unless another caller produced a snapshot within ``max_age`` meanwhile."""
+        with self._poll_lock:
+            if self._snapshot.age <= max_age:
+                return self._snapshot
+            snap = self._poll()
+            self._snapshot = snap
+        if threading.current_thread() is not self._thread:
+            # Subscribers only run on the polling thread; let it deliver this snapshot
+            self._wake.set()
+        return snap
+
+    def invalidate(self) -> None:
+        """Force the next read to poll (e.g. after closing positions)."""
+        with self._poll_lock:
+            self._snapshot = PositionSnapshot(
+                positions=self._snapshot.positions, equity=self._snapshot.equity, currency=self._snapshot.currency
+            )
+        self._wake.set()
+
+    def _poll(self) -> PositionSnapshot:
+        self.polls += 1
+        # Stamp before the broker round-trip: a ticket registered while positions_get is
+        # in flight must not look older than the snapshot that cannot contain it
+        taken_at, as_of = time.monotonic(), datetime.utcnow()
+        conn = self._connector()
+        if conn is None:
+            return PositionSnapshot(taken_at=taken_at, as_of=as_of)
+        try:
+            positions = tuple(conn.get_positions() or ())
+            acc = conn.get_account_info()
+        except Exception as e:
+            self.errors += 1
+            print(f"⚠️ Position poll error: {e}")
+            return PositionSnapshot(taken_at=taken_at, as_of=as_of)
+        by_symbol: Dict[str, Dict[str, float]] = {}
+        for p in positions:
+            bucket = by_symbol.setdefault(getattr(p, "symbol", ""), {"count": 0, "profit": 0.0})
+            bucket["count"] += 1
+            bucket["profit"] += float(getattr(p, "profit", 0.0) or 0.0)
+        return PositionSnapshot(
+            positions=positions,
+            taken_at=taken_at,
+            as_of=as_of,
+            equity=float(acc.equity) if acc else None,
+            currency=getattr(acc, "currency", "USD") if acc else "USD",
+            ok=True,
+            by_symbol=by_symbol,
+        )
+
+    # ------------------------------------------------------------------
+    # Subscribers / background polling
+    # ------------------------------------------------------------------
+    def subscribe(self, callback: Callable[[PositionSnapshot], None]) -> None:
+        """Call ``callback(snapshot)`` with each new snapshot.
+
+        Callbacks run only on the background polling thread (``start()``), one at a
+        time; a snapshot polled by another caller is handed over to that thread.
+        """
+        self._subscribers.append(callback)
+
+    def _dispatch(self) -> None:
+        snap = self._snapshot
+        if snap is self._dispatched or not snap.taken_at:
+            return
+        self._dispatched = snap
+        for callback in list(self._subscribers):
+            try:
+                callback(snap)
+            except Exception as e:
+                print(f"⚠️ Position subscriber error: {e}")
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="position-service", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                # Skip the scheduled poll if someone else polled recently
+                self.refresh(max_age=self.poll_interval * 0.5)
+                self._dispatch()
+            except Exception as e:
+                print(f"⚠️ Position service error: {e}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "poll_interval_seconds": self.poll_interval,
+            "polls": self.polls,
+            "errors": self.errors,
+            "snapshot_age_seconds": None if snap.age == float("inf") else round(snap.age, 3),
+            "position_count": len(snap.positions),
+            "subscribers": len(self._subscribers),
+        }
+
+
+_service: Optional[PositionService] = None
+_service_lock = threading.Lock()
+
+
+def get_position_service() -> PositionService:
+    """Process-wide service configured from the ``position_service`` config section."""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                cfg = get_config().get("position_service", {})
+                _service = PositionService(
+                    poll_interval=float(cfg.get("poll_interval_seconds", 2.0)),
+                    max_staleness=float(cfg.get("max_staleness_seconds", 5.0)),
+                )
+    return _service
@@ -0,0 +1,469 @@
+"""Event-driven replay of the live strategies over historical M1 bars.
+
+``BacktestEngine`` only scores a precomputed signal Series, so NYUPIP, ICT
+Swing and ICT ATM could only be exercised live. ``ReplayBacktester`` streams
+historical M1 bars through the same strategy objects the stream uses:
+
+* bars are appended to a ``BarRingBuffer`` and folded into a shared
+  ``MultiTimeframeBars`` cache, so each evaluation reads incremental M15/H1
+  context instead of a fresh resample of the whole history;
+* a ``StrategyScheduler`` built from each strategy's ``SCHEDULE`` (and the
+  ``strategy_schedule`` config overrides) decides when a strategy runs, and the
+  strategy's own cooldowns see the bar timestamps as the quote clock;
+* signals fill at the bar close (plus spread and slippage), sized like
+  ``AutoTrader._calc_lot``; open positions are checked against each bar's
+  high/low for SL/TP and then run through the ``OrderManager`` exit rules
+  (breakeven move, time exit with the loss minimizer) and daily loss cap;
+* entries pass the same gates as the live stream: the ``sessions`` window
+  (every strategy) and the ``CampaignManager`` window caps and entry spacing
+  on the bar clock (ICT Swing in ``HIGH_SWING``, ICT ATM in ``HIGH_ATM``; the
+  live NYUPIP path has no campaign gate). Either gate can be switched off via
+  ``replay.entry_gates`` to study raw signal quality.
+
+Bar-level simplifications: when a bar touches both SL and TP the SL is assumed
+to fill first, and a loss minimizer armed at one close resolves on the next bar
+(at its retrace target if touched, otherwise at the open).
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter, defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .backtesting import BacktestEngine
+from .bar_buffer import OHLCV_COLUMNS, BarRingBuffer
+from .config import get_config
+from .news_calendar import is_off_session
+from .order_manager import CampaignManager
+from .paper_broker import SymbolSpec
+from .scheduler import StrategySchedule, StrategyScheduler
+from .strategies import ICTATMStrategy, ICTSwingPointsStrategy, NYUPIPStrategy
+from .timeframes import MultiTimeframeBars
+
+STRATEGY_NAMES = ("nyupip", "ict_swing", "ict_atm")
+# Campaign buckets used by LiveDataStream for each strategy (None: not campaign-gated)
+CAMPAIGN_BUCKETS = {"nyupip": None, "ict_swing": "HIGH_SWING", "ict_atm": "HIGH_ATM"}
+
+
+@dataclass
+class ReplayTrade:
+    ticket: int
+    strategy: str
+    alert_level: str
+    direction: int
+    open_time: pd.Timestamp
+    entry: float
+    sl: float
+    tp: float
+    lots: float
+    risk: float  # initial |entry - sl| in price units
+    close_time: Optional[pd.Timestamp] = None
+    close_price: Optional[float] = None
+    pnl: float = 0.0
+    reason: Optional[str] = None  # SL, TP, BE, TIME, END
+    be_moved: bool = False
+    lm_target: Optional[float] = None
+
+    @property
+    def r_multiple(self) -> float:
+        if self.close_price is None or self.risk <= 0:
+            return 0.0
+        return (self.close_price - self.entry) * self.direction / self.risk
+
+
+@dataclass
+class ExitRules:
+    """``OrderManager._apply_exit_rules`` settings."""
+
+    max_minutes: Dict[str, int]
+    be_after_r: float = 1.0
+    be_buffer: float = 0.02
+    lm_enabled: bool = True
+    lm_soft_loss: float = 3.0
+    lm_max_loss: float = 12.0
+    lm_retrace_points: float = 10.0
+    daily_loss_limit_pct: float = 5.0
+
+    @classmethod
+    def from_config(cls, symbol: str, cfg: Optional[Dict] = None) -> "ExitRules":
+        cfg = cfg if cfg is not None else get_config()
+        exec_cfg = cfg.get("execution", {})
+        lm = exec_cfg.get("loss_minimizer", {})
+        caps = cfg.get("risk", {}).get("symbol_caps", {})
+        return cls(
+            max_minutes=exec_cfg.get("max_position_minutes", {"LOW": 10, "MEDIUM": 10, "HIGH": 20}),
+            be_after_r=float(cfg.get("risk", {}).get("move_sl_to_be_after_r_multiple", 1.0)),
+            lm_enabled=bool(lm.get("enabled", True)),
+            lm_soft_loss=float(lm.get("soft_loss_dollars", 3.0)),
+            lm_max_loss=float(lm.get("max_loss_dollars", 12.0)),
+            lm_retrace_points=float(lm.get("retrace_points", 10.0)),
+            daily_loss_limit_pct=float(caps.get(symbol, {}).get("daily_loss_limit_pct", 5.0)),
+        )
+
+    def max_age_ns(self, alert_level: str) -> int:
+        minutes = int(self.max_minutes.get((alert_level or "LOW").upper(), 10))
+        return minutes * 60 * 1_000_000_000
+
+
+def default_strategies(symbol: str, names=STRATEGY_NAMES, cfg: Optional[Dict] = None) -> Dict[str, Any]:
+    """Strategy instances built the way ``LiveDataStream`` builds them."""
+    cfg = cfg if cfg is not None else get_config()
+    tz_name = cfg.get("sessions", {}).get("timezone", "UTC")
+    gold = "XAU" in symbol.upper() or "GOLD" in symbol.upper()
+    strategies: Dict[str, Any] = {}
+    if "nyupip" in names:
+        strategies["nyupip"] = NYUPIPStrategy(symbol=symbol)
+    if "ict_swing" in names and gold:
+        strategies["ict_swing"] = ICTSwingPointsStrategy(symbol=symbol, timezone=tz_name)
+    if "ict_atm" in names and gold:
+        strategies["ict_atm"] = ICTATMStrategy(symbol=symbol, timezone=tz_name)
+    return strategies
+
+
+def campaign_settings(cfg: Optional[Dict] = None) -> Dict[str, Any]:
+    """``CampaignManager`` arguments from the ``execution`` section, as ``LiveDataStream`` reads them."""
+    cfg = cfg if cfg is not None else get_config()
+    exec_cfg = cfg.get("execution", {})
+    return {
+        "window_minutes": int(exec_cfg.get("campaign_window_minutes", 10)),
+        "max_per_level": exec_cfg.get("campaign_max_trades", {"LOW": 6, "MEDIUM": 6, "HIGH": 9}),
+        "min_spacing_seconds": int(exec_cfg.get("min_seconds_between_entries", 60)),
+    }
+
+
+class ReplayBacktester:
+    """Replays M1 bars through strategy objects and simulates fills and exits."""
+
+    def __init__(
+        self,
+        symbol: str = "XAUUSD",
+        strategies: Optional[Dict[str, Any]] = None,
+        spec: Optional[SymbolSpec] = None,
+        initial_balance: float = 10000.0,
+        risk_percent: float = 0.75,
+        spread_points: float = 0.0,
+        slippage_points: float = 0.0,
+        history_limit: int = 7200,
+        exit_rules: Optional[ExitRules] = None,
+        schedules: Optional[Dict[str, Dict]] = None,
+        seed: Optional[int] = None,
+        sessions: Optional[Dict] = None,
+        campaign: Optional[Dict] = None,
+    ) -> None:
+        self.symbol = symbol
+        self.strategies = strategies if strategies is not None else default_strategies(symbol)
+        self.spec = spec or SymbolSpec(name=symbol)
+        self.initial_balance = float(initial_balance)
+        self.risk_pct = float(risk_percent) / 100.0
+        self.spread = float(spread_points) * self.spec.point
+        self.slippage_points = float(slippage_points)
+        self.history_limit = int(history_limit)
+        self.exit_rules = exit_rules or ExitRules(max_minutes={"LOW": 10, "MEDIUM": 10, "HIGH": 20})
+        self.schedules = schedules or {}
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        # Entry gates: ``sessions`` config section and CampaignManager settings (None: gate off)
+        self.sessions = sessions
+        self.campaign = campaign
+
+    @classmethod
+    def from_config(cls, symbol: Optional[str] = None, strategies=STRATEGY_NAMES) -> "ReplayBacktester":
+        cfg = get_config()
+        symbol = symbol or cfg.get("broker", {}).get("symbol", "XAUUSD")
+        rcfg = cfg.get("replay", {})
+        gates = rcfg.get("entry_gates", {})
+        spec = SymbolSpec(name=symbol, **rcfg.get("symbol_spec", {}))
+        return cls(
+            symbol=symbol,
+            strategies=default_strategies(symbol, strategies, cfg),
+            spec=spec,
+            initial_balance=float(rcfg.get("initial_balance", 10000.0)),
+            risk_percent=float(cfg.get("risk", {}).get("risk_percent_per_trade", 0.75)),
+            spread_points=float(rcfg.get("spread_points", 0.0)),
+            slippage_points=float(rcfg.get("slippage_points", 0.0)),
+            history_limit=int(cfg.get("data_feed", {}).get("history_limits", {}).get("nyupip_m1", 7200)),
+            exit_rules=ExitRules.from_config(symbol, cfg),
+            schedules=rcfg.get("schedules", cfg.get("strategy_schedule", {})),
+            seed=rcfg.get("seed"),
+            sessions=cfg.get("sessions", {}) if gates.get("session", True) else None,
+            campaign=campaign_settings(cfg) if gates.get("campaign", True) else None,
+        )
+
+    # ------------------------------------------------------------------
+    # Sizing / PnL
+    # ------------------------------------------------------------------
+    def _money(self, lots: float, points: float) -> float:
+        return lots * points / (self.spec.tick_size or self.spec.point) * self.spec.tick_value
+
+    def _calc_lot(self, equity: float, entry: float, stop: float) -> float:
+        price_risk = abs(entry - stop)
+        if price_risk <= 0 or equity <= 0:
+            return 0.0
+        per_lot = self._money(1.0, price_risk)
+        if per_lot <= 0:
+            return 0.0
+        lots = equity * self.risk_pct / per_lot
+        step = self.spec.volume_step or 0.01
+        lots = max(self.spec.volume_min, min(self.spec.volume_max, np.floor(lots / step) * step))
+        return round(float(lots), 2)
+
+    def _slip(self) -> float:
+        if self.slippage_points <= 0:
+            return 0.0
+        return float(self.rng.uniform(0.0, self.slippage_points)) * self.spec.point
+
+    # ------------------------------------------------------------------
+    # Replay
+    # ------------------------------------------------------------------
+    def _scheduler(self) -> StrategyScheduler:
+        scheduler = StrategyScheduler(enabled=True)
+        for name, strategy in self.strategies.items():
+            declared = StrategySchedule.from_mapping(getattr(strategy, "SCHEDULE", None))
+            scheduler.register(name, StrategySchedule.from_mapping(self.schedules.get(name), declared))
+        return scheduler
+
+    @staticmethod
+    def _prepare_bars(bars: pd.DataFrame) -> pd.DataFrame:
+        index = pd.DatetimeIndex(bars.index)
+        if list(bars.columns) == OHLCV_COLUMNS and index.tz is None and index.is_monotonic_increasing:
+            return bars  # already in replay layout (e.g. shared sweep bars): no copy
+        frame = bars[[c for c in OHLCV_COLUMNS if c in bars.columns]].copy()
+        if "Volume" not in frame.columns:
+            frame["Volume"] = 0.0
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        frame.index = index
+        return frame.sort_index()
+
+    def run(self, bars: pd.DataFrame, warmup: Optional[int] = None, progress_every: int = 0) -> Dict[str, Any]:
+        """Replay ``bars`` (M1 OHLCV); the first ``warmup`` bars only seed history."""
+        started = time.perf_counter()
+        frame = self._prepare_bars(bars)
+        n = len(frame)
+        ts_ns = frame.index.as_unit("ns").asi8
+        cols = {c: frame[c].to_numpy(dtype=float) for c in OHLCV_COLUMNS}
+        o, h, l, c = cols["Open"], cols["High"], cols["Low"], cols["Close"]
+        warmup = min(n, self.history_limit if warmup is None else int(warmup))
+
+        buffer = BarRingBuffer(self.history_limit)
+        buffer.load(frame.iloc[:warmup])
+        timeframes = MultiTimeframeBars(buffer)
+        scheduler = self._scheduler()
+
+        self._balance = self.initial_balance
+        self._open: List[ReplayTrade] = []
+        self._closed: List[ReplayTrade] = []
+        self._ticket = 0
+        self._realized_by_day: Dict[int, float] = defaultdict(float)
+        diagnostics: Dict[str, Counter] = {name: Counter() for name in self.strategies}
+        runs: Counter = Counter()
+        eval_seconds: Dict[str, float] = defaultdict(float)
+        signals_seen: Counter = Counter()
+        halted_signals = 0
+        gated: Counter = Counter()
+        campaign = CampaignManager(**self.campaign) if self.campaign is not None else None
+        equity = np.full(n, self.initial_balance)
+
+        for i in range(warmup, n):
+            now_ns = int(ts_ns[i])
+            if self._open:
+                self._manage(i, now_ns, o[i], h[i], l[i], c[i])
+            buffer.append(now_ns, {col: cols[col][i] for col in OHLCV_COLUMNS})
+            timeframes.update()
+            now = pd.Timestamp(now_ns, tz="UTC")
+            scheduler.on_bar_close(now)
+            price = float(c[i])
+            quote = {"timestamp": now, "price": price, "bid": price, "ask": price + self.spread}
+            for name, strategy in self.strategies.items():
+                if not scheduler.due(name, now, price):
+                    continue
+                t0 = time.perf_counter()
+                signals, diag = self._evaluate(name, strategy, quote, timeframes)
+                eval_seconds[name] += time.perf_counter() - t0
+                scheduler.mark_run(name, now, price)
+                runs[name] += 1
+                diagnostics[name][(diag or {}).get("reason") or (diag or {}).get("status") or "unknown"] += 1
+                for signal in signals:
+                    signals_seen[name] += 1
+                    if self._halted(now_ns, price):
+                        halted_signals += 1
+                        continue
+                    if self.sessions is not None and is_off_session(now.to_pydatetime(), self.sessions):
+                        gated["session"] += 1
+                        continue
+                    bucket = CAMPAIGN_BUCKETS.get(name)
+                    direction = int(signal.direction)
+                    wall = now.tz_localize(None).to_pydatetime()
+                    if campaign is not None and bucket and not campaign.allow(self.symbol, direction, bucket, wall):
+                        gated["campaign"] += 1
+                        continue
+                    if self._open_trade(name, signal, now, price) and campaign is not None and bucket:
+                        campaign.record(self.symbol, direction, bucket, wall)
+            equity[i] = self._balance + sum(self._floating(t, price) for t in self._open)
+            if progress_every and (i - warmup) % progress_every == 0 and i > warmup:
+                print(f"⏩ Replay {i - warmup}/{n - warmup} bars | trades={len(self._closed)} equity={equity[i]:.2f}")
+
+        if n:
+            last_price = float(c[-1])
+            for trade in list(self._open):
+                self._close(trade, pd.Timestamp(int(ts_ns[-1])), last_price if trade.direction == 1 else last_price + self.spread, "END")
+            equity[-1] = self._balance
+
+        index = frame.index[warmup:] if warmup < n else frame.index[-1:]
+        curve = pd.DataFrame({"Portfolio_Value": equity[warmup:] if warmup < n else equity[-1:]}, index=index)
+        curve.index.name = "Date"
+        trades = pd.DataFrame([dict(asdict(t), r_multiple=t.r_multiple) for t in self._closed])
+        if not trades.empty:
+            trades = trades.drop(columns=["lm_target"])
+        return {
+            "trades": trades,
+            "equity": curve,
+            "metrics": self._metrics(curve),
+            "diagnostics": {name: dict(counts) for name, counts in diagnostics.items()},
+            "runs": dict(runs),
+            "signals": dict(signals_seen),
+            "halted_signals": halted_signals,
+            "gated_signals": dict(gated),
+            "eval_seconds": {name: round(v, 3) for name, v in eval_seconds.items()},
+            "bars": n - warmup,
+            "elapsed_seconds": round(time.perf_counter() - started, 3),
+        }
+
+    def _evaluate(self, name: str, strategy, quote: Dict, timeframes: MultiTimeframeBars):
+        try:
+            if name == "nyupip":
+                signals = strategy.evaluate(None, dict(quote), timeframes=timeframes)
+                return signals, strategy.get_last_diagnostics()
+            return strategy.evaluate(None, dict(quote), timeframes=timeframes)
+        except Exception as e:
+            return [], {"status": "error", "reason": f"error:{type(e).__name__}"}
+
+    def _metrics(self, curve: pd.DataFrame) -> Dict:
+        engine = BacktestEngine(initial_capital=self.initial_balance)
+        engine.trades = [{"Date": t.close_time, "Profit": t.pnl} for t in self._closed]
+        engine.portfolio_value = curve
+        return engine.calculate_performance_metrics()
+
+    # ------------------------------------------------------------------
+    # Positions
+    # ------------------------------------------------------------------
+    def _floating(self, trade: ReplayTrade, bid: float) -> float:
+        exit_price = bid if trade.direction == 1 else bid + self.spread
+        return self._money(trade.lots, (exit_price - trade.entry) * trade.direction)
+
+    def _halted(self, now_ns: int, price: float) -> bool:
+        realized = self._realized_by_day.get(now_ns // 86_400_000_000_000, 0.0)
+        equity = self._balance + sum(self._floating(t, price) for t in self._open)
+        return equity > 0 and realized < 0 and abs(realized) / equity * 100.0 >= self.exit_rules.daily_loss_limit_pct
+
+    def _open_trade(self, name: str, signal, now: pd.Timestamp, bid: float) -> bool:
+        direction = int(signal.direction)
+        entry, sl, tp = float(signal.entry_price), float(signal.stop_loss), float(signal.take_profit_primary)
+        # Same side checks as AutoTrader._prepare_order
+        if direction == 1 and not (sl < entry < tp):
+            return False
+        if direction == -1 and not (sl > entry > tp):
+            return False
+        equity = self._balance + sum(self._floating(t, bid) for t in self._open)
+        lots = self._calc_lot(equity, entry, sl)
+        if lots <= 0:
+            return False
+        fill = bid + self.spread + self._slip() if direction == 1 else bid - self._slip()
+        if name == "nyupip":
+            alert = getattr(signal, "module", "NYUPIP")
+        elif name == "ict_swing":
+            alert = f"ICT_SWING_{getattr(signal, 'session', '')}"
+        else:
+            alert = "ICT_ATM"
+        self._ticket += 1
+        self._open.append(ReplayTrade(
+            ticket=self._ticket, strategy=name, alert_level=alert, direction=direction,
+            open_time=now.tz_localize(None), entry=fill, sl=sl, tp=tp, lots=lots, risk=abs(fill - sl),
+        ))
+        return True
+
+    def _close(self, trade: ReplayTrade, when: pd.Timestamp, price: float, reason: str) -> None:
+        trade.close_time = when
+        trade.close_price = float(price)
+        trade.pnl = self._money(trade.lots, (trade.close_price - trade.entry) * trade.direction)
+        trade.reason = reason
+        self._balance += trade.pnl
+        self._realized_by_day[int(when.value) // 86_400_000_000_000] += trade.pnl
+        self._open.remove(trade)
+        self._closed.append(trade)
+
+    def _manage(self, i: int, now_ns: int, o: float, h: float, l: float, c: float) -> None:
+        """Stops within bar ``i`` first, then the OrderManager exit rules at its close."""
+        when = pd.Timestamp(now_ns)
+        rules = self.exit_rules
+        for trade in list(self._open):
+            d = trade.direction
+            # Long positions exit on the bid, shorts on the ask
+            eo, eh, el, ec = (o, h, l, c) if d == 1 else (o + self.spread, h + self.spread, l + self.spread, c + self.spread)
+            stop_reason = "BE" if trade.be_moved else "SL"
+            if trade.lm_target is not None:
+                hit = eh >= trade.lm_target if d == 1 else el <= trade.lm_target
+                self._close(trade, when, trade.lm_target if hit else eo, "TIME")
+                continue
+            if d == 1:
+                if eo <= trade.sl:
+                    self._close(trade, when, eo, stop_reason)
+                elif eo >= trade.tp:
+                    self._close(trade, when, eo, "TP")
+                elif el <= trade.sl:
+                    self._close(trade, when, trade.sl, stop_reason)
+                elif eh >= trade.tp:
+                    self._close(trade, when, trade.tp, "TP")
+            else:
+                if eo >= trade.sl:
+                    self._close(trade, when, eo, stop_reason)
+                elif eo <= trade.tp:
+                    self._close(trade, when, eo, "TP")
+                elif eh >= trade.sl:
+                    self._close(trade, when, trade.sl, stop_reason)
+                elif el <= trade.tp:
+                    self._close(trade, when, trade.tp, "TP")
+            if trade.close_time is not None:
+                continue
+            unrealized_r = (ec - trade.entry) * d / trade.risk if trade.risk > 0 else 0.0
+            if trade.risk > 0 and unrealized_r >= rules.be_after_r:
+                trade.sl = trade.entry + rules.be_buffer * d
+                trade.be_moved = True
+            if now_ns - trade.open_time.value >= rules.max_age_ns(trade.alert_level):
+                pnl = self._money(trade.lots, (ec - trade.entry) * d)
+                defer = (
+                    rules.lm_enabled
+                    and pnl < 0
+                    and abs(pnl) > rules.lm_soft_loss
+                    and abs(pnl) < rules.lm_max_loss
+                )
+                if defer:
+                    trade.lm_target = ec + rules.lm_retrace_points * self.spec.point * d
+                else:
+                    self._close(trade, when, ec, "TIME")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Replay M1 bars through the live strategies")
+    parser.add_argument("csv", help="M1 OHLCV CSV with a timestamp index column")
+    parser.add_argument("--symbol", default=None)
+    parser.add_argument("--strategies", default=",".join(STRATEGY_NAMES))
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.csv, index_col=0, parse_dates=True)
+    data.columns = [col.capitalize() for col in data.columns]
+    tester = ReplayBacktester.from_config(args.symbol, tuple(args.strategies.split(",")))
+    result = tester.run(data, progress_every=10000)
+    print(f"✅ Replayed {result['bars']} bars in {result['elapsed_seconds']}s")
+    print(f"Runs: {result['runs']} | Signals: {result['signals']} | Eval seconds: {result['eval_seconds']}")
+    if result["metrics"]:
+        BacktestEngine(initial_capital=tester.initial_balance).print_performance_report(result["metrics"])
+    else:
+        print("No trades")
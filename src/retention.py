@@ -0,0 +1,257 @@
+"""Retention for the signals table: roll-ups and compressed archives.
+
+Every stream writes a full signal row per tick, HOLD or not, and nothing used to
+delete them. ``SignalRetention`` runs periodically and
+
+* keeps every row newer than ``full_resolution_days`` untouched;
+* folds older HOLD rows into ``signal_rollups`` (one row per symbol per
+  minute or hour: sample count, first/high/low/last price and average
+  confidence/RSI/ATR) and deletes them;
+* moves every remaining row older than ``archive_after_days`` into monthly
+  gzip CSV files (``signals-YYYY-MM.csv.gz``) that :class:`SignalArchive`
+  can query back as DataFrames.
+
+Archive files are appended and synced before rows are deleted, so a crash in
+between can duplicate rows in the archive but never lose them; reads drop
+duplicate ids.
+"""
+
+from __future__ import annotations
+
+import csv
+import glob
+import gzip
+import io
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from .config import get_config
+from .persistence import DB_PATH, PersistenceManager, get_pool
+
+_BUCKET_FORMATS = {
+    "1min": "%Y-%m-%d %H:%M:00",
+    "1h": "%Y-%m-%d %H:00:00",
+}
+
+_ROLLUP_SQL = """
+INSERT INTO signal_rollups (
+    resolution, bucket, symbol, samples, open_price, high_price, low_price, close_price,
+    avg_confidence, avg_rsi, avg_atr
+)
+SELECT
+    :resolution, g.bucket, g.symbol, g.samples,
+    (SELECT current_price FROM signals WHERE id = g.first_id),
+    g.high_price, g.low_price,
+    (SELECT current_price FROM signals WHERE id = g.last_id),
+    g.avg_confidence, g.avg_rsi, g.avg_atr
+FROM (
+    SELECT
+        strftime(:fmt, timestamp) AS bucket, symbol, COUNT(*) AS samples,
+        MIN(id) AS first_id, MAX(id) AS last_id,
+        MAX(current_price) AS high_price, MIN(current_price) AS low_price,
+        AVG(confidence) AS avg_confidence, AVG(rsi) AS avg_rsi, AVG(atr_value) AS avg_atr
+    FROM signals
+    WHERE signal = 0 AND timestamp < :scan_before AND strftime(:fmt, timestamp) < :cutoff
+    GROUP BY bucket, symbol
+) AS g
+WHERE g.bucket IS NOT NULL
+ON CONFLICT (resolution, bucket, symbol) DO UPDATE SET
+    avg_confidence = (avg_confidence * samples + excluded.avg_confidence * excluded.samples) / (samples + excluded.samples),
+    avg_rsi = (avg_rsi * samples + excluded.avg_rsi * excluded.samples) / (samples + excluded.samples),
+    avg_atr = (avg_atr * samples + excluded.avg_atr * excluded.samples) / (samples + excluded.samples),
+    samples = samples + excluded.samples,
+    high_price = MAX(high_price, excluded.high_price),
+    low_price = MIN(low_price, excluded.low_price),
+    close_price = excluded.close_price
+"""
+
+_DELETE_ROLLED_SQL = """
+DELETE FROM signals
+WHERE signal = 0 AND timestamp < :scan_before AND strftime(:fmt, timestamp) < :cutoff
+"""
+
+
+class SignalArchive:
+    """Monthly gzip CSV files holding archived signal rows."""
+
+    def __init__(self, archive_dir: str) -> None:
+        self.archive_dir = archive_dir
+
+    def path_for(self, month: str) -> str:
+        return os.path.join(self.archive_dir, f"signals-{month}.csv.gz")
+
+    def append(self, month: str, columns: List[str], rows: List[tuple]) -> None:
+        os.makedirs(self.archive_dir, exist_ok=True)
+        path = self.path_for(month)
+        new_file = not os.path.exists(path)
+        # Each append adds a gzip member; readers see one continuous CSV stream.
+        with open(path, "ab") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+                with io.TextIOWrapper(gz, encoding="utf-8", newline="") as text:
+                    writer = csv.writer(text)
+                    if new_file:
+                        writer.writerow(columns)
+                    writer.writerows(rows)
+            raw.flush()
+            os.fsync(raw.fileno())
+
+    def months(self) -> List[str]:
+        names = glob.glob(os.path.join(self.archive_dir, "signals-*.csv.gz"))
+        return sorted(os.path.basename(n)[len("signals-"):-len(".csv.gz")] for n in names)
+
+    def query(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        symbol: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Archived rows with ``start <= timestamp < end`` (ISO strings), optionally for one symbol."""
+        frames = []
+        for month in self.months():
+            if start and month < start[:7]:
+                continue
+            if end and month > end[:7]:
+                continue
+            frames.append(pd.read_csv(self.path_for(month), compression="gzip"))
+        if not frames:
+            return pd.DataFrame()
+        df = pd.concat(frames, ignore_index=True).drop_duplicates(subset="id", keep="last")
+        stamps = pd.to_datetime(df["timestamp"], errors="coerce", format="mixed")
+        mask = pd.Series(True, index=df.index)
+        if start:
+            mask &= stamps >= pd.Timestamp(start)
+        if end:
+            mask &= stamps < pd.Timestamp(end)
+        if symbol:
+            mask &= df["symbol"] == symbol
+        return df[mask].sort_values("id").reset_index(drop=True)
+
+
+class SignalRetention:
+    """Periodic roll-up and archival of old signal rows."""
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        full_resolution_days: float = 7,
+        rollup_resolution: str = "1h",
+        archive_after_days: Optional[float] = 30,
+        archive_dir: Optional[str] = None,
+        chunk_size: int = 5000,
+        vacuum: bool = False,
+    ) -> None:
+        if rollup_resolution not in _BUCKET_FORMATS:
+            raise ValueError(f"rollup_resolution must be one of {sorted(_BUCKET_FORMATS)}")
+        PersistenceManager(db_path, write_behind=False)  # applies migrations (signal_rollups)
+        self.pool = get_pool(db_path)
+        self.full_resolution = timedelta(days=float(full_resolution_days))
+        self.rollup_resolution = rollup_resolution
+        self.archive_after = timedelta(days=float(archive_after_days)) if archive_after_days else None
+        self.archive = SignalArchive(archive_dir or os.path.join(os.path.dirname(db_path), "archive"))
+        self.chunk_size = int(chunk_size)
+        self.vacuum = vacuum
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_config(cls, db_path: str = DB_PATH) -> "SignalRetention":
+        cfg = get_config().get("retention", {})
+        archive_dir = cfg.get("archive_dir")
+        if archive_dir and not os.path.isabs(archive_dir):
+            archive_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), archive_dir)
+        return cls(
+            db_path=db_path,
+            full_resolution_days=cfg.get("full_resolution_days", 7),
+            rollup_resolution=cfg.get("rollup_resolution", "1h"),
+            archive_after_days=cfg.get("archive_after_days", 30),
+            archive_dir=archive_dir,
+            vacuum=bool(cfg.get("vacuum", False)),
+        )
+
+    # ------------------------------------------------------------------
+    # Work
+    # ------------------------------------------------------------------
+    def run_once(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        now = now or datetime.now()
+        rolled = self.rollup(now - self.full_resolution)
+        archived = self.archive_rows(now - self.archive_after) if self.archive_after else 0
+        if self.vacuum and (rolled or archived):
+            self.pool.vacuum()
+        self.last_run = {"at": now.isoformat(), "rolled_up": rolled, "archived": archived}
+        if rolled or archived:
+            print(f"🧹 Signal retention: rolled up {rolled} HOLD rows, archived {archived} rows")
+        return self.last_run
+
+    def _bounds(self, cutoff: datetime, fmt: str) -> Dict[str, str]:
+        # Cut on a bucket boundary so later runs never split a bucket. ``scan_before``
+        # is a coarse, index-friendly upper bound for mixed "T"/space timestamps.
+        bucket = cutoff.strftime(fmt)
+        return {"fmt": fmt, "cutoff": bucket, "scan_before": (cutoff + timedelta(days=1)).strftime("%Y-%m-%d")}
+
+    def rollup(self, cutoff: datetime) -> int:
+        """Fold HOLD rows older than ``cutoff`` into ``signal_rollups``; returns rows removed."""
+        params = self._bounds(cutoff, _BUCKET_FORMATS[self.rollup_resolution])
+        params["resolution"] = self.rollup_resolution
+        with self.pool.write() as conn:
+            conn.execute(_ROLLUP_SQL, params)
+            cur = conn.execute(_DELETE_ROLLED_SQL, {k: params[k] for k in ("fmt", "cutoff", "scan_before")})
+            return cur.rowcount
+
+    def archive_rows(self, cutoff: datetime) -> int:
+        """Move rows older than ``cutoff`` to the monthly archives; returns rows moved."""
+        params = self._bounds(cutoff, "%Y-%m-%d %H:%M:%S")
+        moved = 0
+        while True:
+            with self.pool.read() as conn:
+                cur = conn.execute(
+                    "SELECT * FROM signals WHERE timestamp < :scan_before "
+                    "AND strftime(:fmt, timestamp) < :cutoff ORDER BY id LIMIT :limit",
+                    {**params, "limit": self.chunk_size},
+                )
+                columns = [d[0] for d in cur.description]
+                rows = [tuple(r) for r in cur.fetchall()]
+            if not rows:
+                return moved
+            ts_idx = columns.index("timestamp")
+            by_month: Dict[str, List[tuple]] = {}
+            for row in rows:
+                by_month.setdefault(str(row[ts_idx])[:7], []).append(row)
+            for month, month_rows in by_month.items():
+                self.archive.append(month, columns, month_rows)
+            ids = [(row[0],) for row in rows]
+            with self.pool.write() as conn:
+                conn.executemany("DELETE FROM signals WHERE id = ?", ids)
+            moved += len(rows)
+            if len(rows) < self.chunk_size:
+                return moved
+
+    # ------------------------------------------------------------------
+    # Background
+    # ------------------------------------------------------------------
+    def start(self, interval_minutes: float = 60) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    print(f"⚠️ Signal retention error: {e}")
+                self._stop.wait(float(interval_minutes) * 60.0)
+
+        self._thread = threading.Thread(target=loop, name="signal-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+if __name__ == "__main__":
+    print(SignalRetention.from_config().run_once())
@@ -0,0 +1,133 @@
+"""Bar-close / price-trigger scheduling for strategy evaluation.
+
+Strategies were evaluated on every polled tick even when none of their inputs
+had changed. ``StrategyScheduler`` tracks, per strategy, the timeframes whose
+bar close should trigger a run plus optional tick-level conditions (a relative
+price move since the last run, or a maximum age), and answers whether a run is
+due. Between runs the caller keeps the last result; signals are events and are
+only delivered by the run that produced them.
+
+Timeframe closes follow ``MultiTimeframeBars``: a bucket labelled ``L`` holds
+the M1 bars stamped ``(L - rule, L]``, so it closes with the M1 bar stamped ``L``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Mapping, Optional, Set, Tuple
+
+import pandas as pd
+
+
+@dataclass
+class StrategySchedule:
+    """Trigger declaration for one strategy."""
+
+    timeframes: Tuple[str, ...] = ("1min",)
+    price_move_pct: Optional[float] = None  # re-run when price moved this fraction since the last run
+    max_age_seconds: Optional[float] = None  # re-run at least this often
+
+    @classmethod
+    def from_mapping(cls, spec: Optional[Mapping[str, Any]], base: Optional["StrategySchedule"] = None) -> "StrategySchedule":
+        base = base or cls()
+        spec = spec or {}
+        timeframes = spec.get("timeframes", base.timeframes)
+        if isinstance(timeframes, str):
+            timeframes = (timeframes,)
+        return cls(
+            timeframes=tuple(timeframes),
+            price_move_pct=spec.get("price_move_pct", base.price_move_pct),
+            max_age_seconds=spec.get("max_age_seconds", base.max_age_seconds),
+        )
+
+
+@dataclass
+class _ScheduleState:
+    schedule: StrategySchedule
+    pending: Set[str] = field(default_factory=set)
+    last_run: Optional[pd.Timestamp] = None
+    last_price: Optional[float] = None
+    last_result: Any = None
+    runs: int = 0
+    skips: int = 0
+
+
+class StrategyScheduler:
+    """Decide which strategies are due on each tick."""
+
+    def __init__(self, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._states: Dict[str, _ScheduleState] = {}
+
+    def register(self, name: str, schedule: StrategySchedule) -> None:
+        self._states[name] = _ScheduleState(schedule=schedule)
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Forget run history so the next check is due (e.g. after enabling a strategy)."""
+        names: Iterable[str] = [name] if name else list(self._states)
+        for key in names:
+            state = self._states.get(key)
+            if state:
+                state.last_run = None
+                state.last_price = None
+                state.pending.clear()
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+    def on_bar_close(self, bar: Any) -> None:
+        """Record an M1 bar close (an ``M1Bar`` or its timestamp)."""
+        ts = pd.Timestamp(bar if isinstance(bar, (pd.Timestamp, datetime, str)) else bar.timestamp)
+        for state in self._states.values():
+            for rule in state.schedule.timeframes:
+                try:
+                    if ts == ts.floor(rule):
+                        state.pending.add(rule)
+                except ValueError:
+                    continue
+
+    def due(self, name: str, now: Any = None, price: Optional[float] = None) -> Optional[str]:
+        """Return why ``name`` should run now (None if its last result still stands)."""
+        state = self._states.get(name)
+        if state is None or not self.enabled:
+            return "unscheduled"
+        if state.last_run is None:
+            return "first_run"
+        if state.pending:
+            return "bar_close:" + ",".join(sorted(state.pending))
+        schedule = state.schedule
+        if schedule.price_move_pct and price is not None and state.last_price:
+            if abs(float(price) - state.last_price) >= state.last_price * float(schedule.price_move_pct):
+                return "price_move"
+        if schedule.max_age_seconds is not None and now is not None:
+            age = (pd.Timestamp(now) - state.last_run).total_seconds()
+            if age >= float(schedule.max_age_seconds):
+                return "max_age"
+        state.skips += 1
+        return None
+
+    def mark_run(self, name: str, now: Any = None, price: Optional[float] = None, result: Any = None) -> None:
+        state = self._states.get(name)
+        if state is None:
+            return
+        state.pending.clear()
+        state.last_run = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+        state.last_price = float(price) if price is not None else state.last_price
+        state.last_result = result
+        state.runs += 1
+
+    def last_result(self, name: str) -> Any:
+        state = self._states.get(name)
+        return state.last_result if state else None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {
+                "timeframes": list(state.schedule.timeframes),
+                "runs": state.runs,
+                "skips": state.skips,
+                "last_run": state.last_run.isoformat() if state.last_run is not None else None,
+            }
+            for name, state in self._states.items()
+        }
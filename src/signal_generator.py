@@ -244,13 +244,17 @@ class SignalGenerator:
         
         return data
     
-    def combine_signals(self, data: pd.DataFrame, method: str = 'majority') -> pd.DataFrame:
+    def combine_signals(self, data: pd.DataFrame, method: str = 'majority',
+                        weights: Optional[Dict[str, float]] = None, threshold: float = 0.5) -> pd.DataFrame:
         """
         Combine multiple signals into a final signal
         
         Args:
             data (pd.DataFrame): Price data with multiple signals
             method (str): Method to combine signals ('majority', 'weighted', 'consensus')
+            weights (Dict[str, float]): Per-signal-column weights for 'weighted'
+                (missing columns weigh 1.0)
+            threshold (float): Weighted vote needed for a 'weighted' signal
             
         Returns:
             pd.DataFrame: Data with combined signal
@@ -279,9 +283,9 @@ class SignalGenerator:
             )
         
         elif method == 'weighted':
-            # Weighted average (you can adjust weights)
-            weights = np.ones(len(self.signal_columns))
-            weighted_sum = (signal_data * weights).sum(axis=1)
+            # Weighted vote; unlisted columns keep weight 1.0
+            weight_vector = np.array([float((weights or {}).get(col, 1.0)) for col in self.signal_columns])
+            weighted_sum = (signal_data * weight_vector).sum(axis=1)
             positive_votes = (signal_data > 0).sum(axis=1)
             negative_votes = (signal_data < 0).sum(axis=1)
             total_votes = len(self.signal_columns)
@@ -291,8 +295,8 @@ class SignalGenerator:
             data.loc[:, 'signal_neg_votes'] = negative_votes
             data.loc[:, 'signal_total_votes'] = total_votes
             data.loc[:, 'signal'] = np.where(
-                weighted_sum > 0.5, 1,
-                np.where(weighted_sum < -0.5, -1, 0)
+                weighted_sum > threshold, 1,
+                np.where(weighted_sum < -threshold, -1, 0)
             )
         
         elif method == 'consensus':
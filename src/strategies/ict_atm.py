@@ -24,12 +24,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 import pytz
 
+if TYPE_CHECKING:
+    from ..timeframes import MultiTimeframeBars
+
 
 @dataclass
 class ICTATMSignal:
@@ -72,15 +75,24 @@ class ICTATMSignal:
 class ICTATMStrategy:
     """Implements the ICT ATM methodology on 60-minute data."""
 
+    # Bar-close triggers for the stream scheduler: patterns are found on H1 bars and
+    # the retest check compares the live price against them.
+    SCHEDULE = {"timeframes": ("1h",), "price_move_pct": 0.0002, "max_age_seconds": 60}
+
     def __init__(
         self,
         symbol: str = "XAUUSD",
         timezone: str = "UTC",
         max_pattern_age_hours: int = 48,
+        tolerance_atr_multiple: float = 0.25,
+        tolerance_price_pct: float = 0.0005,
     ) -> None:
         self.symbol = symbol.upper()
         self.timezone = pytz.timezone(timezone)
         self.max_pattern_age = timedelta(hours=max_pattern_age_hours)
+        # Entry must be within max(ATR * multiple, price * pct) of the structure level
+        self.tolerance_atr_multiple = tolerance_atr_multiple
+        self.tolerance_price_pct = tolerance_price_pct
         self._last_diagnostics: Dict[str, Any] = {
             "status": "init",
             "reason": None,
@@ -93,8 +105,9 @@ class ICTATMStrategy:
     # ------------------------------------------------------------------
     def evaluate(
         self,
-        historical_data: pd.DataFrame,
+        historical_data: Optional[pd.DataFrame],
         current_quote: Dict[str, Any],
+        timeframes: Optional[MultiTimeframeBars] = None,
     ) -> Tuple[List[ICTATMSignal], Dict[str, Any]]:
         diagnostics: Dict[str, Any] = {
             "status": "init",
@@ -113,18 +126,21 @@ class ICTATMStrategy:
             self._last_diagnostics = diagnostics
             return signals, diagnostics
 
-        if historical_data is None or historical_data.empty:
-            diagnostics.update({"status": "skipped", "reason": "missing_history"})
-            self._last_diagnostics = diagnostics
-            return signals, diagnostics
-
-        base_cols = [c for c in ["Open", "High", "Low", "Close", "Volume"] if c in historical_data.columns]
-        if len(base_cols) < 4:
-            diagnostics.update({"status": "skipped", "reason": "missing_columns"})
-            self._last_diagnostics = diagnostics
-            return signals, diagnostics
-
-        h1 = self._prepare_h1_bars(historical_data[base_cols])
+        if timeframes is not None:
+            h1 = self._h1_from_cache(timeframes)
+        else:
+            if historical_data is None or historical_data.empty:
+                diagnostics.update({"status": "skipped", "reason": "missing_history"})
+                self._last_diagnostics = diagnostics
+                return signals, diagnostics
+
+            base_cols = [c for c in ["Open", "High", "Low", "Close", "Volume"] if c in historical_data.columns]
+            if len(base_cols) < 4:
+                diagnostics.update({"status": "skipped", "reason": "missing_columns"})
+                self._last_diagnostics = diagnostics
+                return signals, diagnostics
+
+            h1 = self._prepare_h1_bars(historical_data[base_cols])
         if h1.empty or len(h1) < 60:
             diagnostics.update({"status": "skipped", "reason": "insufficient_h1_bars"})
             self._last_diagnostics = diagnostics
@@ -141,7 +157,7 @@ class ICTATMStrategy:
         current_local = current_ts.tz_convert(self.timezone)
         current_price = float(current_quote.get("price") or h1.iloc[-1]["Close"])
 
-        tolerance = max(atr_current * 0.25, current_price * 0.0005)
+        tolerance = max(atr_current * self.tolerance_atr_multiple, current_price * self.tolerance_price_pct)
 
         diagnostics["summary"] = {
             "timestamp": current_local.isoformat(),
@@ -228,6 +244,16 @@ class ICTATMStrategy:
             h1 = h1.tail(240)
         return h1
 
+    def _h1_from_cache(self, timeframes: MultiTimeframeBars) -> pd.DataFrame:
+        h1 = timeframes.bars("1h")
+        if h1.index.tz is None:
+            h1.index = h1.index.tz_localize("UTC")
+        else:
+            h1.index = h1.index.tz_convert("UTC")
+        if len(h1) > 240:
+            h1 = h1.tail(240)
+        return h1
+
     def _compute_atr(self, data: pd.DataFrame, period: int = 14) -> pd.Series:
         high_low = data["High"] - data["Low"]
         high_close = (data["High"] - data["Close"].shift()).abs()
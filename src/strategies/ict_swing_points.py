@@ -26,12 +26,15 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime, time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
 import pytz
 
+if TYPE_CHECKING:
+    from ..timeframes import MultiTimeframeBars
+
 
 @dataclass
 class ICTSwingSignal:
@@ -78,6 +81,10 @@ class ICTSwingSignal:
 class ICTSwingPointsStrategy:
     """Implements ICT Swing Points session logic for XAUUSD."""
 
+    # Bar-close triggers for the stream scheduler: session ranges are built from
+    # today's M1 bars and the OTE entry check is price driven.
+    SCHEDULE = {"timeframes": ("1min",), "price_move_pct": 0.0002}
+
     # Trading sessions - all sessions defined for reference
     SESSIONS: Dict[str, Tuple[time, time]] = {
         "ASIA": (time(0, 0), time(6, 59)),
@@ -133,10 +140,15 @@ class ICTSwingPointsStrategy:
     # ------------------------------------------------------------------
     def evaluate(
         self,
-        historical_data: pd.DataFrame,
+        historical_data: Optional[pd.DataFrame],
         current_quote: Dict[str, Any],
+        timeframes: Optional[MultiTimeframeBars] = None,
     ) -> Tuple[List[ICTSwingSignal], Dict[str, Any]]:
-        """Evaluate current context and emit zero or more swing signals."""
+        """Evaluate current context and emit zero or more swing signals.
+
+        With the stream's shared bar cache (``timeframes``) only today's M1 rows
+        are sliced and localised instead of the whole history.
+        """
 
         diagnostics: Dict[str, Any] = {
             "status": "init",
@@ -155,32 +167,39 @@ class ICTSwingPointsStrategy:
             self._last_diagnostics = diagnostics
             return signals, diagnostics
 
-        if historical_data is None or historical_data.empty:
-            diagnostics.update({"status": "skipped", "reason": "missing_history"})
-            self._last_diagnostics = diagnostics
-            return signals, diagnostics
+        if timeframes is None:
+            if historical_data is None or historical_data.empty:
+                diagnostics.update({"status": "skipped", "reason": "missing_history"})
+                self._last_diagnostics = diagnostics
+                return signals, diagnostics
 
-        base_cols = [c for c in ["Open", "High", "Low", "Close", "Volume"] if c in historical_data.columns]
-        if len(base_cols) < 4:
-            diagnostics.update({"status": "skipped", "reason": "missing_columns"})
-            self._last_diagnostics = diagnostics
-            return signals, diagnostics
+            base_cols = [c for c in ["Open", "High", "Low", "Close", "Volume"] if c in historical_data.columns]
+            if len(base_cols) < 4:
+                diagnostics.update({"status": "skipped", "reason": "missing_columns"})
+                self._last_diagnostics = diagnostics
+                return signals, diagnostics
 
-        data = historical_data[base_cols].copy().dropna()
-        if data.empty or len(data) < 720:
+            data = historical_data[base_cols].copy().dropna()
+            history_rows = len(data)
+        else:
+            data = None
+            history_rows = timeframes.m1_rows
+        if history_rows < 720:
             diagnostics.update({"status": "skipped", "reason": "insufficient_history"})
             self._last_diagnostics = diagnostics
             return signals, diagnostics
 
-        # Ensure timezone awareness for session slicing
-        data = self._localize_index(data)
-
         current_ts = pd.Timestamp(current_quote.get("timestamp", datetime.utcnow()))
         if current_ts.tzinfo is None:
             current_ts = current_ts.tz_localize("UTC")
         current_local = current_ts.tz_convert(self.timezone)
 
-        today_slice = data[(data.index.date == current_local.date()) & (data.index <= current_local)]
+        if timeframes is not None:
+            today_slice = timeframes.intraday_m1(current_local)
+        else:
+            # Ensure timezone awareness for session slicing
+            data = self._localize_index(data)
+            today_slice = data[(data.index.date == current_local.date()) & (data.index <= current_local)]
         if today_slice.empty:
             diagnostics.update({"status": "skipped", "reason": "no_intraday_data"})
             self._last_diagnostics = diagnostics
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from datetime import datetime, time, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -13,6 +13,9 @@ import pytz
 from ..indicators import TechnicalIndicators
 from ..microstructure import ChopDetector
 
+if TYPE_CHECKING:
+    from ..timeframes import MultiTimeframeBars
+
 
 @dataclass
 class NYUPIPSignal:
@@ -53,6 +56,10 @@ class NYUPIPSignal:
 class NYUPIPStrategy:
     """Implements the NYUPIP 1HSMA + CIS trading workflow."""
 
+    # Bar-close triggers for the stream scheduler: 1HSMA reads H1, CIS reads closed
+    # M15 bars; the SMA zone test is price driven and the CIS window is time driven.
+    SCHEDULE = {"timeframes": ("15min", "1h"), "price_move_pct": 0.0002, "max_age_seconds": 60}
+
     def __init__(
         self,
         symbol: str = "XAUUSD",
@@ -87,10 +94,15 @@ class NYUPIPStrategy:
     # ------------------------------------------------------------------
     def evaluate(
         self,
-        historical_data: pd.DataFrame,
+        historical_data: Optional[pd.DataFrame],
         current_quote: Dict[str, float],
+        timeframes: Optional[MultiTimeframeBars] = None,
     ) -> List[NYUPIPSignal]:
-        """Return zero or more actionable signals for the current tick."""
+        """Return zero or more actionable signals for the current tick.
+
+        When ``timeframes`` (the stream's shared bar cache) is given, H1/M15 bars
+        are read from it instead of resampling ``historical_data``.
+        """
 
         self._last_diagnostics = {
             "status": "init",
@@ -100,11 +112,12 @@ class NYUPIPStrategy:
             "signals": [],
         }
 
-        if historical_data is None or historical_data.empty or not current_quote:
+        has_history = timeframes is not None or (historical_data is not None and not historical_data.empty)
+        if not has_history or not current_quote:
             self._last_diagnostics.update({"status": "skipped", "reason": "missing_input"})
             return []
 
-        context = self._build_context(historical_data, current_quote)
+        context = self._build_context(historical_data, current_quote, timeframes)
         self._last_diagnostics["summary"] = dict(self._context_snapshot)
 
         if not context:
@@ -145,12 +158,17 @@ class NYUPIPStrategy:
     # Context preparation helpers
     # ------------------------------------------------------------------
     def _build_context(
-        self, historical_data: pd.DataFrame, current_quote: Dict[str, float]
+        self,
+        historical_data: Optional[pd.DataFrame],
+        current_quote: Dict[str, float],
+        timeframes: Optional[MultiTimeframeBars] = None,
     ) -> Optional[Dict[str, object]]:
-        data = historical_data.copy()
-        data = data.sort_index()
+        if timeframes is not None:
+            history_rows = timeframes.m1_rows
+        else:
+            history_rows = int(len(historical_data)) if historical_data is not None else 0
         self._context_snapshot = {
-            "history_rows": int(len(data)) if data is not None else 0,
+            "history_rows": history_rows,
             "h1_bars": 0,
             "m15_bars": 0,
             "reason": None,
@@ -167,19 +185,24 @@ class NYUPIPStrategy:
                 return float(value) if isinstance(value, (int, float)) else value
             except Exception:
                 return None
-        try:
-            data.index = pd.DatetimeIndex(data.index).tz_localize(None)
-        except (AttributeError, TypeError):
-            data.index = pd.to_datetime(data.index)
-
         current_ts_raw = pd.Timestamp(current_quote.get("timestamp", datetime.utcnow()))
         if current_ts_raw.tzinfo is None:
             current_ts_raw = current_ts_raw.tz_localize("UTC")
         current_ts_sast = current_ts_raw.tz_convert(self.timezone)
         current_ts = current_ts_sast.tz_localize(None)
 
-        h1 = self._resample_ohlc(data, "1h")
-        m15 = self._resample_ohlc(data, "15min")
+        if timeframes is not None:
+            h1 = self._naive_index(timeframes.bars("1h"))
+            m15 = self._naive_index(timeframes.bars("15min"))
+        else:
+            data = historical_data.copy()
+            data = data.sort_index()
+            try:
+                data.index = pd.DatetimeIndex(data.index).tz_localize(None)
+            except (AttributeError, TypeError):
+                data.index = pd.to_datetime(data.index)
+            h1 = self._resample_ohlc(data, "1h")
+            m15 = self._resample_ohlc(data, "15min")
 
         self._context_snapshot.update({
             "h1_bars": int(len(h1)) if h1 is not None else 0,
@@ -269,6 +292,12 @@ class NYUPIPStrategy:
             "trendline_valid": trendline_valid,
         }
 
+    @staticmethod
+    def _naive_index(bars: pd.DataFrame) -> pd.DataFrame:
+        if isinstance(bars.index, pd.DatetimeIndex) and bars.index.tz is not None:
+            bars.index = bars.index.tz_localize(None)
+        return bars
+
     @staticmethod
     def _resample_ohlc(data: pd.DataFrame, rule: str) -> Optional[pd.DataFrame]:
         if data.empty:
@@ -0,0 +1,150 @@
+"""Concurrent strategy evaluation with per-strategy deadlines.
+
+The stream loop used to evaluate NYUPIP, ICT Swing and ICT ATM one after the
+other, so a slow strategy delayed order placement for the rest. ``StrategyRunner``
+submits the due strategies to a thread pool against one immutable
+``MarketSnapshot`` and waits at most each strategy's deadline. Results come back
+in submission order regardless of completion order, so signals are handed to the
+``_process_*_signal`` handlers deterministically on the stream thread.
+
+Results that miss their deadline are dropped and counted. A strategy whose
+previous run is still in flight is skipped rather than re-entered, because the
+strategy objects keep state (cooldowns, diagnostics) between runs. Threads are
+used rather than processes for the same reason: that state lives on the
+instances owned by the stream.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .metrics import get_metrics
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    """Inputs shared by every strategy for one evaluation round."""
+
+    quote: Mapping[str, Any]
+    timeframes: Any = None  # TimeframeSnapshot when the M1 buffer is populated
+    history: Optional[pd.DataFrame] = None  # frame fallbacks when it is not
+    ict_history: Optional[pd.DataFrame] = None
+
+
+@dataclass
+class StrategyJob:
+    name: str
+    evaluate: Callable[[MarketSnapshot], Tuple[List[Any], Dict[str, Any]]]
+    deadline_ms: Optional[float] = None
+
+
+@dataclass
+class StrategyResult:
+    name: str
+    status: str  # "ok", "late", "busy" or "error"
+    signals: List[Any] = field(default_factory=list)
+    diagnostics: Dict[str, Any] = field(default_factory=dict)
+    elapsed_ms: float = 0.0
+    error: Optional[str] = None
+
+
+def run_sequential(jobs: Sequence[StrategyJob], snapshot: MarketSnapshot) -> List[StrategyResult]:
+    """Evaluate ``jobs`` one after the other on the calling thread (no deadlines)."""
+    results: List[StrategyResult] = []
+    for job in jobs:
+        try:
+            signals, diagnostics, elapsed = StrategyRunner._timed(job, snapshot)
+        except Exception as e:
+            results.append(StrategyResult(job.name, "error", error=str(e)))
+            continue
+        results.append(StrategyResult(job.name, "ok", signals, diagnostics, elapsed))
+    return results
+
+
+class StrategyRunner:
+    """Run strategy jobs concurrently and merge their results in job order."""
+
+    def __init__(
+        self,
+        max_workers: int = 3,
+        default_deadline_ms: float = 2000.0,
+        deadlines_ms: Optional[Mapping[str, float]] = None,
+    ) -> None:
+        self.default_deadline_ms = float(default_deadline_ms)
+        self.deadlines_ms = {k: float(v) for k, v in (deadlines_ms or {}).items()}
+        self.max_workers = max(1, int(max_workers))
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _bump(self, name: str, key: str, amount: float = 1) -> None:
+        with self._lock:
+            entry = self.stats.setdefault(name, {"runs": 0, "late": 0, "busy": 0, "errors": 0, "late_completed": 0})
+            entry[key] = entry.get(key, 0) + amount
+
+    @staticmethod
+    def _timed(job: StrategyJob, snapshot: MarketSnapshot) -> Tuple[List[Any], Dict[str, Any], float]:
+        start = time.perf_counter()
+        signals, diagnostics = job.evaluate(snapshot)
+        elapsed = time.perf_counter() - start
+        get_metrics().observe(f"strategy.{job.name}", elapsed)
+        return list(signals or []), dict(diagnostics or {}), elapsed * 1000.0
+
+    def run(self, jobs: Sequence[StrategyJob], snapshot: MarketSnapshot) -> List[StrategyResult]:
+        """Evaluate ``jobs`` concurrently; returns one result per job, in job order."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="strategy")
+        submitted: List[Tuple[StrategyJob, Optional[Future]]] = []
+        start = time.perf_counter()
+        for job in jobs:
+            with self._lock:
+                previous = self._in_flight.get(job.name)
+                if previous is not None and not previous.done():
+                    submitted.append((job, None))
+                    continue
+                future = self._pool.submit(self._timed, job, snapshot)
+                self._in_flight[job.name] = future
+            submitted.append((job, future))
+
+        results: List[StrategyResult] = []
+        for job, future in submitted:
+            if future is None:
+                self._bump(job.name, "busy")
+                results.append(StrategyResult(job.name, "busy"))
+                continue
+            deadline_ms = job.deadline_ms or self.deadlines_ms.get(job.name, self.default_deadline_ms)
+            remaining = deadline_ms / 1000.0 - (time.perf_counter() - start)
+            try:
+                signals, diagnostics, elapsed = future.result(timeout=max(remaining, 0.0))
+            except FutureTimeout:
+                self._bump(job.name, "late")
+                future.add_done_callback(lambda _f, name=job.name: self._bump(name, "late_completed"))
+                results.append(StrategyResult(job.name, "late", elapsed_ms=deadline_ms))
+                continue
+            except Exception as e:
+                self._bump(job.name, "errors")
+                results.append(StrategyResult(job.name, "error", error=str(e)))
+                continue
+            self._bump(job.name, "runs")
+            results.append(StrategyResult(job.name, "ok", signals, diagnostics, elapsed))
+        return results
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(entry) for name, entry in self.stats.items()}
+
+    def shutdown(self) -> None:
+        """Stop the worker threads; the next :meth:`run` starts a fresh pool."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        with self._lock:
+            self._in_flight.clear()
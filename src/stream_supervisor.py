@@ -0,0 +1,237 @@
+"""Drive many symbol pipelines from one broker session.
+
+Running one ``LiveDataStream`` per symbol meant one polling thread, one set of
+MetaTrader5 connectors and one position/deals poll per symbol every cycle.
+``StreamSupervisor`` owns the pipelines instead: a single scheduler thread
+decides which symbols are due, their quote/process cycles run on a small shared
+worker pool, and once those finish the account is polled once (positions,
+equity, today's deals) and each symbol's slice is fanned out to its
+``OrderManager.reconcile``. Every broker round trip in the process (quotes,
+order sends and modifications, symbol lookups, the account poll) takes a token
+from one shared rate limiter, installed in :mod:`.broker_gateway` while the
+supervisor runs.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from datetime import timedelta
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, List, Optional
+
+from .broker_gateway import get_rate_limiter, set_rate_limiter
+from .config import get_config
+from .live_data_stream import LiveDataStream
+from .order_manager import DealHistoryIndex
+from .position_service import get_position_service
+
+try:
+    from .mt5_connector import MT5Connector
+except ImportError:
+    MT5Connector = None
+try:
+    from .persistence import PersistenceManager
+except ImportError:
+    PersistenceManager = None
+
+
+class RateLimiter:
+    """Token bucket shared by every broker call made while the supervisor runs."""
+
+    def __init__(self, rate_per_second: float, burst: Optional[int] = None) -> None:
+        self.rate = max(float(rate_per_second), 0.001)
+        self.capacity = float(burst if burst is not None else max(1, int(self.rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waits = 0
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        tokens = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                delay = (tokens - self._tokens) / self.rate
+                self.waits += 1
+            time.sleep(delay)
+
+
+class StreamSupervisor:
+    """One broker session and one scheduler fanning out to N symbol pipelines."""
+
+    def __init__(
+        self,
+        symbols: Iterable[str],
+        update_interval: int = 30,
+        max_workers: Optional[int] = None,
+        max_calls_per_second: Optional[float] = None,
+    ) -> None:
+        self.config = get_config()
+        sup_cfg = self.config.get('supervisor', {})
+        self.update_interval = update_interval
+        self.broker = MT5Connector() if MT5Connector else None
+        if self.broker:
+            try:
+                self.broker.initialize()
+            except Exception as e:
+                print(f"⚠️ Supervisor broker init error: {e}")
+        self.persistence = PersistenceManager() if PersistenceManager else None
+        rc = self.config.get('execution', {}).get('reconcile', {})
+        # One account-wide deal history shared by every symbol's reconcile
+        self.deal_index = DealHistoryIndex(
+            self.broker,
+            lookback=timedelta(hours=float(rc.get('history_lookback_hours', 120))),
+            overlap=timedelta(seconds=float(rc.get('overlap_seconds', 120))),
+        ) if self.broker else None
+        self.rate_limiter = RateLimiter(
+            max_calls_per_second or float(sup_cfg.get('max_broker_calls_per_second', 20)),
+            sup_cfg.get('burst'),
+        )
+        self.max_workers = int(max_workers or sup_cfg.get('max_workers', 4))
+        self.streams: Dict[str, LiveDataStream] = {}
+        self._next_due: Dict[str, float] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self.is_running = False
+        self.cycles = 0
+        for symbol in symbols:
+            self.add_symbol(symbol)
+
+    def add_symbol(self, symbol: str) -> LiveDataStream:
+        """Create (or return) the pipeline for ``symbol``."""
+        if symbol in self.streams:
+            return self.streams[symbol]
+        stream = LiveDataStream(symbol=symbol, update_interval=self.update_interval, persistence=self.persistence)
+        stream.supervised = True
+        self.streams[symbol] = stream
+        self._next_due[symbol] = 0.0
+        return stream
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self.is_running = True
+        set_rate_limiter(self.rate_limiter)
+        for stream in self.streams.values():
+            stream.is_running = True
+        self._pool = ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix="symbol")
+        self._thread = threading.Thread(target=self._loop, name="stream-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.is_running = False
+        for stream in self.streams.values():
+            stream.stop_streaming()
+        if self._thread is not None:
+            self._thread.join(timeout=self.update_interval + 5)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if get_rate_limiter() is self.rate_limiter:
+            set_rate_limiter(None)
+        print("🛑 Stream supervisor stopped")
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+    def _loop(self) -> None:
+        print(f"🚀 Stream supervisor started for {', '.join(self.streams)}")
+        print(f"⏱️ Update interval: {self.update_interval} seconds")
+        while self.is_running:
+            now = time.monotonic()
+            due = [
+                symbol for symbol, stream in self.streams.items()
+                if stream.is_running and self._next_due.get(symbol, 0.0) <= now
+            ]
+            if due:
+                try:
+                    self._run_cycle(due)
+                except Exception as e:
+                    print(f"❌ Error in supervisor loop: {e}")
+                finished = time.monotonic()
+                for symbol in due:
+                    self._next_due[symbol] = finished + self.streams[symbol].update_interval
+                self.cycles += 1
+            pending = [self._next_due[s] for s, st in self.streams.items() if st.is_running]
+            delay = (min(pending) - time.monotonic()) if pending else 1.0
+            time.sleep(min(max(delay, 0.05), 1.0))
+
+    def _run_cycle(self, symbols: List[str]) -> None:
+        futures = [self._pool.submit(self._process_symbol, symbol) for symbol in symbols]
+        wait(futures)
+        # Positions are polled after processing so orders sent this cycle are visible
+        # to reconcile and are not mistaken for closed tickets.
+        self._reconcile(symbols)
+
+    def _process_symbol(self, symbol: str) -> None:
+        stream = self.streams[symbol]
+        try:
+            current_quote = stream._fetch_current_quote()
+            if current_quote:
+                stream._process_quote(current_quote)
+            else:
+                print(f"⚠️ Failed to fetch current quote for {symbol}")
+        except Exception as e:
+            print(f"❌ Error in {symbol} pipeline: {e}")
+
+    def _reconcile(self, symbols: List[str]) -> None:
+        if not self.broker:
+            return
+        try:
+            # Poll through the shared position service so dashboard readers reuse it
+            snap = get_position_service().refresh()
+            if not snap.ok:
+                return
+            positions = snap.positions
+            equity = snap.equity or 0.0
+            realized = self.broker.today_realized_pnl_by_symbol()
+        except Exception as e:
+            print(f"⚠️ Supervisor position poll error: {e}")
+            return
+        if self.deal_index is not None:
+            self.deal_index.begin_cycle()
+        by_symbol: Dict[str, List[Any]] = {symbol: [] for symbol in symbols}
+        for pos in positions:
+            bucket = by_symbol.get(getattr(pos, 'symbol', None))
+            if bucket is not None:
+                bucket.append(pos)
+        for symbol in symbols:
+            order_manager = self.streams[symbol].order_manager
+            if not order_manager:
+                continue
+            try:
+                order_manager.reconcile(
+                    positions=by_symbol[symbol],
+                    equity=equity,
+                    realized_today=realized.get(symbol, 0.0),
+                    deal_index=self.deal_index,
+                    positions_as_of=snap.as_of,
+                )
+            except Exception as e:
+                print(f"⚠️ {symbol} reconcile error: {e}")
+        if self.deal_index is not None:
+            tracked = set()
+            for stream in self.streams.values():
+                if stream.order_manager:
+                    tracked.update(stream.order_manager.managed)
+            self.deal_index.prune(tracked)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'running': self.is_running,
+            'symbols': list(self.streams),
+            'cycles': self.cycles,
+            'max_workers': self.max_workers,
+            'rate_limit_per_second': self.rate_limiter.rate,
+            'rate_limit_waits': self.rate_limiter.waits,
+            'deal_history_fetches': self.deal_index.fetches if self.deal_index else 0,
+        }
@@ -0,0 +1,478 @@
+"""Incremental technical indicators for the live tick loop.
+
+``TechnicalIndicators.calculate_all_indicators`` recomputes every column over the
+whole history buffer each time a row is appended. ``StreamingIndicators`` keeps
+the running state of each indicator instead and produces the same columns for a
+new bar in constant time.
+
+The rolling primitives below are ports of the online algorithms pandas uses for
+``rolling().mean()``, ``rolling().std()`` and ``ewm().mean()`` (Kahan-compensated
+add/remove, Welford variance, adjusted EWMA), applied in the same order. Right
+after :meth:`StreamingIndicators.seed` the columns are bit-identical to
+``calculate_all_indicators`` on the same rows. Once bars stream in they match
+to floating-point tolerance, not bit for bit: the running sums and
+compensation terms still carry rounding from bars the batch buffer has
+dropped, and the EMA family keeps the (1 - alpha) ** window weight of those
+bars (below 1e-12 at the default 400-row buffer). Over a 400-row buffer of
+XAUUSD-scale prices the means and EMAs differ by ~1e-12 relative, and the
+Bollinger columns by up to ~1e-9 absolute, because the band is a square root
+of a difference of sums. ``tests/test_streaming_indicators.py`` pins these
+tolerances. OBV is reproduced exactly by summing over the same window. Rows
+already in the buffer keep the values they were appended with instead of
+being re-derived from the truncated window on every tick.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+NaN = float("nan")
+
+INDICATOR_COLUMNS: List[str] = [
+    "SMA_20", "SMA_50", "SMA_200",
+    "EMA_12", "EMA_26",
+    "RSI_14",
+    "MACD_12_26", "MACD_Signal_9", "MACD_Histogram",
+    "Stoch_K_14", "Stoch_D_3",
+    "BB_Upper_20", "BB_Middle_20", "BB_Lower_20", "BB_Width_20", "BB_Position_20",
+    "ATR_14",
+    "Volume_SMA_20", "Volume_Ratio", "OBV",
+    "Higher_High", "Lower_Low", "Above_SMA20", "Above_SMA50", "Gap_Up", "Gap_Down",
+]
+
+
+def _div(numerator: float, denominator: float) -> float:
+    """IEEE division (x/0 -> +/-inf, 0/0 -> nan) as pandas/numpy would produce."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return float(np.float64(numerator) / np.float64(denominator))
+
+
+class _RollingMean:
+    """Fixed-window mean mirroring pandas' ``roll_mean`` add/remove updates."""
+
+    def __init__(self, window: int) -> None:
+        self.window = int(window)
+        self.reset()
+
+    def reset(self) -> None:
+        self._values: Deque[float] = deque()
+        self._nobs = 0
+        self._sum = 0.0
+        self._neg_ct = 0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same_count = 0
+        self._prev_value: Optional[float] = None
+        self._undo: Optional[Tuple[Any, ...]] = None
+
+    def _add(self, val: float) -> None:
+        if val != val:
+            return
+        self._nobs += 1
+        y = val - self._comp_add
+        t = self._sum + y
+        self._comp_add = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, val) < 0:
+            self._neg_ct += 1
+        if val == self._prev_value:
+            self._same_count += 1
+        else:
+            self._same_count = 1
+        self._prev_value = val
+
+    def _remove(self, val: float) -> None:
+        if val != val:
+            return
+        self._nobs -= 1
+        y = -val - self._comp_remove
+        t = self._sum + y
+        self._comp_remove = t - self._sum - y
+        self._sum = t
+        if math.copysign(1.0, val) < 0:
+            self._neg_ct -= 1
+
+    def _result(self) -> float:
+        if self._nobs >= self.window and self._nobs > 0:
+            result = self._sum / self._nobs
+            if self._same_count >= self._nobs:
+                result = self._prev_value
+            elif self._neg_ct == 0 and result < 0:
+                result = 0.0
+            elif self._neg_ct == self._nobs and result > 0:
+                result = 0.0
+            return float(result)
+        return NaN
+
+    def push(self, value: float) -> float:
+        value = float(value)
+        evicted = None
+        self._undo = (
+            self._nobs, self._sum, self._neg_ct, self._comp_add, self._comp_remove,
+            self._same_count, self._prev_value,
+        )
+        if self._prev_value is None:
+            self._prev_value = value
+        if len(self._values) == self.window:
+            evicted = self._values.popleft()
+            self._remove(evicted)
+        self._values.append(value)
+        self._add(value)
+        self._undo = self._undo + (evicted,)
+        return self._result()
+
+    def undo(self) -> None:
+        if self._undo is None:
+            return
+        (self._nobs, self._sum, self._neg_ct, self._comp_add, self._comp_remove,
+         self._same_count, self._prev_value, evicted) = self._undo
+        self._values.pop()
+        if evicted is not None:
+            self._values.appendleft(evicted)
+        self._undo = None
+
+
+class _RollingStd:
+    """Fixed-window sample standard deviation mirroring pandas' ``roll_var``."""
+
+    def __init__(self, window: int, ddof: int = 1) -> None:
+        self.window = int(window)
+        self.ddof = int(ddof)
+        self.reset()
+
+    def reset(self) -> None:
+        self._values: Deque[float] = deque()
+        self._nobs = 0.0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._undo: Optional[Tuple[Any, ...]] = None
+
+    def _add(self, val: float) -> None:
+        if val != val:
+            return
+        self._nobs += 1
+        prev_mean = self._mean - self._comp_add
+        y = val - self._comp_add
+        t = y - self._mean
+        self._comp_add = t + self._mean - y
+        if self._nobs:
+            self._mean = self._mean + t / self._nobs
+        else:
+            self._mean = 0.0
+        self._ssqdm = self._ssqdm + (val - prev_mean) * (val - self._mean)
+
+    def _remove(self, val: float) -> None:
+        if val != val:
+            return
+        self._nobs -= 1
+        if self._nobs:
+            prev_mean = self._mean - self._comp_remove
+            y = val - self._comp_remove
+            t = y - self._mean
+            self._comp_remove = t + self._mean - y
+            self._mean = self._mean - t / self._nobs
+            self._ssqdm = self._ssqdm - (val - prev_mean) * (val - self._mean)
+        else:
+            self._mean = 0.0
+            self._ssqdm = 0.0
+
+    def _result(self) -> float:
+        if self._nobs >= self.window and self._nobs > self.ddof:
+            var = self._ssqdm / (self._nobs - self.ddof)
+            return math.sqrt(var) if var > 0 else 0.0
+        return NaN
+
+    def push(self, value: float) -> float:
+        value = float(value)
+        evicted = None
+        self._undo = (
+            self._nobs, self._mean, self._ssqdm, self._comp_add, self._comp_remove,
+        )
+        if len(self._values) == self.window:
+            evicted = self._values.popleft()
+            self._remove(evicted)
+        self._values.append(value)
+        self._add(value)
+        self._undo = self._undo + (evicted,)
+        return self._result()
+
+    def undo(self) -> None:
+        if self._undo is None:
+            return
+        (self._nobs, self._mean, self._ssqdm, self._comp_add, self._comp_remove,
+         evicted) = self._undo
+        self._values.pop()
+        if evicted is not None:
+            self._values.appendleft(evicted)
+        self._undo = None
+
+
+class _RollingExtreme:
+    """Fixed-window min or max; the window is small so a scan is constant time."""
+
+    def __init__(self, window: int, kind: str) -> None:
+        self.window = int(window)
+        self._pick = max if kind == "max" else min
+        self.reset()
+
+    def reset(self) -> None:
+        self._values: Deque[float] = deque()
+        self._undo: Optional[Tuple[Optional[float]]] = None
+
+    def push(self, value: float) -> float:
+        evicted = self._values.popleft() if len(self._values) == self.window else None
+        self._values.append(float(value))
+        self._undo = (evicted,)
+        if len(self._values) < self.window or any(v != v for v in self._values):
+            return NaN
+        return self._pick(self._values)
+
+    def undo(self) -> None:
+        if self._undo is None:
+            return
+        self._values.pop()
+        if self._undo[0] is not None:
+            self._values.appendleft(self._undo[0])
+        self._undo = None
+
+
+class _EWMean:
+    """Adjusted exponential mean mirroring pandas' ``ewm(span=...).mean()``."""
+
+    def __init__(self, span: int) -> None:
+        com = (float(span) - 1.0) / 2.0
+        alpha = 1.0 / (1.0 + com)
+        self._old_wt_factor = 1.0 - alpha
+        self._new_wt = 1.0
+        self.reset()
+
+    def reset(self) -> None:
+        self._started = False
+        self._weighted = NaN
+        self._old_wt = 1.0
+        self._nobs = 0
+        self._undo: Optional[Tuple[Any, ...]] = None
+
+    def push(self, value: float) -> float:
+        cur = float(value)
+        self._undo = (self._started, self._weighted, self._old_wt, self._nobs)
+        is_observation = cur == cur
+        if not self._started:
+            self._started = True
+            self._weighted = cur
+            self._nobs = int(is_observation)
+            self._old_wt = 1.0
+        else:
+            self._nobs += int(is_observation)
+            if self._weighted == self._weighted:
+                self._old_wt *= self._old_wt_factor
+                if is_observation:
+                    if self._weighted != cur:
+                        self._weighted = self._old_wt * self._weighted + self._new_wt * cur
+                        self._weighted /= (self._old_wt + self._new_wt)
+                    self._old_wt += self._new_wt
+            elif is_observation:
+                self._weighted = cur
+        return self._weighted if self._nobs >= 1 else NaN
+
+    def undo(self) -> None:
+        if self._undo is None:
+            return
+        self._started, self._weighted, self._old_wt, self._nobs = self._undo
+        self._undo = None
+
+
+class StreamingIndicators:
+    """Constant-time-per-bar equivalent of ``calculate_all_indicators``.
+
+    Feed bars in time order with :meth:`update`; pass ``replace_last=True`` when
+    the newest bar is revised in place (same timestamp, or a forming bar), which
+    rolls every indicator back one step before applying the new values.
+    ``window`` is the length of the history buffer the batch path would see and
+    only affects OBV, which the batch path accumulates from the buffer start.
+    """
+
+    def __init__(self, window: Optional[int] = None) -> None:
+        self.window = int(window) if window else None
+        self._sma = {period: _RollingMean(period) for period in (20, 50, 200)}
+        self._ema = {period: _EWMean(period) for period in (12, 26)}
+        self._avg_gain = _RollingMean(14)
+        self._avg_loss = _RollingMean(14)
+        self._macd_signal = _EWMean(9)
+        self._lowest_low = _RollingExtreme(14, "min")
+        self._highest_high = _RollingExtreme(14, "max")
+        self._stoch_d = _RollingMean(3)
+        self._bb_std = _RollingStd(20)
+        self._atr = _RollingMean(14)
+        self._volume_sma = _RollingMean(20)
+        self._components = (
+            list(self._sma.values()) + list(self._ema.values()) + [
+                self._avg_gain, self._avg_loss, self._macd_signal, self._lowest_low,
+                self._highest_high, self._stoch_d, self._bb_std, self._atr, self._volume_sma,
+            ]
+        )
+        self.reset()
+
+    def reset(self) -> None:
+        for component in self._components:
+            component.reset()
+        self._prev_bar: Optional[Tuple[float, float, float, float, float]] = None
+        self._last_bar: Optional[Tuple[float, float, float, float, float]] = None
+        self._last_timestamp = None
+        self._obv_increments: Deque[float] = deque()
+        self._obv_total = 0.0
+        self._obv_undo: Optional[Tuple[Any, ...]] = None
+        self.bars_seen = 0
+
+    @property
+    def last_timestamp(self):
+        return self._last_timestamp
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def seed(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Reset and warm the state from ``data``; returns ``data`` with indicator columns."""
+        self.reset()
+        if data is None or data.empty:
+            return data
+        base = data.copy()
+        if "Volume" not in base.columns:
+            base["Volume"] = 0.0
+        rows = [
+            self.update(ts, o, h, l, c, v)
+            for ts, o, h, l, c, v in zip(
+                base.index,
+                base["Open"].to_numpy(dtype=float),
+                base["High"].to_numpy(dtype=float),
+                base["Low"].to_numpy(dtype=float),
+                base["Close"].to_numpy(dtype=float),
+                base["Volume"].to_numpy(dtype=float),
+            )
+        ]
+        indicators = pd.DataFrame(rows, index=base.index, columns=INDICATOR_COLUMNS)
+        base_cols = [c for c in ["Open", "High", "Low", "Close", "Volume"] if c in base.columns]
+        return pd.concat([base[base_cols], indicators], axis=1)
+
+    def update(
+        self,
+        timestamp,
+        open_: float,
+        high: float,
+        low: float,
+        close: float,
+        volume: float,
+        replace_last: bool = False,
+    ) -> Dict[str, Any]:
+        """Consume one bar and return the indicator values for it."""
+        if replace_last and self._last_bar is not None:
+            self._undo_last()
+        else:
+            self._prev_bar = self._last_bar
+            self.bars_seen += 1
+
+        o, h, l, c, v = (float(open_), float(high), float(low), float(close), float(volume))
+        prev = self._prev_bar
+        pc = prev[3] if prev else NaN
+        ph = prev[1] if prev else NaN
+        pl = prev[2] if prev else NaN
+
+        sma = {period: mean.push(c) for period, mean in self._sma.items()}
+        ema = {period: ewm.push(c) for period, ewm in self._ema.items()}
+
+        delta = c - pc
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        avg_gain = self._avg_gain.push(gain)
+        avg_loss = self._avg_loss.push(loss)
+        rs = _div(avg_gain, avg_loss)
+        rsi = 100 - _div(100, 1 + rs)
+
+        macd = ema[12] - ema[26]
+        macd_signal = self._macd_signal.push(macd)
+
+        lowest_low = self._lowest_low.push(l)
+        highest_high = self._highest_high.push(h)
+        stoch_k = 100 * _div(c - lowest_low, highest_high - lowest_low)
+        stoch_d = self._stoch_d.push(stoch_k)
+
+        bb_mid = sma[20]
+        bb_std = self._bb_std.push(c)
+        bb_upper = bb_mid + bb_std * 2
+        bb_lower = bb_mid - bb_std * 2
+
+        true_range = np.nanmax([h - l, abs(h - pc), abs(l - pc)])
+        atr = self._atr.push(float(true_range))
+
+        volume_sma = self._volume_sma.push(v)
+        obv = self._push_obv(float(np.sign(delta)) * v if delta == delta else 0.0)
+
+        self._last_bar = (o, h, l, c, v)
+        self._last_timestamp = timestamp
+
+        return {
+            "SMA_20": sma[20],
+            "SMA_50": sma[50],
+            "SMA_200": sma[200],
+            "EMA_12": ema[12],
+            "EMA_26": ema[26],
+            "RSI_14": rsi,
+            "MACD_12_26": macd,
+            "MACD_Signal_9": macd_signal,
+            "MACD_Histogram": macd - macd_signal,
+            "Stoch_K_14": stoch_k,
+            "Stoch_D_3": stoch_d,
+            "BB_Upper_20": bb_upper,
+            "BB_Middle_20": bb_mid,
+            "BB_Lower_20": bb_lower,
+            "BB_Width_20": bb_upper - bb_lower,
+            "BB_Position_20": _div(c - bb_lower, bb_upper - bb_lower),
+            "ATR_14": atr,
+            "Volume_SMA_20": volume_sma,
+            "Volume_Ratio": _div(v, volume_sma),
+            "OBV": obv,
+            "Higher_High": bool(h > ph),
+            "Lower_Low": bool(l < pl),
+            "Above_SMA20": bool(c > sma[20]),
+            "Above_SMA50": bool(c > sma[50]),
+            "Gap_Up": bool(o > pc),
+            "Gap_Down": bool(o < pc),
+        }
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+    def _push_obv(self, increment: float) -> float:
+        # The batch path runs cumsum over the buffer, and the first buffered row
+        # has no previous close, so OBV is the sum of increments after that row.
+        # Without a window only the emptiness of the deque matters, so it is
+        # capped at one element.
+        evicted = None
+        self._obv_undo = (self._obv_total,)
+        limit = self.window or 1
+        if self._obv_increments:
+            self._obv_total += increment
+        if len(self._obv_increments) == limit:
+            evicted = self._obv_increments.popleft()
+            if self.window:
+                self._obv_total -= self._obv_increments[0] if self._obv_increments else increment
+        self._obv_increments.append(increment)
+        self._obv_undo = self._obv_undo + (evicted,)
+        return self._obv_total
+
+    def _undo_last(self) -> None:
+        for component in self._components:
+            component.undo()
+        if self._obv_undo is not None:
+            self._obv_total, evicted = self._obv_undo
+            self._obv_increments.pop()
+            if evicted is not None:
+                self._obv_increments.appendleft(evicted)
+            self._obv_undo = None
@@ -0,0 +1,304 @@
+"""Process-parallel parameter sweeps over one shared copy of the price history.
+
+Every sweep combination used to reload and re-resample the same M1 history in
+its own run, on one core. ``SweepRunner`` loads the OHLCV arrays once into a
+``multiprocessing.shared_memory`` block; pool workers attach to it when they
+start and view the arrays in place (no pickling or copying of the bars). Each
+combination is scored by an objective function and its row is appended to the
+results CSV as soon as it finishes, so the CSV doubles as the checkpoint: a
+re-run skips every combination that finished ``ok`` and retries failed ones
+(their new row is appended; ``results()`` keeps one row per combination).
+
+Parameter keys for :func:`replay_objective`:
+
+* ``nyupip.<arg>``, ``ict_swing.<arg>``, ``ict_atm.<arg>`` - strategy
+  constructor arguments (e.g. ``ict_atm.max_pattern_age_hours``,
+  ``ict_atm.tolerance_atr_multiple``) or existing strategy attributes;
+* ``exit.<field>`` - ``ExitRules`` fields (``be_after_r``, ``lm_soft_loss``,
+  ``max_minutes`` ...);
+* ``replay.<arg>`` - ``ReplayBacktester`` arguments (``risk_percent``,
+  ``spread_points``, ``seed`` ...); ``replay.strategies`` picks the strategies
+  to run. The slippage seed defaults to ``replay.seed`` from the config.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import replace
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+from .bar_buffer import OHLCV_COLUMNS
+
+Objective = Callable[[Dict[str, Any], pd.DataFrame], Dict[str, Any]]
+
+
+class SharedBars:
+    """OHLCV bars in one shared-memory block: int64 timestamps then column-major float64 values."""
+
+    def __init__(self, shm: shared_memory.SharedMemory, rows: int, columns: List[str], tz: Optional[str], owner: bool) -> None:
+        self.shm = shm
+        self.rows = rows
+        self.columns = list(columns)
+        self.tz = tz
+        self.owner = owner
+        self.timestamps = np.ndarray((rows,), dtype=np.int64, buffer=shm.buf)
+        self.values = np.ndarray((len(self.columns), rows), dtype=np.float64, buffer=shm.buf, offset=rows * 8)
+
+    @classmethod
+    def create(cls, frame: pd.DataFrame, columns: Iterable[str] = OHLCV_COLUMNS) -> "SharedBars":
+        columns = [c for c in columns if c in frame.columns]
+        frame = frame.sort_index()
+        index = pd.DatetimeIndex(frame.index)
+        tz = str(index.tz) if index.tz is not None else None
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        rows = len(frame)
+        shm = shared_memory.SharedMemory(create=True, size=max(8, rows * 8 * (1 + len(columns))))
+        bars = cls(shm, rows, columns, tz, owner=True)
+        bars.timestamps[:] = index.as_unit("ns").asi8
+        for i, col in enumerate(columns):
+            bars.values[i] = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        return bars
+
+    @classmethod
+    def attach(cls, meta: Dict[str, Any]) -> "SharedBars":
+        shm = shared_memory.SharedMemory(name=meta["name"])
+        return cls(shm, meta["rows"], meta["columns"], meta.get("tz"), owner=False)
+
+    def meta(self) -> Dict[str, Any]:
+        return {"name": self.shm.name, "rows": self.rows, "columns": self.columns, "tz": self.tz}
+
+    def frame(self) -> pd.DataFrame:
+        """DataFrame over the shared arrays (read-only; no copy of the values)."""
+        self.values.flags.writeable = False
+        index = pd.DatetimeIndex(self.timestamps.view("datetime64[ns]"))
+        if self.tz:
+            index = index.tz_localize("UTC").tz_convert(self.tz)
+        return pd.DataFrame(self.values.T, index=index, columns=self.columns, copy=False)
+
+    def close(self) -> None:
+        self.timestamps = self.values = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def parameter_grid(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Cartesian product of ``{key: [values]}``; scalar values are held fixed."""
+    keys = sorted(spec)
+    axes = [spec[k] if isinstance(spec[k], (list, tuple)) else [spec[k]] for k in keys]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*axes)]
+
+
+def combo_id(params: Dict[str, Any]) -> str:
+    """Stable id of a parameter combination (used as the checkpoint key)."""
+    blob = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+
+# ----------------------------------------------------------------------
+# Worker side
+# ----------------------------------------------------------------------
+_worker_bars: Optional[SharedBars] = None
+_worker_frame: Optional[pd.DataFrame] = None
+
+
+def _init_worker(meta: Dict[str, Any]) -> None:
+    global _worker_bars, _worker_frame
+    _worker_bars = SharedBars.attach(meta)
+    _worker_frame = _worker_bars.frame()
+
+
+def _run_combo(objective: Objective, params: Dict[str, Any]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        result = objective(params, _worker_frame)
+        status, error = "ok", ""
+    except Exception as e:
+        result, status, error = {}, "error", f"{type(e).__name__}: {e}"
+    row = {f"param.{k}": v for k, v in params.items()}
+    row.update({k: v for k, v in (result or {}).items() if isinstance(v, (int, float, str, bool, np.integer, np.floating))})
+    row.update({
+        "combo_id": combo_id(params),
+        "status": status,
+        "error": error,
+        "seconds": round(time.perf_counter() - started, 3),
+        "worker_pid": os.getpid(),
+    })
+    return row
+
+
+# ----------------------------------------------------------------------
+# Objectives
+# ----------------------------------------------------------------------
+def replay_objective(params: Dict[str, Any], bars: pd.DataFrame) -> Dict[str, Any]:
+    """Score one combination with ``ReplayBacktester`` (see the module docstring for keys)."""
+    from .replay_backtester import ReplayBacktester, STRATEGY_NAMES, default_strategies
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    for key, value in params.items():
+        group, _, name = key.partition(".")
+        groups.setdefault(group, {})[name] = value
+
+    base = ReplayBacktester.from_config(strategies=())
+    replay_args = dict(groups.get("replay", {}))
+    names = replay_args.pop("strategies", STRATEGY_NAMES)
+    if isinstance(names, str):
+        names = tuple(n.strip() for n in names.split(","))
+    strategies = default_strategies(base.symbol, names)
+    for name, overrides in groups.items():
+        if name not in strategies:
+            continue
+        strategy = strategies[name]
+        accepted = inspect.signature(type(strategy)).parameters
+        ctor = {k: v for k, v in overrides.items() if k in accepted}
+        if ctor:
+            if name != "nyupip" and "timezone" not in ctor:
+                # Same timezone default_strategies gives the ICT strategies
+                ctor["timezone"] = strategy.timezone.zone
+            strategy = type(strategy)(symbol=base.symbol, **ctor)
+            strategies[name] = strategy
+        for attr, value in overrides.items():
+            if attr in ctor:
+                continue
+            if not hasattr(strategy, attr):
+                raise ValueError(f"unknown parameter {name}.{attr}")
+            setattr(strategy, attr, value)
+
+    exit_rules = replace(base.exit_rules, **groups.get("exit", {}))
+    tester = ReplayBacktester(
+        symbol=base.symbol,
+        strategies=strategies,
+        spec=base.spec,
+        initial_balance=replay_args.pop("initial_balance", base.initial_balance),
+        risk_percent=replay_args.pop("risk_percent", base.risk_pct * 100.0),
+        spread_points=replay_args.pop("spread_points", base.spread / base.spec.point),
+        slippage_points=replay_args.pop("slippage_points", base.slippage_points),
+        history_limit=replay_args.pop("history_limit", base.history_limit),
+        exit_rules=exit_rules,
+        schedules=replay_args.pop("schedules", base.schedules),
+        sessions=replay_args.pop("sessions", base.sessions),
+        campaign=replay_args.pop("campaign", base.campaign),
+        # Same slippage draws for every combination, so scores differ only by parameters
+        seed=replay_args.pop("seed", base.seed),
+        **replay_args,
+    )
+    result = tester.run(bars)
+    row = {k: v for k, v in (result.get("metrics") or {}).items() if isinstance(v, (int, float))}
+    row["trades"] = int(len(result["trades"]))
+    row["signals"] = int(sum(result["signals"].values()))
+    row["replay_seconds"] = result["elapsed_seconds"]
+    return row
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+class SweepRunner:
+    """Fans parameter combinations out over a process pool against shared bars."""
+
+    def __init__(self, objective: Objective, results_path: str, workers: Optional[int] = None) -> None:
+        self.objective = objective
+        self.results_path = results_path
+        self.workers = int(workers or max(1, (os.cpu_count() or 2) - 1))
+        self._columns: Optional[List[str]] = None
+
+    def completed(self) -> Set[str]:
+        """Combination ids that finished ``ok`` in the results file (failed ones are retried)."""
+        if not os.path.exists(self.results_path):
+            return set()
+        try:
+            done = pd.read_csv(self.results_path, usecols=["combo_id", "status"], dtype=str)
+        except (ValueError, pd.errors.EmptyDataError):
+            return set()
+        return set(done.loc[done["status"] == "ok", "combo_id"].dropna())
+
+    def _append(self, row: Dict[str, Any]) -> None:
+        exists = os.path.exists(self.results_path) and os.path.getsize(self.results_path) > 0
+        if self._columns is None:
+            if exists:
+                with open(self.results_path, newline="") as f:
+                    self._columns = next(csv.reader(f), None)
+            if not self._columns:
+                self._columns = list(row)
+                exists = False
+        extra = [k for k in row if k not in self._columns]
+        if extra:
+            # New metric columns: rewrite the file with the widened header
+            table = pd.read_csv(self.results_path) if exists else pd.DataFrame(columns=self._columns)
+            self._columns = self._columns + extra
+            table.reindex(columns=self._columns).to_csv(self.results_path, index=False)
+            exists = True
+        with open(self.results_path, "a", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=self._columns)
+            if not exists:
+                writer.writeheader()
+            writer.writerow({k: row.get(k) for k in self._columns})
+            f.flush()
+            os.fsync(f.fileno())
+
+    def run(self, bars: pd.DataFrame, combos: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Run every combination not yet in the results file; returns the full table."""
+        done = self.completed()
+        pending = [p for p in combos if combo_id(p) not in done]
+        print(f"🧪 Sweep: {len(combos)} combinations, {len(done)} already done, {len(pending)} to run on {self.workers} workers")
+        if pending:
+            shared = SharedBars.create(bars)
+            started = time.perf_counter()
+            try:
+                with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(shared.meta(),)) as pool:
+                    futures = [pool.submit(_run_combo, self.objective, params) for params in pending]
+                    for i, future in enumerate(as_completed(futures), 1):
+                        row = future.result()
+                        self._append(row)
+                        if row["status"] != "ok":
+                            print(f"⚠️ Sweep combo {row['combo_id']} failed: {row['error']}")
+                        if i % max(1, len(pending) // 20) == 0 or i == len(pending):
+                            elapsed = time.perf_counter() - started
+                            print(f"⏩ Sweep {i}/{len(pending)} done in {elapsed:.1f}s")
+            finally:
+                shared.close()
+        return self.results()
+
+    def results(self) -> pd.DataFrame:
+        """One row per combination: its ``ok`` row if any, else its latest failure."""
+        if not os.path.exists(self.results_path):
+            return pd.DataFrame()
+        table = pd.read_csv(self.results_path)
+        if table.empty or "combo_id" not in table.columns:
+            return table
+        table = table.assign(_ok=table["status"] == "ok").reset_index()
+        table = table.sort_values(["_ok", "index"]).drop_duplicates("combo_id", keep="last")
+        return table.sort_values("index").drop(columns=["_ok", "index"]).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Parallel parameter sweep over shared M1 bars")
+    parser.add_argument("grid", help="JSON file mapping parameter keys to value lists")
+    parser.add_argument("csv", help="M1 OHLCV CSV with a timestamp index column")
+    parser.add_argument("--out", default="analysis/sweep_results.csv")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sort", default="Sharpe_Ratio")
+    args = parser.parse_args()
+
+    with open(args.grid) as f:
+        grid = parameter_grid(json.load(f))
+    data = pd.read_csv(args.csv, index_col=0, parse_dates=True)
+    data.columns = [col.capitalize() for col in data.columns]
+    table = SweepRunner(replay_objective, args.out, args.workers).run(data, grid)
+    if args.sort in table.columns:
+        table = table.sort_values(args.sort, ascending=False)
+    print(table.head(20).to_string())
@@ -0,0 +1,113 @@
+"""Build M1 OHLCV bars from polled quotes.
+
+The stream used to store every polled quote as its own row (O=H=L=C=price), so
+the history buffers held quote samples whose count grew with the polling rate.
+``TickBarAggregator`` folds ticks into minute bars instead: the newest bar stays
+open (forming) until a tick from a later minute arrives, at which point it is
+closed and the bar-close listeners fire. Buffers fed from it therefore hold one
+row per minute however fast the quote loop runs.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+
+@dataclass
+class M1Bar:
+    """One minute of aggregated ticks, stamped with the minute's open time."""
+
+    timestamp: pd.Timestamp
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float = 0.0
+    ticks: int = 0
+
+    def as_row(self) -> Dict[str, float]:
+        return {
+            "Open": self.open,
+            "High": self.high,
+            "Low": self.low,
+            "Close": self.close,
+            "Volume": self.volume,
+        }
+
+
+class TickBarAggregator:
+    """Aggregate ticks into fixed-width bars (M1 by default)."""
+
+    def __init__(self, timeframe: str = "1min") -> None:
+        self.timeframe = timeframe
+        self.forming: Optional[M1Bar] = None
+        self.last_closed: Optional[M1Bar] = None
+        self.bars_closed = 0
+        self.late_ticks = 0
+        self._last_tick: Optional[Tuple[pd.Timestamp, float, float]] = None
+        self._listeners: List[Callable[[M1Bar], None]] = []
+
+    def add_listener(self, callback: Callable[[M1Bar], None]) -> None:
+        """Register a callback invoked with each bar as it closes."""
+        self._listeners.append(callback)
+
+    def resume(self, timestamp, open_: float, high: float, low: float, close: float, volume: float = 0.0) -> None:
+        """Continue a bar that is already partly built (e.g. the broker's current M1 bar)."""
+        self.forming = M1Bar(
+            timestamp=pd.Timestamp(timestamp).floor(self.timeframe),
+            open=float(open_), high=float(high), low=float(low), close=float(close),
+            volume=float(volume or 0.0),
+        )
+
+    def add_tick(self, timestamp, price: float, volume: float = 0.0) -> Optional[M1Bar]:
+        """Fold one tick in; returns the bar it closed, if any.
+
+        Ticks older than the forming bar are counted in ``late_ticks`` and
+        ignored. A poll that returns the same tick again does not add volume.
+        """
+        ts = pd.Timestamp(timestamp)
+        price = float(price)
+        volume = float(volume or 0.0)
+        minute = ts.floor(self.timeframe)
+        repeat = self._last_tick == (ts, price, volume)
+        self._last_tick = (ts, price, volume)
+
+        bar = self.forming
+        if bar is not None and minute < bar.timestamp:
+            self.late_ticks += 1
+            return None
+
+        closed = None
+        if bar is not None and minute > bar.timestamp:
+            closed = self._close()
+            bar = None
+
+        if bar is None:
+            self.forming = M1Bar(minute, price, price, price, price, volume, 1)
+            return closed
+
+        if repeat:
+            return closed
+        bar.high = max(bar.high, price)
+        bar.low = min(bar.low, price)
+        bar.close = price
+        bar.volume += volume
+        bar.ticks += 1
+        return closed
+
+    def _close(self) -> Optional[M1Bar]:
+        bar = self.forming
+        self.forming = None
+        if bar is None:
+            return None
+        self.last_closed = bar
+        self.bars_closed += 1
+        for callback in self._listeners:
+            try:
+                callback(bar)
+            except Exception as e:
+                print(f"⚠️ Bar-close callback error: {e}")
+        return bar
@@ -0,0 +1,279 @@
+"""Shared multi-timeframe bar cache built incrementally from M1 bars.
+
+NYUPIP, ICT ATM and ICT Swing each used to resample or relocalise the full M1
+history on every tick. ``MultiTimeframeBars`` folds each new M1 bar into the
+higher-timeframe buckets once, using the same right-closed, right-labelled
+buckets as ``DataFrame.resample(rule, label="right", closed="right")``, and
+keeps the newest bucket as the partial forming bar. When the M1 source buffer
+evicts its oldest rows the first bucket is re-aggregated from what is left, so
+the output always matches a resample of the current M1 window.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .bar_buffer import BarRingBuffer, OHLCV_COLUMNS
+
+DEFAULT_RULES = ("15min", "1h")
+
+
+class MultiTimeframeBars:
+    """M15/H1 (or any fixed-width rules) bars kept current from an M1 ring buffer.
+
+    Call :meth:`update` after each append to the source buffer (with
+    ``replace_last=True`` after the newest M1 row was revised in place) and
+    :meth:`rebuild` after the source is reloaded. Rows with a missing OHLC value
+    are skipped and a missing volume counts as zero.
+    """
+
+    def __init__(self, source: BarRingBuffer, rules: Sequence[str] = DEFAULT_RULES) -> None:
+        self.source = source
+        self.rules = list(rules)
+        self._steps = {rule: int(pd.Timedelta(rule).value) for rule in self.rules}
+        self.rebuild()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def rebuild(self) -> None:
+        """Re-aggregate every bucket from the source buffer."""
+        # Each bucket is [label_ns, first_row_ns, open, high, low, close, volume]
+        self._buckets: Dict[str, Deque[List[float]]] = {rule: deque() for rule in self.rules}
+        self._cache: Dict[tuple, pd.DataFrame] = {}
+        self.version = getattr(self, "version", 0) + 1
+        self._last_ns: Optional[int] = None
+        self._undo: Optional[tuple] = None
+        ts = self.source.timestamps()
+        self._sorted = bool(len(ts) < 2 or np.all(np.diff(ts) >= 0))
+        if len(ts) == 0:
+            return
+        order = np.argsort(ts, kind="stable") if not self._sorted else np.arange(len(ts))
+        cols = [self._column(col) for col in OHLCV_COLUMNS]
+        for i in order:
+            self._fold(int(ts[i]), *(float(col[i]) for col in cols))
+
+    def update(self, replace_last: bool = False) -> None:
+        """Fold the newest source bar into every timeframe."""
+        if len(self.source) == 0:
+            return
+        if replace_last:
+            if self._undo is None:
+                self.rebuild()
+                return
+            self._rollback()
+        ns = int(self.source.timestamps(1)[0])
+        if self._last_ns is not None and ns < self._last_ns:
+            self.rebuild()
+            return
+        values = [float(self._column(col, 1)[0]) for col in OHLCV_COLUMNS]
+        self._fold(ns, *values, remember=True)
+        self._trim()
+        self._cache.clear()
+        self.version += 1
+
+    def _column(self, name: str, n: Optional[int] = None) -> np.ndarray:
+        if name in self.source.columns:
+            return self.source.view(name, n)
+        return np.zeros(len(self.source) if n is None else min(n, len(self.source)))
+
+    def _fold(
+        self, ns: int, o: float, h: float, l: float, c: float, v: float, remember: bool = False
+    ) -> None:
+        # Per rule: (appended a bucket?, copy of the bucket it updated) so the row
+        # can be taken back out if it is revised in place.
+        undo: Dict[str, tuple] = {}
+        if remember:
+            self._undo = (self._last_ns, undo)
+        if o != o or h != h or l != l or c != c:
+            return
+        if v != v:
+            v = 0.0
+        self._last_ns = ns if self._last_ns is None else max(self._last_ns, ns)
+        for rule, step in self._steps.items():
+            label = -((-ns) // step) * step
+            buckets = self._buckets[rule]
+            if buckets and buckets[-1][0] == label:
+                bucket = buckets[-1]
+                undo[rule] = (False, list(bucket))
+                bucket[3] = max(bucket[3], h)
+                bucket[4] = min(bucket[4], l)
+                bucket[5] = c
+                bucket[6] += v
+            else:
+                undo[rule] = (True, None)
+                buckets.append([label, ns, o, h, l, c, v])
+
+    def _rollback(self) -> None:
+        last_ns, per_rule = self._undo
+        self._last_ns = last_ns
+        for rule, (appended, previous) in per_rule.items():
+            buckets = self._buckets[rule]
+            if not buckets:
+                continue
+            if appended:
+                buckets.pop()
+            else:
+                buckets[-1] = previous
+        self._undo = None
+
+    def _trim(self) -> None:
+        ts = self.source.timestamps()
+        if len(ts) == 0:
+            return
+        oldest = int(ts[0])
+        for rule in self.rules:
+            buckets = self._buckets[rule]
+            while buckets and buckets[0][1] < oldest:
+                if not self._sorted:
+                    self.rebuild()
+                    return
+                label = buckets[0][0]
+                if label < oldest:
+                    buckets.popleft()
+                    continue
+                # The first bucket lost its earliest rows: re-aggregate what remains.
+                end = int(np.searchsorted(ts, label, side="right"))
+                rows = [self._column(col)[:end] for col in OHLCV_COLUMNS]
+                valid = ~(np.isnan(rows[0]) | np.isnan(rows[1]) | np.isnan(rows[2]) | np.isnan(rows[3]))
+                if not valid.any():
+                    buckets.popleft()
+                    continue
+                first = int(np.argmax(valid))
+                last = len(valid) - 1 - int(np.argmax(valid[::-1]))
+                buckets[0] = [
+                    label,
+                    int(ts[first]),
+                    float(rows[0][first]),
+                    float(rows[1][valid].max()),
+                    float(rows[2][valid].min()),
+                    float(rows[3][last]),
+                    float(np.nansum(rows[4][valid])),
+                ]
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+    def bars(self, rule: str, include_forming: bool = True) -> pd.DataFrame:
+        """OHLCV bars for ``rule`` indexed by right-edge label (fresh frame per call)."""
+        key = (rule, include_forming)
+        cached = self._cache.get(key)
+        if cached is None:
+            buckets = list(self._buckets[rule])
+            if not include_forming and buckets and self._last_ns is not None and buckets[-1][0] > self._last_ns:
+                buckets = buckets[:-1]
+            arr = np.array([b[2:] for b in buckets], dtype=float).reshape(-1, 5)
+            index = pd.DatetimeIndex(np.array([b[0] for b in buckets], dtype="int64").astype("datetime64[ns]"))
+            tz = getattr(self.source, "_tz", None)
+            if tz is not None:
+                index = index.tz_localize("UTC").tz_convert(tz)
+            cached = pd.DataFrame(arr, index=index, columns=OHLCV_COLUMNS)
+            self._cache[key] = cached
+        return cached.copy()
+
+    def forming(self, rule: str) -> Optional[Dict[str, float]]:
+        """The newest (possibly still forming) bucket for ``rule``."""
+        buckets = self._buckets.get(rule)
+        if not buckets:
+            return None
+        label, _, o, h, l, c, v = buckets[-1]
+        return {
+            "timestamp": pd.Timestamp(label),
+            "Open": o, "High": h, "Low": l, "Close": c, "Volume": v,
+            "complete": self._last_ns is not None and label <= self._last_ns,
+        }
+
+    @property
+    def m1_rows(self) -> int:
+        return len(self.source)
+
+    def intraday_m1(self, current_local: pd.Timestamp) -> pd.DataFrame:
+        """M1 rows from local midnight up to ``current_local``, indexed in its timezone.
+
+        Naive source timestamps are treated as UTC, as the strategies do.
+        """
+        columns = {col: self._column(col) for col in OHLCV_COLUMNS}
+        return _intraday_slice(
+            self.source.timestamps(), columns, getattr(self.source, "_tz", None), self._sorted, current_local
+        )
+
+    def snapshot(self) -> "TimeframeSnapshot":
+        """Immutable copy of the current bars for evaluation off the stream thread."""
+        return TimeframeSnapshot(
+            frames={rule: self.bars(rule) for rule in self.rules},
+            forming_open={
+                rule: bool(self._buckets[rule]) and self._last_ns is not None
+                and self._buckets[rule][-1][0] > self._last_ns
+                for rule in self.rules
+            },
+            m1_timestamps=np.array(self.source.timestamps()),
+            m1_columns={col: np.array(self._column(col)) for col in OHLCV_COLUMNS},
+            tz=getattr(self.source, "_tz", None),
+            is_sorted=self._sorted,
+        )
+
+
+class TimeframeSnapshot:
+    """Frozen ``MultiTimeframeBars`` state exposing the same read API."""
+
+    def __init__(
+        self,
+        frames: Dict[str, pd.DataFrame],
+        forming_open: Dict[str, bool],
+        m1_timestamps: np.ndarray,
+        m1_columns: Dict[str, np.ndarray],
+        tz=None,
+        is_sorted: bool = True,
+    ) -> None:
+        self._frames = frames
+        self._forming_open = forming_open
+        self._ts = m1_timestamps
+        self._columns = m1_columns
+        self._tz = tz
+        self._sorted = is_sorted
+        for arr in [self._ts, *self._columns.values()]:
+            arr.flags.writeable = False
+
+    def bars(self, rule: str, include_forming: bool = True) -> pd.DataFrame:
+        frame = self._frames[rule]
+        if not include_forming and self._forming_open.get(rule):
+            frame = frame.iloc[:-1]
+        return frame.copy()
+
+    @property
+    def m1_rows(self) -> int:
+        return len(self._ts)
+
+    def intraday_m1(self, current_local: pd.Timestamp) -> pd.DataFrame:
+        return _intraday_slice(self._ts, self._columns, self._tz, self._sorted, current_local)
+
+
+def _intraday_slice(
+    ts: np.ndarray,
+    columns: Dict[str, np.ndarray],
+    source_tz,
+    is_sorted: bool,
+    current_local: pd.Timestamp,
+) -> pd.DataFrame:
+    tz = current_local.tzinfo
+    start_ns = current_local.normalize().tz_convert("UTC").tz_localize(None).value
+    end_ns = current_local.tz_convert("UTC").tz_localize(None).value
+    if is_sorted:
+        lo = int(np.searchsorted(ts, start_ns, side="left"))
+        hi = int(np.searchsorted(ts, end_ns, side="right"))
+        rows = slice(lo, hi)
+    else:
+        rows = np.argsort(ts, kind="stable")
+    index = pd.DatetimeIndex(ts[rows].astype("datetime64[ns]"))
+    if source_tz is not None:
+        index = index.tz_localize("UTC").tz_convert(source_tz)
+    frame = pd.DataFrame({col: arr[rows].copy() for col, arr in columns.items()}, index=index).dropna()
+    idx = pd.DatetimeIndex(frame.index)
+    if idx.tz is None:
+        idx = idx.tz_localize("UTC")
+    frame.index = idx.tz_convert(tz)
+    return frame[(frame.index.date == current_local.date()) & (frame.index <= current_local)]
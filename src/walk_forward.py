@@ -0,0 +1,446 @@
+"""Walk-forward validation over an M1 bar store.
+
+Rolling (or anchored) train/test folds are cut from one M1 history. For each
+fold an evaluator picks parameters on the train window and scores them out of
+sample on the test window with ``BacktestEngine.calculate_performance_metrics``;
+the per-fold rows are aggregated into a :class:`WalkForwardReport`.
+
+Resampling to the evaluation timeframe and computing indicators/signals over
+every fold separately was what made this infeasible at M1 resolution. The
+indicators and signal columns used here are causal (rolling windows, shifts),
+so ``ArtifactCache`` computes each artifact once over the whole store and folds
+take slices of it: overlapping folds share the same computation, and a slice
+sees exactly the history a live run would have had. Slices are memoised too,
+so folds with identical windows (anchored train starts, a test window reused
+as the next train window) do not even re-slice.
+
+Independent folds run in a process pool. Workers attach the M1 store through
+``SharedBars`` and prepare their cache once, then reuse it for every fold they
+are given.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .backtesting import BacktestEngine
+from .indicators import TechnicalIndicators
+from .signal_generator import SignalGenerator
+from .sweep import SharedBars
+
+SCALAR_METRICS = (
+    "Total_Return", "Final_Value", "Total_Trades", "Win_Rate", "Profit_Factor",
+    "Max_Drawdown", "Sharpe_Ratio", "Volatility", "Average_Win", "Average_Loss",
+)
+
+
+@dataclass(frozen=True)
+class Fold:
+    fold_id: int
+    train_start: pd.Timestamp
+    train_end: pd.Timestamp  # exclusive
+    test_start: pd.Timestamp
+    test_end: pd.Timestamp  # exclusive
+
+
+def make_folds(
+    index: pd.DatetimeIndex,
+    train: str,
+    test: str,
+    step: Optional[str] = None,
+    anchored: bool = False,
+) -> List[Fold]:
+    """Consecutive folds of ``train`` then ``test`` length, advanced by ``step`` (default: ``test``)."""
+    if len(index) == 0:
+        return []
+    train_td, test_td = pd.Timedelta(train), pd.Timedelta(test)
+    step_td = pd.Timedelta(step) if step else test_td
+    first, last = index[0], index[-1]
+    folds: List[Fold] = []
+    train_start = first
+    while True:
+        train_end = train_start + train_td
+        test_end = train_end + test_td
+        if train_end > last:
+            break
+        folds.append(Fold(len(folds), first if anchored else train_start, train_end, train_end, min(test_end, last + pd.Timedelta(1, "ns"))))
+        if test_end > last:
+            break
+        train_start = train_start + step_td
+    return folds
+
+
+class ArtifactCache:
+    """Memoised resampled bars, indicator frames, signal frames and their fold slices."""
+
+    def __init__(self, bars: pd.DataFrame, max_slices: int = 256) -> None:
+        self.bars = bars
+        self.max_slices = int(max_slices)
+        self._full: Dict[Tuple, Any] = {}
+        self._slices: "OrderedDict[Tuple, pd.DataFrame]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _memo(self, key: Tuple, build: Callable[[], Any]) -> Any:
+        if key in self._full:
+            self.hits += 1
+            return self._full[key]
+        self.misses += 1
+        value = build()
+        self._full[key] = value
+        return value
+
+    def resampled(self, rule: str) -> pd.DataFrame:
+        """OHLCV bars for ``rule``, right-closed/right-labelled like ``MultiTimeframeBars``."""
+        def build():
+            if rule in ("1min", "1T", "M1"):
+                return self.bars
+            agg = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+            frame = self.bars.resample(rule, label="right", closed="right").agg(
+                {k: v for k, v in agg.items() if k in self.bars.columns}
+            )
+            return frame.dropna(subset=["Close"])
+        return self._memo(("resampled", rule), build)
+
+    def indicators(self, rule: str) -> pd.DataFrame:
+        return self._memo(("indicators", rule), lambda: TechnicalIndicators().calculate_all_indicators(self.resampled(rule)))
+
+    def signals(self, rule: str) -> Tuple[pd.DataFrame, List[str]]:
+        """Indicator frame with every ``SignalGenerator`` column, plus the column names."""
+        def build():
+            generator = SignalGenerator()
+            frame = generator.generate_all_signals(self.indicators(rule))
+            return frame, list(generator.signal_columns)
+        return self._memo(("signals", rule), build)
+
+    def window(self, kind: str, rule: str, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+        """Rows of artifact ``kind`` (resampled/indicators/signals) in ``[start, end)``."""
+        key = (kind, rule, start, end)
+        cached = self._slices.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._slices.move_to_end(key)
+            return cached
+        self.misses += 1
+        source = self.signals(rule)[0] if kind == "signals" else getattr(self, kind)(rule)
+        out = source[(source.index >= start) & (source.index < end)]
+        self._slices[key] = out
+        if len(self._slices) > self.max_slices:
+            self._slices.popitem(last=False)
+        return out
+
+    def m1_with_warmup(self, start: pd.Timestamp, end: pd.Timestamp, warmup_bars: int) -> Tuple[pd.DataFrame, int]:
+        """M1 rows in ``[start, end)`` preceded by up to ``warmup_bars`` earlier rows."""
+        index = self.bars.index
+        lo = int(index.searchsorted(start, side="left"))
+        hi = int(index.searchsorted(end, side="left"))
+        begin = max(0, lo - int(warmup_bars))
+        return self.bars.iloc[begin:hi], lo - begin
+
+    def get_stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "artifacts": len(self._full), "slices": len(self._slices)}
+
+
+def scalar_metrics(metrics: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    return {f"{prefix}{k}": float(metrics[k]) for k in SCALAR_METRICS if k in (metrics or {})}
+
+
+def _score(metrics: Dict[str, Any], objective: str) -> float:
+    value = (metrics or {}).get(objective)
+    if value is None or not np.isfinite(value):
+        return -np.inf
+    return float(value)
+
+
+# ----------------------------------------------------------------------
+# Evaluators
+# ----------------------------------------------------------------------
+class EnsembleWeightEvaluator:
+    """Fits ``SignalGenerator.combine_signals`` weights on train, scores them on test."""
+
+    name = "ensemble_weights"
+
+    def __init__(
+        self,
+        rule: str = "1h",
+        weight_values: Tuple[float, ...] = (0.0, 1.0),
+        threshold: float = 0.5,
+        objective: str = "Sharpe_Ratio",
+        initial_capital: float = 10000.0,
+        max_candidates: int = 512,
+    ) -> None:
+        self.rule = rule
+        self.weight_values = tuple(weight_values)
+        self.threshold = float(threshold)
+        self.objective = objective
+        self.initial_capital = float(initial_capital)
+        self.max_candidates = int(max_candidates)
+
+    def prepare(self, cache: ArtifactCache) -> None:
+        cache.signals(self.rule)
+
+    def _candidates(self, columns: List[str]) -> List[Dict[str, float]]:
+        combos = []
+        for values in itertools.product(self.weight_values, repeat=len(columns)):
+            if not any(values):
+                continue
+            combos.append(dict(zip(columns, values)))
+            if len(combos) >= self.max_candidates:
+                break
+        return combos
+
+    def _backtest(self, frame: pd.DataFrame, columns: List[str], weights: Dict[str, float]) -> Dict[str, Any]:
+        generator = SignalGenerator()
+        generator.signal_columns = list(columns)
+        combined = generator.combine_signals(frame, method="weighted", weights=weights, threshold=self.threshold)
+        engine = BacktestEngine(initial_capital=self.initial_capital)
+        return engine.execute_backtest(combined, combined["signal"], verbose=False)
+
+    def fit(self, fold: Fold, cache: ArtifactCache) -> Dict[str, Any]:
+        columns = cache.signals(self.rule)[1]
+        train = cache.window("signals", self.rule, fold.train_start, fold.train_end)
+        best, best_score = None, -np.inf
+        for weights in self._candidates(columns):
+            score = _score(self._backtest(train, columns, weights), self.objective)
+            if best is None or score > best_score:
+                best, best_score = weights, score
+        return {"weights": best or {}, "train_score": best_score}
+
+    def test(self, fold: Fold, cache: ArtifactCache, params: Dict[str, Any]) -> Dict[str, Any]:
+        columns = cache.signals(self.rule)[1]
+        frame = cache.window("signals", self.rule, fold.test_start, fold.test_end)
+        return {"metrics": self._backtest(frame, columns, params["weights"])}
+
+
+class NYUPIPModuleEvaluator:
+    """Fits NYUPIP constructor parameters on train replays, scores 1HSMA/CIS out of sample."""
+
+    name = "nyupip_modules"
+    MODULES = ("1HSMA", "CIS")
+
+    def __init__(
+        self,
+        param_grid: Optional[Dict[str, List[Any]]] = None,
+        objective: str = "Sharpe_Ratio",
+        warmup_bars: int = 7200,
+        schedules: Optional[Dict[str, Dict]] = None,
+    ) -> None:
+        self.param_grid = param_grid or {"atr_multiplier": [1.0, 1.1, 1.2, 1.3]}
+        self.objective = objective
+        self.warmup_bars = int(warmup_bars)
+        self.schedules = schedules
+
+    def prepare(self, cache: ArtifactCache) -> None:
+        return None
+
+    def _replay(self, cache: ArtifactCache, start, end, params: Dict[str, Any]) -> Dict[str, Any]:
+        from .replay_backtester import ReplayBacktester
+        from .strategies import NYUPIPStrategy
+
+        base = ReplayBacktester.from_config(strategies=())
+        tester = ReplayBacktester(
+            symbol=base.symbol,
+            strategies={"nyupip": NYUPIPStrategy(symbol=base.symbol, **params)},
+            spec=base.spec,
+            initial_balance=base.initial_balance,
+            risk_percent=base.risk_pct * 100.0,
+            spread_points=base.spread / base.spec.point,
+            slippage_points=base.slippage_points,
+            history_limit=base.history_limit,
+            exit_rules=base.exit_rules,
+            schedules=self.schedules if self.schedules is not None else base.schedules,
+            sessions=base.sessions,
+            campaign=base.campaign,
+            # Fixed slippage draws, so train candidates and test scores are reproducible
+            seed=base.seed,
+        )
+        bars, warmup = cache.m1_with_warmup(start, end, self.warmup_bars)
+        return tester.run(bars, warmup=warmup)
+
+    def fit(self, fold: Fold, cache: ArtifactCache) -> Dict[str, Any]:
+        keys = sorted(self.param_grid)
+        best, best_score = None, -np.inf
+        for values in itertools.product(*(self.param_grid[k] for k in keys)):
+            params = dict(zip(keys, values))
+            score = _score(self._replay(cache, fold.train_start, fold.train_end, params)["metrics"], self.objective)
+            if best is None or score > best_score:
+                best, best_score = params, score
+        return {"params": best or {}, "train_score": best_score}
+
+    def test(self, fold: Fold, cache: ArtifactCache, params: Dict[str, Any]) -> Dict[str, Any]:
+        result = self._replay(cache, fold.test_start, fold.test_end, params["params"])
+        extra: Dict[str, float] = {}
+        trades = result["trades"]
+        for module in self.MODULES:
+            rows = trades[trades["alert_level"] == module] if not trades.empty else trades
+            extra[f"{module}_trades"] = float(len(rows))
+            extra[f"{module}_pnl"] = float(rows["pnl"].sum()) if len(rows) else 0.0
+            extra[f"{module}_win_rate"] = float((rows["pnl"] > 0).mean()) if len(rows) else 0.0
+            extra[f"{module}_avg_r"] = float(rows["r_multiple"].mean()) if len(rows) else 0.0
+        return {"metrics": result["metrics"], "extra": extra}
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+_worker_cache: Optional[ArtifactCache] = None
+_worker_bars: Optional[SharedBars] = None
+
+
+def _init_worker(meta: Dict[str, Any], evaluator) -> None:
+    global _worker_cache, _worker_bars
+    _worker_bars = SharedBars.attach(meta)
+    _worker_cache = ArtifactCache(_worker_bars.frame())
+    evaluator.prepare(_worker_cache)
+
+
+def _run_fold(evaluator, fold: Fold, cache: Optional[ArtifactCache] = None) -> Dict[str, Any]:
+    cache = cache or _worker_cache
+    started = time.perf_counter()
+    row: Dict[str, Any] = {
+        "fold": fold.fold_id,
+        "train_start": fold.train_start,
+        "train_end": fold.train_end,
+        "test_start": fold.test_start,
+        "test_end": fold.test_end,
+    }
+    try:
+        params = evaluator.fit(fold, cache)
+        outcome = evaluator.test(fold, cache, params)
+        metrics = scalar_metrics(outcome.get("metrics") or {})
+        row.update(metrics)
+        row.update(outcome.get("extra", {}))
+        row["train_score"] = params.get("train_score")
+        row["params"] = {k: v for k, v in params.items() if k != "train_score"}
+        # No out-of-sample trades: no metrics to score, kept apart from the ok folds
+        row["status"] = "ok" if metrics.get("Total_Trades", 0) > 0 else "no_trades"
+    except Exception as e:
+        row["status"] = f"error: {type(e).__name__}: {e}"
+    row["seconds"] = round(time.perf_counter() - started, 3)
+    row["cache"] = cache.get_stats()
+    return row
+
+
+class WalkForwardReport:
+    """Per-fold out-of-sample rows plus an aggregate summary."""
+
+    def __init__(self, evaluator_name: str, rows: List[Dict[str, Any]]) -> None:
+        self.evaluator = evaluator_name
+        self.folds = pd.DataFrame(rows).sort_values("fold").reset_index(drop=True) if rows else pd.DataFrame()
+
+    @property
+    def summary(self) -> Dict[str, Any]:
+        ok = self.folds[self.folds["status"] == "ok"] if not self.folds.empty else self.folds
+        status = self.folds["status"] if not self.folds.empty else pd.Series(dtype=str)
+        out: Dict[str, Any] = {
+            "evaluator": self.evaluator,
+            "folds": int(len(self.folds)),
+            "folds_ok": int(len(ok)),
+            "folds_no_trades": int((status == "no_trades").sum()),
+            "folds_error": int(status.str.startswith("error").sum()),
+        }
+        if ok.empty:
+            return out
+        for metric in ("Total_Return", "Sharpe_Ratio", "Max_Drawdown", "Win_Rate", "Profit_Factor"):
+            if metric in ok.columns:
+                values = ok[metric].replace([np.inf, -np.inf], np.nan).dropna()
+                if len(values):
+                    out[f"{metric}_mean"] = float(values.mean())
+                    out[f"{metric}_median"] = float(values.median())
+                    out[f"{metric}_std"] = float(values.std(ddof=0))
+        if "Total_Return" in ok.columns:
+            # Over folds that traded; folds_no_trades says how many test windows stayed flat
+            returns = ok["Total_Return"].dropna()
+            out["oos_compounded_return"] = float(np.prod(1.0 + returns) - 1.0)
+            out["profitable_fold_pct"] = float((returns > 0).mean())
+        if "Max_Drawdown" in ok.columns:
+            out["worst_fold_drawdown"] = float(ok["Max_Drawdown"].min())
+        return out
+
+    def to_csv(self, path: str) -> None:
+        self.folds.to_csv(path, index=False)
+
+    def print_report(self) -> None:
+        print("\n" + "=" * 60)
+        print(f"🧭 WALK-FORWARD REPORT ({self.evaluator})")
+        print("=" * 60)
+        for key, value in self.summary.items():
+            print(f"{key:<28} {value:>14.4f}" if isinstance(value, float) else f"{key:<28} {value!s:>14}")
+        print("=" * 60)
+
+
+class WalkForwardDriver:
+    """Cuts folds from an M1 store and runs an evaluator over them, in parallel when asked."""
+
+    def __init__(
+        self,
+        bars: pd.DataFrame,
+        train: str = "30D",
+        test: str = "7D",
+        step: Optional[str] = None,
+        anchored: bool = False,
+        workers: int = 1,
+    ) -> None:
+        self.bars = bars.sort_index()
+        self.train, self.test, self.step, self.anchored = train, test, step, anchored
+        self.workers = max(1, int(workers))
+
+    def folds(self) -> List[Fold]:
+        return make_folds(pd.DatetimeIndex(self.bars.index), self.train, self.test, self.step, self.anchored)
+
+    def run(self, evaluator) -> WalkForwardReport:
+        folds = self.folds()
+        print(f"🧭 Walk-forward: {len(folds)} folds (train {self.train}, test {self.test}) on {self.workers} worker(s)")
+        if self.workers == 1 or len(folds) <= 1:
+            cache = ArtifactCache(self.bars)
+            evaluator.prepare(cache)
+            rows = [_run_fold(evaluator, fold, cache) for fold in folds]
+        else:
+            shared = SharedBars.create(self.bars)
+            try:
+                with ProcessPoolExecutor(
+                    max_workers=min(self.workers, len(folds)),
+                    initializer=_init_worker,
+                    initargs=(shared.meta(), evaluator),
+                ) as pool:
+                    rows = list(pool.map(_run_fold, itertools.repeat(evaluator), folds))
+            finally:
+                shared.close()
+        for row in rows:
+            if row["status"] == "no_trades":
+                print(f"ℹ️ Fold {row['fold']}: no trades in the test window")
+            elif row["status"] != "ok":
+                print(f"⚠️ Fold {row['fold']} {row['status']}")
+        return WalkForwardReport(evaluator.name, rows)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Walk-forward validation over M1 bars")
+    parser.add_argument("csv", help="M1 OHLCV CSV with a timestamp index column")
+    parser.add_argument("--evaluator", choices=("ensemble", "nyupip"), default="ensemble")
+    parser.add_argument("--rule", default="1h", help="timeframe for the ensemble evaluator")
+    parser.add_argument("--train", default="30D")
+    parser.add_argument("--test", default="7D")
+    parser.add_argument("--step", default=None)
+    parser.add_argument("--anchored", action="store_true")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--out", default=None, help="write the per-fold table to this CSV")
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.csv, index_col=0, parse_dates=True)
+    data.columns = [col.capitalize() for col in data.columns]
+    chosen = EnsembleWeightEvaluator(rule=args.rule) if args.evaluator == "ensemble" else NYUPIPModuleEvaluator()
+    report = WalkForwardDriver(data, args.train, args.test, args.step, args.anchored, args.workers).run(chosen)
+    report.print_report()
+    if args.out:
+        report.to_csv(args.out)
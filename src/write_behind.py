@@ -0,0 +1,335 @@
+"""Write-behind queue that keeps SQLite latency off the trading path.
+
+``save_signal``/``save_trade``/``update_trade`` used to run inline on the
+stream thread. With write-behind enabled they enqueue an operation and return;
+a dedicated writer thread drains the queue in batches, each batch applied in a
+single transaction.
+
+Two lanes with different guarantees:
+
+* trade operations (inserts and updates) are never dropped and are written in
+  the order they were enqueued. The writer wakes as soon as one arrives. A
+  failed batch is retried operation by operation; a trade op that keeps
+  failing is retried with backoff and every later trade op waits behind it.
+  With a journal, each trade op is appended to an on-disk file before the
+  producer returns, and the sequence number of the last committed op is
+  written in the same transaction as the op (a ``("checkpoint", seq)`` op), so
+  ops lost in a crash are replayed exactly once on the next start. The
+  journal belongs to one process at a time (an exclusive lock on a sidecar
+  ``.lock`` file), so a second process opening the same database cannot
+  replay or truncate it. When the lane is full, producers wait for space;
+* signal snapshots are bounded and may be coalesced: on overflow the configured
+  policy drops the oldest pending snapshot (default), drops the new one, or
+  waits briefly for space before dropping the oldest.
+
+Signals flush when a batch fills up or the oldest pending one is
+``flush_interval`` seconds old; everything pending is flushed at shutdown.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+Operation = Tuple[Any, ...]  # ("signal", payload) | ("trade", payload) | ("update", ticket, fields) | ("checkpoint", seq)
+
+TRADE_RETRY_MAX_DELAY = 30.0
+
+
+class JournalLockedError(RuntimeError):
+    """Another process owns the trade journal."""
+
+
+class TradeJournal:
+    """Append-only file of pending trade ops: one JSON line ``[seq, op...]`` each.
+
+    Opening the journal takes an exclusive, non-blocking lock on ``path + ".lock"``
+    held until :meth:`close`; raises :class:`JournalLockedError` if it is taken.
+    """
+
+    def __init__(self, path: str, fsync: bool = True) -> None:
+        self.path = path
+        self.fsync = bool(fsync)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock_file = open(path + ".lock", "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            self._lock_file.close()
+            raise JournalLockedError(f"trade journal {path} is in use by another process")
+        self._file = open(path, "a", encoding="utf-8")
+
+    def pending(self, after_seq: int) -> List[Tuple[int, Operation]]:
+        """Journaled ops with a sequence number above ``after_seq`` (the committed checkpoint)."""
+        entries: List[Tuple[int, Operation]] = []
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    seq, *op = json.loads(line)
+                except ValueError:
+                    continue  # torn last line from a crash mid-append
+                if int(seq) > after_seq:
+                    entries.append((int(seq), tuple(op)))
+        return entries
+
+    def last_seq(self) -> int:
+        entries = self.pending(-1)
+        return entries[-1][0] if entries else 0
+
+    def append(self, entries: List[Tuple[int, Operation]]) -> None:
+        for seq, op in entries:
+            self._file.write(json.dumps([seq, *op], default=str) + "\n")
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def truncate(self) -> None:
+        """Drop every entry (call only once all of them are committed)."""
+        self._file.truncate(0)
+        self._file.seek(0)
+
+    def close(self) -> None:
+        self._file.close()
+        # Closing the descriptor releases the lock (flock and msvcrt alike)
+        self._lock_file.close()
+
+
+class WriteBehindQueue:
+    """Bounded two-lane queue drained by one writer thread."""
+
+    def __init__(
+        self,
+        apply_batch: Callable[[List[Operation]], None],
+        max_signals: int = 5000,
+        max_trade_ops: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        overflow: str = "drop_oldest",
+        block_timeout: float = 0.25,
+        name: str = "write-behind",
+        journal: Optional[TradeJournal] = None,
+        committed_seq: int = 0,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self._apply_batch = apply_batch
+        self.max_signals = max(1, int(max_signals))
+        self.max_trade_ops = max(1, int(max_trade_ops))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.overflow = overflow
+        self.block_timeout = float(block_timeout)
+        self._cond = threading.Condition()
+        self._signals: Deque[Tuple[float, Operation]] = deque()
+        self._trades: Deque[Tuple[int, Operation]] = deque()
+        self._in_flight = 0
+        self._journal = journal
+        self._closing = False
+        self.stats: Dict[str, int] = {
+            "signals_enqueued": 0,
+            "trade_ops_enqueued": 0,
+            "signals_coalesced": 0,
+            "signals_dropped": 0,
+            "trade_producers_blocked": 0,
+            "batches": 0,
+            "rows_written": 0,
+            "errors": 0,
+            "trade_retries": 0,
+            "trade_ops_replayed": 0,
+        }
+        self._seq = int(committed_seq)
+        if journal is not None:
+            # Trade ops journaled but not committed before the last shutdown/crash
+            replay = journal.pending(self._seq)
+            self._trades.extend(replay)
+            self.stats["trade_ops_replayed"] = len(replay)
+            self._seq = max(self._seq, journal.last_seq())
+            if replay:
+                print(f"🔁 Write-behind replaying {len(replay)} journaled trade op(s)")
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Producers
+    # ------------------------------------------------------------------
+    @property
+    def depth(self) -> int:
+        return len(self._signals) + len(self._trades) + self._in_flight
+
+    def put_signal(self, payload: Dict[str, Any]) -> None:
+        with self._cond:
+            if len(self._signals) >= self.max_signals:
+                if self.overflow == "drop_newest":
+                    self.stats["signals_dropped"] += 1
+                    return
+                if self.overflow == "block":
+                    self._cond.wait_for(lambda: len(self._signals) < self.max_signals, timeout=self.block_timeout)
+                if len(self._signals) >= self.max_signals:
+                    self._signals.popleft()
+                    self.stats["signals_coalesced"] += 1
+            self._signals.append((time.monotonic(), ("signal", payload)))
+            self.stats["signals_enqueued"] += 1
+            if len(self._signals) >= self.batch_size:
+                self._cond.notify_all()
+
+    def put_trade(self, payload: Dict[str, Any]) -> None:
+        self._put_trade_op(("trade", payload))
+
+    def put_update(self, ticket: int, fields: Dict[str, Any]) -> None:
+        self._put_trade_op(("update", ticket, fields))
+
+    def put_trades(self, payloads: List[Dict[str, Any]]) -> None:
+        """Enqueue several trade inserts back to back so they share a batch."""
+        self._put_trade_ops([("trade", payload) for payload in payloads])
+
+    def put_updates(self, updates: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Enqueue several trade updates back to back so they share a batch."""
+        self._put_trade_ops([("update", ticket, fields) for ticket, fields in updates])
+
+    def _put_trade_op(self, op: Operation) -> None:
+        self._put_trade_ops([op])
+
+    def _put_trade_ops(self, ops: List[Operation]) -> None:
+        with self._cond:
+            if len(self._trades) >= self.max_trade_ops:
+                self.stats["trade_producers_blocked"] += 1
+                self._cond.wait_for(lambda: len(self._trades) < self.max_trade_ops or self._closing)
+            entries = []
+            for op in ops:
+                self._seq += 1
+                entries.append((self._seq, op))
+            if self._journal is not None:
+                self._journal.append(entries)
+            self._trades.extend(entries)
+            self.stats["trade_ops_enqueued"] += len(ops)
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Writer
+    # ------------------------------------------------------------------
+    def _due(self) -> bool:
+        if self._trades or self._closing:
+            return True
+        if len(self._signals) >= self.batch_size:
+            return True
+        return bool(self._signals) and time.monotonic() - self._signals[0][0] >= self.flush_interval
+
+    def _take_batch(self) -> List[Tuple[Optional[int], Operation]]:
+        batch: List[Tuple[Optional[int], Operation]] = []
+        while self._trades and len(batch) < self.batch_size:
+            batch.append(self._trades.popleft())
+        while self._signals and len(batch) < self.batch_size:
+            batch.append((None, self._signals.popleft()[1]))
+        self._in_flight = len(batch)
+        return batch
+
+    def _with_checkpoint(self, batch: List[Tuple[Optional[int], Operation]]) -> List[Operation]:
+        ops = [op for _, op in batch]
+        seqs = [seq for seq, _ in batch if seq is not None]
+        if self._journal is not None and seqs:
+            ops.append(("checkpoint", max(seqs)))
+        return ops
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due():
+                    self._cond.wait(timeout=self.flush_interval)
+                if self._closing and not self._trades and not self._signals:
+                    self._cond.notify_all()
+                    return
+                batch = self._take_batch()
+            self._write(batch)
+            with self._cond:
+                self._in_flight = 0
+                if self._journal is not None and not self._trades and any(seq is not None for seq, _ in batch):
+                    # Everything journaled is committed (checkpointed); start the file over
+                    self._journal.truncate()
+                self._cond.notify_all()
+
+    def _write(self, batch: List[Tuple[Optional[int], Operation]]) -> None:
+        try:
+            self._apply_batch(self._with_checkpoint(batch))
+            self.stats["batches"] += 1
+            self.stats["rows_written"] += len(batch)
+            return
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"⚠️ Write-behind batch error ({len(batch)} ops): {e}")
+        # Retry one operation at a time so a single bad signal row does not sink the
+        # batch. Signals get one more attempt; trade ops are retried with backoff until
+        # they commit, and the trade ops after them wait, so order is kept.
+        for entry in batch:
+            seq, op = entry
+            if op[0] == "signal":
+                try:
+                    self._apply_batch([op])
+                    self.stats["rows_written"] += 1
+                except Exception:
+                    self.stats["errors"] += 1
+                    self.stats["signals_dropped"] += 1
+                continue
+            delay = 0.5
+            while True:
+                try:
+                    self._apply_batch(self._with_checkpoint([entry]))
+                    self.stats["rows_written"] += 1
+                    break
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    self.stats["trade_retries"] += 1
+                    print(f"⚠️ Write-behind {op[0]} op #{seq} failed, retrying in {delay:.1f}s (later trade ops wait): {e}")
+                    time.sleep(delay)
+                    delay = min(delay * 2, TRADE_RETRY_MAX_DELAY)
+
+    # ------------------------------------------------------------------
+    # Flush / shutdown
+    # ------------------------------------------------------------------
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything enqueued so far is written; False on timeout."""
+        with self._cond:
+            self._cond.notify_all()
+            # Force a signal flush even below the batch/time thresholds
+            if self._signals:
+                self._signals[0] = (self._signals[0][0] - self.flush_interval, self._signals[0][1])
+            return self._cond.wait_for(
+                lambda: not self._signals and not self._trades and self._in_flight == 0, timeout=timeout
+            )
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+        if self._thread.is_alive() and self._trades:
+            where = "kept in the journal for replay" if self._journal is not None else "lost"
+            print(f"❌ Write-behind closed with {len(self._trades)} trade op(s) unwritten ({where})")
+        if self._journal is not None and not self._thread.is_alive():
+            self._journal.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats.update({
+            "depth": self.depth,
+            "pending_signals": len(self._signals),
+            "pending_trade_ops": len(self._trades),
+            "overflow": self.overflow,
+            "journal": self._journal.path if self._journal is not None else None,
+        })
+        return stats
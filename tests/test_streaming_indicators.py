@@ -0,0 +1,73 @@
+"""StreamingIndicators against the batch calculate_all_indicators path."""
+
+import numpy as np
+import pandas as pd
+
+from src.indicators import TechnicalIndicators
+from src.streaming_indicators import INDICATOR_COLUMNS, StreamingIndicators
+
+WINDOW = 400
+# Streamed values carry rounding from bars the batch buffer has dropped; the
+# Bollinger band (sqrt of a difference of sums) is the loosest column.
+RTOL = 1e-9
+ATOL = 1e-8
+
+
+def _bars(n: int = 2400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 2000 + np.cumsum(rng.normal(0, 0.5, n))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame(
+        {
+            "Open": open_,
+            "High": np.maximum(open_, close) + rng.uniform(0, 0.4, n),
+            "Low": np.minimum(open_, close) - rng.uniform(0, 0.4, n),
+            "Close": close,
+            "Volume": rng.uniform(1, 100, n),
+        },
+        index=pd.date_range("2024-01-01", periods=n, freq="1min"),
+    )
+
+
+def _numeric(frame: pd.DataFrame) -> list:
+    return [c for c in INDICATOR_COLUMNS if frame[c].dtype != bool]
+
+
+def test_seed_matches_batch_exactly():
+    bars = _bars(WINDOW)
+    seeded = StreamingIndicators(window=WINDOW).seed(bars)
+    batch = TechnicalIndicators().calculate_all_indicators(bars)
+    for col in INDICATOR_COLUMNS:
+        np.testing.assert_array_equal(seeded[col].to_numpy(), batch[col].to_numpy(), err_msg=col)
+
+
+def test_streamed_rows_match_batch_within_tolerance():
+    bars = _bars()
+    engine = StreamingIndicators(window=WINDOW)
+    numeric = _numeric(engine.seed(bars.iloc[:WINDOW]))
+    rows = bars[["Open", "High", "Low", "Close", "Volume"]].to_numpy()
+    checked = 0
+    for i in range(WINDOW, len(bars)):
+        values = engine.update(bars.index[i], *rows[i])
+        if (i - WINDOW) % 200:
+            continue
+        batch = TechnicalIndicators().calculate_all_indicators(bars.iloc[i - WINDOW + 1:i + 1]).iloc[-1]
+        for col in numeric:
+            np.testing.assert_allclose(values[col], float(batch[col]), rtol=RTOL, atol=ATOL, err_msg=col)
+        checked += 1
+    assert checked >= 10
+
+
+def test_replace_last_matches_fresh_append():
+    bars = _bars(WINDOW + 5)
+    rows = bars[["Open", "High", "Low", "Close", "Volume"]].to_numpy()
+    revised = StreamingIndicators(window=WINDOW)
+    revised.seed(bars.iloc[:WINDOW])
+    fresh = StreamingIndicators(window=WINDOW)
+    fresh.seed(bars.iloc[:WINDOW])
+    ts = bars.index[WINDOW]
+    revised.update(ts, *(rows[WINDOW] + 1.0))
+    got = revised.update(ts, *rows[WINDOW], replace_last=True)
+    want = fresh.update(ts, *rows[WINDOW])
+    for col in INDICATOR_COLUMNS:
+        np.testing.assert_array_equal(got[col], want[col], err_msg=col)